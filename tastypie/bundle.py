@@ -27,6 +27,8 @@ class Bundle(object):
         self.errors = {}
         self.objects_saved = objects_saved or set()
         self.related_objects_to_save = related_objects_to_save or {}
+        # Set by ``Resource.full_dehydrate`` (see ``Resource.get_bundle_shape``).
+        self.shape = None
 
     def __repr__(self):
         return "<Bundle for obj: '%s' and with data: '%s'>" % (self.obj, self.data)
@@ -30,6 +30,33 @@ class NoCache(object):
         """
         pass
 
+    def get_many(self, keys):
+        """
+        Gets several keys at once, returning a dictionary of the keys that
+        were found.
+
+        Uses ``get`` for each key by default, so it always returns an empty
+        dictionary.
+        """
+        found = {}
+
+        for key in keys:
+            value = self.get(key)
+
+            if value is not None:
+                found[key] = value
+
+        return found
+
+    def set_many(self, data, timeout=60):
+        """
+        Sets several key-values (from a dictionary) at once.
+
+        Uses ``set`` for each key by default, so it's a no-op.
+        """
+        for key, value in data.items():
+            self.set(key, value, timeout=timeout)
+
     def cacheable(self, request, response):
         """
         Returns True or False if the request -> response is capable of being
@@ -80,6 +107,25 @@ class SimpleCache(NoCache):
 
         cache.set(key, value, timeout)
 
+    def get_many(self, keys):
+        """
+        Gets several keys from the cache in one go. Returns a dictionary of
+        the keys that were found.
+        """
+        return cache.get_many(keys)
+
+    def set_many(self, data, timeout=None):
+        """
+        Sets several key-values (from a dictionary) in the cache in one go.
+
+        Optionally accepts a ``timeout`` in seconds. Defaults to ``None`` which
+        uses the resource's default timeout.
+        """
+        if timeout == None:
+            timeout = self.timeout
+
+        cache.set_many(data, timeout)
+
     def cache_control(self):
         control = {
             'max_age': self.timeout,
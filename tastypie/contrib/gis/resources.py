@@ -12,20 +12,31 @@ from django.contrib.gis.geos import GEOSGeometry
 
 from tastypie.fields import ApiField, CharField
 from tastypie import resources
+from tastypie.utils import RawJSON
 
 
 class GeometryApiField(ApiField):
     """
     Custom ApiField for dealing with data from GeometryFields (by serializing
     them as GeoJSON).
+
+    With ``raw_json=True``, the GeoJSON is passed along as a ``RawJSON``
+    string, so JSON output gets it verbatim instead of decoding & encoding it
+    again.
     """
     dehydrated_type = 'geometry'
     help_text = 'Geometry data.'
 
+    def __init__(self, *args, **kwargs):
+        self.raw_json = kwargs.pop('raw_json', False)
+        super(GeometryApiField, self).__init__(*args, **kwargs)
+
     def hydrate(self, bundle):
         value = super(GeometryApiField, self).hydrate(bundle)
         if value is None:
             return value
+        if isinstance(value, RawJSON):
+            return value.json
         return simplejson.dumps(value)
 
     def dehydrate(self, obj):
@@ -35,9 +46,12 @@ class GeometryApiField(ApiField):
         if value is None:
             return None
 
-        if isinstance(value, dict):
+        if isinstance(value, (dict, RawJSON)):
             return value
 
+        if self.raw_json:
+            return RawJSON(value.geojson)
+
         # Get ready-made geojson serialization and then convert it _back_ to
         # a Python object so that tastypie can serialize it as part of the
         # bundle.
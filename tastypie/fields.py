@@ -1,5 +1,4 @@
 import datetime
-from dateutil.parser import parse
 from decimal import Decimal
 import re
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
@@ -7,7 +6,11 @@ from django.utils import datetime_safe, importlib
 from django.core.urlresolvers import resolve
 from tastypie.bundle import Bundle
 from tastypie.exceptions import ApiFieldError, NotFound
-from tastypie.utils import dict_strip_unicode_keys, make_aware
+from tastypie.utils import dict_strip_unicode_keys, make_aware, mk_datetime, attach_dehydration_memo, RawJSON, PackedArray, get_packed_arrays
+try:
+    import json as simplejson
+except ImportError: # < Python 2.6
+    from django.utils import simplejson
 
 
 class NOT_PROVIDED:
@@ -107,7 +110,7 @@ class ApiField(object):
         """
         if self.attribute is not None:
             # Check for `__` in the field for looking through the relation.
-            attrs = self.attribute.split('__')
+            attrs = self.get_attribute_bits()
             current_object = bundle.obj
 
             for attr in attrs:
@@ -138,6 +141,21 @@ class ApiField(object):
         else:
             return None
 
+    def get_attribute_bits(self):
+        """
+        Returns the ``attribute`` split on ``__``.
+
+        The split is remembered (until ``attribute`` changes), so it isn't
+        redone for every object that gets dehydrated.
+        """
+        cached = getattr(self, '_attribute_bits', None)
+
+        if cached is None or cached[0] != self.attribute:
+            cached = (self.attribute, self.attribute.split('__'))
+            self._attribute_bits = cached
+
+        return cached[1]
+
     def convert(self, value):
         """
         Handles conversion between the data found and the type of the field.
@@ -288,16 +306,54 @@ class BooleanField(ApiField):
 class ListField(ApiField):
     """
     A list field.
+
+    Optionally accepts a ``typecode`` (an ``array`` typecode, i.e. ``'d'``)
+    for lists of numbers. When a request asks for packed arrays (see
+    ``Resource.use_packed_arrays``), these are dehydrated as ``PackedArrays``
+    rather than lists. Packed arrays are also accepted on hydrate.
     """
     dehydrated_type = 'list'
     help_text = "A list of data. Ex: ['abc', 26.73, 8]"
 
+    def __init__(self, *args, **kwargs):
+        self.typecode = kwargs.pop('typecode', None)
+        super(ListField, self).__init__(*args, **kwargs)
+
     def convert(self, value):
         if value is None:
             return None
 
         return list(value)
 
+    def dehydrate(self, bundle, for_list=True):
+        value = super(ListField, self).dehydrate(bundle, for_list=for_list)
+        return self.pack(value, bundle.request)
+
+    def pack(self, value, request):
+        """
+        Returns the dehydrated ``value`` as a ``PackedArray`` if the field has
+        a ``typecode`` & the ``request`` asks for packed arrays, otherwise
+        leaves it alone.
+        """
+        if value is None or self.typecode is None or not get_packed_arrays(request):
+            return value
+
+        try:
+            return PackedArray(value, self.typecode)
+        except (TypeError, ValueError, OverflowError), e:
+            raise ApiFieldError("The '%s' field can't be packed as '%s': %s" % (self.instance_name, self.typecode, e))
+
+    def hydrate(self, bundle):
+        value = super(ListField, self).hydrate(bundle)
+
+        if self.typecode is None or not isinstance(value, dict):
+            return value
+
+        try:
+            return PackedArray.from_simple(value).tolist()
+        except ValueError, e:
+            raise ApiFieldError("The '%s' field was given an invalid packed array: %s" % (self.instance_name, e))
+
 
 class DictField(ApiField):
     """
@@ -313,6 +369,43 @@ class DictField(ApiField):
         return dict(value)
 
 
+class RawJSONField(ApiField):
+    """
+    A field for data that's stored already serialized as JSON (i.e. in a
+    ``TextField``).
+
+    The stored string is written into JSON output verbatim (see ``RawJSON``)
+    & only decoded when another format is requested. It isn't checked, so it
+    must be valid JSON.
+    """
+    dehydrated_type = 'json'
+    help_text = 'Data stored as JSON. Ex: {"price": 26.73, "name": "Daniel"}'
+
+    def convert(self, value):
+        if value is None:
+            return None
+
+        if isinstance(value, basestring):
+            return RawJSON(value)
+
+        return value
+
+    def hydrate(self, bundle):
+        value = super(RawJSONField, self).hydrate(bundle)
+
+        if value is None:
+            return value
+
+        if isinstance(value, RawJSON):
+            return value.json
+
+        if isinstance(value, basestring) and not self.instance_name in bundle.data:
+            # Not in the request, so it's what's already stored.
+            return value
+
+        return simplejson.dumps(value)
+
+
 class DateField(ApiField):
     """
     A date field.
@@ -341,7 +434,7 @@ class DateField(ApiField):
         if value and not hasattr(value, 'year'):
             try:
                 # Try to rip a date/datetime out of it.
-                value = make_aware(parse(value))
+                value = make_aware(mk_datetime(value))
 
                 if hasattr(value, 'hour'):
                     value = value.date()
@@ -379,7 +472,7 @@ class DateTimeField(ApiField):
         if value and not hasattr(value, 'year'):
             try:
                 # Try to rip a date/datetime out of it.
-                value = make_aware(parse(value))
+                value = make_aware(mk_datetime(value))
             except ValueError:
                 pass
 
@@ -477,6 +570,7 @@ class RelatedField(ApiField):
         self.resource_name = None
         self.unique = unique
         self._to_class = None
+        self._related_resources = {}
         self.use_in = 'all'
         self.full_list = full_list
         self.full_detail = full_detail
@@ -502,19 +596,42 @@ class RelatedField(ApiField):
 
     def get_related_resource(self, related_instance):
         """
-        Instaniates the related resource.
+        Returns the related resource.
+
+        Resources carry no per-object state (that lives on the ``Bundle``),
+        so the related resource is only instantiated once per class & reused
+        for every related object.
         """
-        related_resource = self.to_class()
+        related_resource = self.get_pooled_resource(self.to_class)
 
         # Fix the ``api_name`` if it's not present.
         if related_resource._meta.api_name is None:
             if self._resource and not self._resource._meta.api_name is None:
                 related_resource._meta.api_name = self._resource._meta.api_name
 
-        # Try to be efficient about DB queries.
-        related_resource.instance = related_instance
         return related_resource
 
+    def get_pooled_resource(self, to_class):
+        """
+        Returns the instance of ``to_class`` kept by this field, creating it
+        the first time it's needed.
+        """
+        pool = getattr(self, '_related_resources', None)
+
+        if pool is None:
+            pool = self._related_resources = {}
+
+        resource = pool.get(to_class)
+
+        if resource is None:
+            resource = to_class()
+
+            # Only pool real classes (not something like a ``partial``).
+            if isinstance(to_class, type):
+                pool[to_class] = resource
+
+        return resource
+
     @property
     def to_class(self):
         # We need to be lazy here, because when the metaclass constructs the
@@ -549,20 +666,61 @@ class RelatedField(ApiField):
         """
         Based on the ``full_resource``, returns either the endpoint or the data
         from ``full_dehydrate`` for the related resource.
+
+        Full dehydrations are memoized for the rest of the request, so a
+        related object shared by many parents is only dehydrated once. Each
+        parent gets a shallow copy of the memoized bundle, so changing its
+        ``data`` (i.e. in a ``dehydrate_FOO`` method) doesn't affect the
+        others. If the related object is already being dehydrated further up
+        (a cycle), its endpoint is returned instead.
         """
         should_dehydrate_full_resource = self.should_full_dehydrate(bundle, for_list=for_list)
 
         if not should_dehydrate_full_resource:
             # Be a good netizen.
             return related_resource.get_resource_uri(bundle)
-        else:
+
+        memo = attach_dehydration_memo(bundle.request)
+        key = memo.key(related_resource, bundle.obj, for_list)
+
+        if key is not None:
+            if memo.is_dehydrating(key):
+                return related_resource.get_resource_uri(bundle)
+
+            related_bundle = memo.get(key)
+
+            if related_bundle is not None:
+                return self.copy_related_bundle(related_bundle)
+
+            memo.start(key)
+
+        try:
             # ZOMG extra data and big payloads.
-            bundle = related_resource.build_bundle(
-                obj=related_resource.instance,
+            related_bundle = related_resource.build_bundle(
+                obj=bundle.obj,
                 request=bundle.request,
                 objects_saved=bundle.objects_saved
             )
-            return related_resource.full_dehydrate(bundle)
+            related_bundle = related_resource.full_dehydrate(related_bundle)
+        finally:
+            if key is not None:
+                memo.finish(key)
+
+        if key is not None:
+            memo.set(key, related_bundle)
+            return self.copy_related_bundle(related_bundle)
+
+        return related_bundle
+
+    def copy_related_bundle(self, related_bundle):
+        """
+        Returns a shallow copy of a memoized ``related_bundle``, with its own
+        ``data`` dictionary (the values themselves are shared).
+        """
+        bundle = Bundle(obj=related_bundle.obj, data=dict(related_bundle.data), request=related_bundle.request,
+                        objects_saved=related_bundle.objects_saved)
+        bundle.shape = related_bundle.shape
+        return bundle
 
     def resource_from_uri(self, fk_resource, uri, request=None, related_obj=None, related_name=None):
         """
@@ -638,7 +796,7 @@ class RelatedField(ApiField):
         Accepts either a URI, a data dictionary (or dictionary-like structure)
         or an object with a ``pk``.
         """
-        self.fk_resource = self.to_class()
+        self.fk_resource = self.get_pooled_resource(self.to_class)
         kwargs = {
             'request': request,
             'related_obj': related_obj,
@@ -682,6 +840,17 @@ class RelatedField(ApiField):
 
         return should_dehydrate_full_resource
 
+    def is_uri_only(self, for_list=True):
+        """
+        Returns ``True`` if this field will always dehydrate to a URI (or list
+        of URIs, never the full related resource) in the given mode.
+        """
+        if not self.full:
+            return True
+
+        full = self.full_list if for_list else self.full_detail
+        return not callable(full) and not full
+
 
 class ToOneField(RelatedField):
     """
@@ -701,12 +870,75 @@ class ToOneField(RelatedField):
             full_list=full_list, full_detail=full_detail
         )
         self.fk_resource = None
+        self._foreign_keys = {}
+
+    def get_foreign_key(self, model):
+        """
+        Returns the ``ForeignKey``/``OneToOneField`` on ``model`` that
+        ``attribute`` names, or ``None`` if ``attribute`` is anything else.
+        """
+        foreign_keys = getattr(self, '_foreign_keys', None)
+
+        if foreign_keys is None:
+            foreign_keys = self._foreign_keys = {}
+
+        try:
+            return foreign_keys[model]
+        except KeyError:
+            pass
+
+        foreign_key = None
+
+        if isinstance(self.attribute, basestring) and hasattr(model, '_meta'):
+            for field in getattr(model._meta, 'fields', []):
+                if field.name == self.attribute and getattr(field, 'rel', None) is not None:
+                    foreign_key = field
+                    break
+
+        foreign_keys[model] = foreign_key
+        return foreign_key
+
+    def get_uri_foreign_key(self, model, for_list=True):
+        """
+        Returns the foreign key on ``model`` the related URI can be built
+        from (without loading the related object), or ``None`` if the
+        related object needs to be loaded.
+        """
+        if not self.is_uri_only(for_list):
+            return None
+
+        foreign_key = self.get_foreign_key(model)
+
+        if foreign_key is None:
+            return None
+
+        can_build = getattr(self.get_related_resource(None), 'can_build_uri_from_fk', None)
+
+        if can_build is None or not can_build(foreign_key):
+            return None
+
+        return foreign_key
 
     def dehydrate(self, bundle, for_list=True):
+        foreign_key = self.get_uri_foreign_key(type(bundle.obj), for_list=for_list)
+
+        if foreign_key is not None:
+            value = getattr(bundle.obj, foreign_key.attname, None)
+
+            if value is not None:
+                # Build the URI from the column, never touching the related
+                # table.
+                self.fk_resource = self.get_related_resource(None)
+                return self.fk_resource.get_resource_uri_from_value(value)
+
         foreign_obj = None
+        identity_map = self.get_related_resource(None).get_identity_map(bundle.request)
+
+        if identity_map is not None:
+            self.load_from_identity_map(bundle.obj, identity_map)
 
         if isinstance(self.attribute, basestring):
-            attrs = self.attribute.split('__')
+            attrs = self.get_attribute_bits()
             foreign_obj = bundle.obj
 
             for attr in attrs:
@@ -724,10 +956,40 @@ class ToOneField(RelatedField):
 
             return None
 
+        if identity_map is not None:
+            identity_map.add(foreign_obj)
+
         self.fk_resource = self.get_related_resource(foreign_obj)
         fk_bundle = Bundle(obj=foreign_obj, request=bundle.request)
         return self.dehydrate_related(fk_bundle, self.fk_resource, for_list=for_list)
 
+    def load_from_identity_map(self, obj, identity_map):
+        """
+        If the related object ``attribute`` points to has already been loaded
+        during this request, hands that instance to ``obj`` so following the
+        foreign key doesn't query for it again.
+        """
+        foreign_key = self.get_foreign_key(type(obj))
+
+        if foreign_key is None:
+            return
+
+        cache_name = foreign_key.get_cache_name()
+
+        if hasattr(obj, cache_name):
+            # Already loaded (or ``select_related``).
+            return
+
+        related_model = foreign_key.rel.to
+
+        if foreign_key.rel.field_name != related_model._meta.pk.name:
+            return
+
+        related_obj = identity_map.get(related_model, getattr(obj, foreign_key.attname, None))
+
+        if related_obj is not None:
+            setattr(obj, cache_name, related_obj)
+
     def hydrate(self, bundle):
         value = super(ToOneField, self).hydrate(bundle)
 
@@ -773,6 +1035,91 @@ class ToManyField(RelatedField):
             full_list=full_list, full_detail=full_detail
         )
         self.m2m_bundles = []
+        self._pk_relations = {}
+
+    def get_pk_relation(self, model, for_list=True):
+        """
+        Returns a ``(related_model, lookup)`` tuple when the related URIs can
+        be built from the related primary keys alone, or ``None`` if the
+        related objects need to be loaded.
+
+        ``lookup`` is the name to filter ``related_model`` on to get back to
+        ``model``, so that the keys can be fetched for many objects at once.
+        """
+        if not self.is_uri_only(for_list):
+            return None
+
+        pk_relations = getattr(self, '_pk_relations', None)
+
+        if pk_relations is None:
+            pk_relations = self._pk_relations = {}
+
+        try:
+            relation = pk_relations[model]
+        except KeyError:
+            relation = pk_relations[model] = self._find_pk_relation(model)
+
+        if relation is None:
+            return None
+
+        can_build = getattr(self.get_related_resource(None), 'can_build_uri_from_pk', None)
+
+        if can_build is None or not can_build():
+            return None
+
+        return relation
+
+    def _find_pk_relation(self, model):
+        if not isinstance(self.attribute, basestring) or not hasattr(model, '_meta'):
+            return None
+
+        opts = model._meta
+
+        for field in getattr(opts, 'many_to_many', []):
+            if field.name == self.attribute:
+                # Hidden (``related_name='+'``) & generic relations can't be
+                # queried from the other side.
+                if getattr(field.rel, 'through', None) is None or field.rel.is_hidden():
+                    return None
+
+                return field.rel.to, field.related_query_name()
+
+        for related in opts.get_all_related_objects():
+            if related.get_accessor_name() == self.attribute:
+                if not related.field.rel.get_related_field().primary_key:
+                    return None
+
+                return related.model, related.field.name
+
+        for related in opts.get_all_related_many_to_many_objects():
+            if related.get_accessor_name() == self.attribute:
+                return related.model, related.field.name
+
+        return None
+
+    def get_related_pks(self, bundle, for_list=True):
+        """
+        Returns the primary keys of the objects related to ``bundle.obj``,
+        or ``None`` if the full related objects are needed.
+
+        Uses the keys loaded by ``ModelResource.load_related_pks`` or any
+        ``prefetch_related`` data if present, otherwise fetches just the keys.
+        """
+        if self.get_pk_relation(type(bundle.obj), for_list=for_list) is None:
+            return None
+
+        loaded = getattr(bundle.obj, '_related_pks_cache', {})
+
+        if self.attribute in loaded:
+            return loaded[self.attribute]
+
+        related_objs = getattr(bundle.obj, self.attribute).all()
+
+        if related_objs._result_cache is not None:
+            # Already prefetched, so don't go back to the database.
+            return [related_obj.pk for related_obj in related_objs]
+
+        return list(related_objs.values_list('pk', flat=True))
 
     def dehydrate(self, bundle, for_list=True):
         if not bundle.obj or not bundle.obj.pk:
@@ -781,12 +1128,20 @@ class ToManyField(RelatedField):
 
             return []
 
+        related_pks = self.get_related_pks(bundle, for_list=for_list)
+
+        if related_pks is not None:
+            # Build the URIs from the keys, never loading the related objects.
+            related_resource = self.get_related_resource(None)
+            self.m2m_resources = [related_resource] * len(related_pks)
+            return [related_resource.get_resource_uri_from_value(pk) for pk in related_pks]
+
         the_m2ms = None
         previous_obj = bundle.obj
         attr = self.attribute
 
         if isinstance(self.attribute, basestring):
-            attrs = self.attribute.split('__')
+            attrs = self.get_attribute_bits()
             the_m2ms = bundle.obj
 
             for attr in attrs:
@@ -883,7 +1238,7 @@ class TimeField(ApiField):
 
     def to_time(self, s):
         try:
-            dt = parse(s)
+            dt = mk_datetime(s)
         except ValueError, e:
             raise ApiFieldError(str(e))
         else:
@@ -62,6 +62,10 @@ class HttpGone(HttpResponse):
     status_code = 410
 
 
+class HttpRequestEntityTooLarge(HttpResponse):
+    status_code = 413
+
+
 class HttpTooManyRequests(HttpResponse):
     status_code = 429
 
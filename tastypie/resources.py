@@ -1,7 +1,11 @@
 from __future__ import with_statement
+import hashlib
+import re
 import sys
 import logging
+import uuid
 import warnings
+from decimal import Decimal
 import django
 from django.conf import settings
 try:
@@ -9,12 +13,19 @@ try:
 except ImportError: # Django < 1.4
     from django.conf.urls.defaults import patterns, url
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned, ValidationError
-from django.core.urlresolvers import NoReverseMatch, reverse, resolve, Resolver404, get_script_prefix
+from django.core.urlresolvers import NoReverseMatch, reverse, resolve, Resolver404, get_script_prefix, get_urlconf
 from django.core.signals import got_request_exception
 from django.db import transaction
+from django.db.models.query import QuerySet, ValuesQuerySet
 from django.db.models.sql.constants import QUERY_TERMS
 from django.http import HttpResponse, HttpResponseNotFound, Http404
+# ``StreamingHttpResponse`` is only available in Django 1.5+.
+try:
+    from django.http.response import HttpResponseBase, StreamingHttpResponse
+except ImportError:
+    HttpResponseBase = StreamingHttpResponse = HttpResponse
 from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.encoding import force_unicode
 from tastypie.authentication import Authentication
 from tastypie.authorization import ReadOnlyAuthorization
 from tastypie.bundle import Bundle
@@ -26,7 +37,8 @@ from tastypie import http
 from tastypie.paginator import Paginator
 from tastypie.serializers import Serializer
 from tastypie.throttle import BaseThrottle
-from tastypie.utils import is_valid_jsonp_callback_value, dict_strip_unicode_keys, trailing_slash
+from tastypie.utils import is_valid_jsonp_callback_value, dict_strip_unicode_keys, trailing_slash, attach_identity_map, get_identity_map, get_dehydration_memo, attach_packed_arrays
+from tastypie.utils.lru import LRUCache
 from tastypie.utils.mime import determine_format, build_content_type
 from tastypie.validation import Validation
 try:
@@ -56,12 +68,23 @@ except ImportError:
     def csrf_exempt(func):
         return func
 
+# ``prefetch_related`` is only available in Django 1.4+.
+try:
+    from django.db.models.query import prefetch_related_objects
+except ImportError:
+    prefetch_related_objects = None
+
 # Django 1.5 has moved this constant up one level.
 try:
     from django.db.models.constants import LOOKUP_SEP
 except ImportError:
     from django.db.models.sql.constants import LOOKUP_SEP
 
+# Stands in for the ``detail_uri_name`` value when building URI templates.
+URI_TEMPLATE_MARKER = 'tastypieuritemplatemarker'
+# Values that ``reverse`` would put into the URI as-is.
+URI_TEMPLATE_SAFE_VALUE = re.compile(r'^[A-Za-z0-9_][A-Za-z0-9_/-]*\Z')
+
 
 class NOT_AVAILABLE:
     def __str__(self):
@@ -102,6 +125,17 @@ class ResourceOptions(object):
     always_return_data = False
     collection_name = 'objects'
     detail_uri_name = 'pk'
+    auto_prefetch = True
+    auto_values = True
+    streaming = False
+    streaming_chunk_size = 100
+    streaming_deserialization = False
+    max_list_body_size = None
+    export_formats = []
+    identity_map = True
+    packed_formats = []
+    cache_responses = False
+    response_cache_ignored_params = ['_']
 
     def __new__(cls, meta=None):
         overrides = {}
@@ -192,6 +226,10 @@ class Resource(object):
 
     def __init__(self, api_name=None):
         self.fields = deepcopy(self.base_fields)
+        self._dehydration_plans = {}
+        self._uri_templates = {}
+        self._values_plans = {}
+        self._bundle_shapes = LRUCache(size=100)
 
         if not api_name is None:
             self._meta.api_name = api_name
@@ -329,7 +367,7 @@ class Resource(object):
         return [
             url(r"^(?P<resource_name>%s)%s$" % (self._meta.resource_name, trailing_slash()), self.wrap_view('dispatch_list'), name="api_dispatch_list"),
             url(r"^(?P<resource_name>%s)/schema%s$" % (self._meta.resource_name, trailing_slash()), self.wrap_view('get_schema'), name="api_get_schema"),
-            url(r"^(?P<resource_name>%s)/set/(?P<%s_list>\w[\w/;-]*)%s$" % (self._meta.resource_name, self._meta.detail_uri_name, trailing_slash()), self.wrap_view('get_multiple'), name="api_get_multiple"),
+            url(r"^(?P<resource_name>%s)/set(?:/(?P<%s_list>\w[\w/;-]*))?%s$" % (self._meta.resource_name, self._meta.detail_uri_name, trailing_slash()), self.wrap_view('get_multiple'), name="api_get_multiple"),
             url(r"^(?P<resource_name>%s)/(?P<%s>\w[\w/-]*)%s$" % (self._meta.resource_name, self._meta.detail_uri_name, trailing_slash()), self.wrap_view('dispatch_detail'), name="api_dispatch_detail"),
         ]
 
@@ -394,8 +432,50 @@ class Resource(object):
 
             options['callback'] = callback
 
+        # Tells row-based formats (i.e. ``csv``) where a list's objects are &
+        # which fields they have.
+        options.setdefault('collection_name', self._meta.collection_name)
+        options.setdefault('field_names', self.get_row_field_names(request))
         return self._meta.serializer.serialize(data, format, options)
 
+    def serialize_stream(self, request, data, format, options=None):
+        """
+        Given a request, data (which may contain iterators) and a desired
+        format, produces an iterator of serialized chunks suitable for a
+        streaming response.
+
+        Mostly a hook, this uses the ``Serializer`` from ``Resource._meta``.
+        """
+        options = options or {}
+
+        if 'text/javascript' in format:
+            # get JSONP callback name. default to "callback"
+            callback = request.GET.get('callback', 'callback')
+
+            if not is_valid_jsonp_callback_value(callback):
+                raise BadRequest('JSONP callback name is invalid.')
+
+            options['callback'] = callback
+
+        options.setdefault('collection_name', self._meta.collection_name)
+        options.setdefault('field_names', self.get_row_field_names(request))
+        return self._meta.serializer.serialize_stream(data, format, options)
+
+    def get_row_field_names(self, request):
+        """
+        Returns the names of the fields a list's objects are dehydrated with
+        in response to ``request`` (just the sparse fields, if any were asked
+        for), so row-based formats (i.e. ``csv``) know their columns before
+        the first object.
+        """
+        try:
+            fields = self.get_sparse_fields(request)
+        except BadRequest:
+            # Only the error about the ``fields`` is being serialized.
+            return []
+
+        return [field_name for field_name, field_object, check, method in self.build_dehydration_plan(for_list=True) if fields is None or field_name in fields]
+
     def deserialize(self, request, data, format='application/json'):
         """
         Given a request, data and a format, deserializes the given data.
@@ -408,6 +488,82 @@ class Resource(object):
         deserialized = self._meta.serializer.deserialize(data, format=request.META.get('CONTENT_TYPE', 'application/json'))
         return deserialized
 
+    def deserialize_stream(self, request, data, format='application/json'):
+        """
+        Given a request, data and a format, returns an iterator of the
+        ``(key, value)`` pairs of the deserialized dictionary, reading the
+        data incrementally where the format allows (see
+        ``Serializer.deserialize_stream``).
+
+        Mostly a hook, this uses the ``Serializer`` from ``Resource._meta``.
+        """
+        return self._meta.serializer.deserialize_stream(data, format=request.META.get('CONTENT_TYPE', 'application/json'))
+
+    def read_streamed_collection(self, pairs, collection_name, deferred=None):
+        """
+        Reads ``pairs`` (from ``deserialize_stream``) up to the one for
+        ``collection_name`` & returns its value (an iterator, where the
+        format is read incrementally), or ``None`` if there's no such pair.
+
+        The values of any pairs named in the ``deferred`` dictionary that are
+        passed along the way are stored in it.
+        """
+        if deferred is None:
+            deferred = {}
+
+        for key, value in pairs:
+            if key == collection_name:
+                return value
+
+            if key in deferred:
+                deferred[key] = list(value)
+
+        return None
+
+    def read_list_body(self, request):
+        """
+        Returns the body of a ``put_list`` or ``patch_list`` request.
+
+        If ``Meta.max_list_body_size`` is set, larger bodies are refused with
+        ``HttpRequestEntityTooLarge`` (413 Request Entity Too Large) before
+        anything is done with them: going by the ``Content-Length`` header if
+        one is sent, otherwise once the body's been read.
+        """
+        max_size = self._meta.max_list_body_size
+
+        if max_size is not None:
+            try:
+                length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except (TypeError, ValueError):
+                length = 0
+
+            if length > max_size:
+                raise ImmediateHttpResponse(response=http.HttpRequestEntityTooLarge())
+
+        if django.VERSION >= (1, 4):
+            body = request.body
+        else:
+            body = request.raw_post_data
+
+        if max_size is not None and len(body) > max_size:
+            raise ImmediateHttpResponse(response=http.HttpRequestEntityTooLarge())
+
+        return body
+
+    def use_streaming_deserialization(self):
+        """
+        Returns whether ``put_list`` & ``patch_list`` should read the request
+        body incrementally.
+
+        Enabled by ``Meta.streaming_deserialization``, as long as
+        ``alter_deserialized_list_data`` (which needs all of the data at
+        once) hasn't been customized.
+        """
+        if not self._meta.streaming_deserialization:
+            return False
+
+        return self.__class__.alter_deserialized_list_data.__func__ is Resource.alter_deserialized_list_data.__func__
+
     def alter_list_data_to_serialize(self, request, data):
         """
         A hook to alter list data just before it gets serialized & sent to the user.
@@ -488,7 +644,31 @@ class Resource(object):
 
         # All clear. Process the request.
         request = convert_post_to_put(request)
-        response = method(request, **kwargs)
+
+        if self._meta.identity_map:
+            # Share loaded model instances for the rest of the request.
+            attach_identity_map(request)
+
+        if self.use_packed_arrays(request):
+            attach_packed_arrays(request)
+
+        response = None
+        cache_key = None
+
+        if self.use_response_cache(request):
+            cache_key = self.generate_response_cache_key(request_type, request, **kwargs)
+            response = self.get_cached_response(cache_key)
+
+        if response is None:
+            response = method(request, **kwargs)
+
+            if cache_key is not None:
+                self.cache_response(cache_key, request, response)
+            elif self._meta.cache_responses and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+                if isinstance(response, HttpResponseBase) and response.status_code < 400:
+                    # Something may have changed, so none of the cached
+                    # responses can be trusted.
+                    self.invalidate_response_cache()
 
         # Add the throttled request.
         self.log_throttled_access(request)
@@ -496,7 +676,7 @@ class Resource(object):
         # If what comes back isn't a ``HttpResponse``, assume that the
         # request was accepted and that some action occurred. This also
         # prevents Django from freaking out.
-        if not isinstance(response, HttpResponse):
+        if not isinstance(response, HttpResponseBase):
             return http.HttpNoContent()
 
         return response
@@ -746,6 +926,106 @@ class Resource(object):
         """
         return obj_list
 
+    def get_sparse_fields(self, request):
+        """
+        Returns the set of field names the client asked for via the
+        ``fields`` parameter (i.e. ``?fields=title,created``), or ``None`` if
+        all fields should be dehydrated.
+
+        Raises ``BadRequest`` if any of the names aren't fields on this
+        resource.
+        """
+        if request is None or not hasattr(request, 'GET'):
+            return None
+
+        requested = request.GET.get('fields', '')
+        fields = set([name.strip() for name in requested.split(',') if name.strip()])
+
+        if not fields:
+            return None
+
+        unknown = sorted([name for name in fields if name not in self.fields])
+
+        if unknown:
+            raise BadRequest("The 'fields' parameter names fields that aren't on this resource: %s." % ', '.join(unknown))
+
+        return fields
+
+    def apply_sparse_fields(self, obj_list, fields=None, for_list=False):
+        """
+        Allows for only the data needed by the requested ``fields`` to be
+        loaded.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        return obj_list
+
+    def apply_prefetch_plan(self, obj_list, for_list=False, fields=None):
+        """
+        Allows for the related data of the objects being returned to be
+        loaded up front, rather than once per object during dehydration.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        return obj_list
+
+    def load_related_pks(self, obj_list, for_list=False, fields=None):
+        """
+        Allows for the keys of the objects related to the current page to be
+        loaded in bulk, rather than once per object during dehydration.
+
+        Should return a list of the objects.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        return obj_list
+
+    def build_values_plan(self, obj_list, for_list=False, fields=None):
+        """
+        Returns a plan for dehydrating ``obj_list`` straight from rows of
+        plain data (see ``full_dehydrate_values``), or ``None`` if the
+        objects need to be dehydrated normally.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        return None
+
+    def apply_values_plan(self, obj_list, plan):
+        """
+        Returns ``obj_list`` as rows of plain data (dictionaries) holding
+        what the ``plan`` needs.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        raise NotImplementedError()
+
+    def full_dehydrate_values(self, row, plan, request=None):
+        """
+        Given a row of plain data from ``apply_values_plan``, builds a
+        ``Bundle`` with the same data ``full_dehydrate`` would have.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        raise NotImplementedError()
+
     def get_bundle_detail_data(self, bundle):
         """
         Convenience method to return the ``detail_uri_name`` attribute off
@@ -808,11 +1088,100 @@ class Resource(object):
         if bundle_or_obj is not None:
             url_name = 'api_dispatch_detail'
 
+        template = self.get_uri_template(url_name, detail=bundle_or_obj is not None)
+
+        if template is not None:
+            if bundle_or_obj is None:
+                return template[0]
+
+            uri = self.fill_uri_template(template, self.detail_uri_kwargs(bundle_or_obj)[self._meta.detail_uri_name])
+
+            if uri is not None:
+                return uri
+
         try:
             return self._build_reverse_url(url_name, kwargs=self.resource_uri_kwargs(bundle_or_obj))
         except NoReverseMatch:
             return ''
 
+    def can_use_uri_templates(self, detail=False):
+        """
+        Returns ``True`` if the URIs for this resource can be built from a
+        template (see ``get_uri_template``).
+
+        That's only the case when the URLs & URI-building methods haven't been
+        customized. As ``detail_uri_kwargs`` has to be implemented at the user
+        level, detail URIs are never built from templates here.
+        """
+        cls = self.__class__
+
+        for method_name in ('resource_uri_kwargs', 'base_urls', 'prepend_urls', 'override_urls'):
+            if getattr(cls, method_name).__func__ is not getattr(Resource, method_name).__func__:
+                return False
+
+        return not detail
+
+    def get_uri_template(self, url_name='api_dispatch_list', detail=False):
+        """
+        Returns a tuple of the pieces of the URI named ``url_name``, which
+        are joined by the ``detail_uri_name`` value for a detail URI.
+
+        The URI is only reversed once (per URLconf, script prefix & namespace)
+        & the template is reused from then on. Returns ``None`` if the URIs for
+        this resource need to be reversed every time.
+        """
+        if not self.can_use_uri_templates(detail=detail):
+            return None
+
+        templates = getattr(self, '_uri_templates', None)
+
+        if templates is None:
+            templates = self._uri_templates = {}
+
+        key = (url_name, detail, self._meta.api_name, getattr(self._meta, 'urlconf_namespace', None), get_urlconf(), get_script_prefix())
+
+        try:
+            return templates[key]
+        except KeyError:
+            pass
+
+        kwargs = self.resource_uri_kwargs()
+
+        if detail:
+            kwargs[self._meta.detail_uri_name] = URI_TEMPLATE_MARKER
+
+        try:
+            uri = self._build_reverse_url(url_name, kwargs=kwargs)
+        except NoReverseMatch:
+            # Don't hold onto failures, the URLconf may not be loaded yet.
+            return None
+
+        template = tuple(uri.split(URI_TEMPLATE_MARKER))
+
+        if len(template) != (2 if detail else 1):
+            template = None
+
+        templates[key] = template
+        return template
+
+    def fill_uri_template(self, template, value):
+        """
+        Builds a detail URI from a ``template`` (see ``get_uri_template``) &
+        the ``detail_uri_name`` value.
+
+        Returns ``None`` if ``value`` is anything ``reverse`` might treat
+        differently (the URI should be reversed instead).
+        """
+        if isinstance(value, (int, long)) and not isinstance(value, bool):
+            value = str(value)
+        elif not isinstance(value, basestring):
+            return None
+
+        if not URI_TEMPLATE_SAFE_VALUE.match(value):
+            return None
+
+        return str(value).join(template)
+
     def get_via_uri(self, uri, request=None):
         """
         This pulls apart the salient bits of the URI and populates the
@@ -823,6 +1192,16 @@ class Resource(object):
         If you need custom behavior based on other portions of the URI,
         simply override this method.
         """
+        bundle = self.build_bundle(request=request)
+        return self.obj_get(bundle=bundle, **self.resolve_uri_kwargs(uri))
+
+    def resolve_uri_kwargs(self, uri):
+        """
+        Resolves the URI & returns the lookup kwargs it holds (less
+        ``api_name``/``resource_name``), as used by ``get_via_uri``.
+
+        Raises ``NotFound`` if the URI doesn't resolve.
+        """
         prefix = get_script_prefix()
         chomped_uri = uri
 
@@ -834,45 +1213,112 @@ class Resource(object):
         except Resolver404:
             raise NotFound("The URL provided '%s' was not a link to a valid resource." % uri)
 
-        bundle = self.build_bundle(request=request)
-        return self.obj_get(bundle=bundle, **self.remove_api_resource_names(kwargs))
+        return self.remove_api_resource_names(kwargs)
+
+    def preload_via_uris(self, request, uris):
+        """
+        A hook to load the objects behind several URIs in one go, ahead of
+        them being fetched one at a time with ``get_via_uri``. ``patch_list``
+        calls it for each chunk of objects it updates.
+
+        By default, does nothing. ``ModelResource`` includes a version that
+        fills the request's identity map.
+        """
+        pass
 
     # Data preparation.
 
-    def full_dehydrate(self, bundle, for_list=False):
+    def build_dehydration_plan(self, for_list=False):
         """
-        Given a bundle with an object instance, extract the information from it
-        to populate the resource.
+        Returns the ordered list of fields used by ``full_dehydrate``.
+
+        Each entry is a ``(field_name, field_object, use_in, method)`` tuple.
+        Fields not used in this mode are left out, ``use_in`` is only
+        present when it's a callable that must be checked per-bundle &
+        ``method`` is the bound ``dehydrate_FOO`` hook (if any).
+
+        Built once per mode & reused for every object dehydrated afterward.
         """
+        try:
+            return self._dehydration_plans[for_list]
+        except KeyError:
+            pass
+
         use_in = ['all', 'list' if for_list else 'detail']
+        plan = []
 
-        # Dehydrate each field.
         for field_name, field_object in self.fields.items():
-            # If it's not for use in this mode, skip
             field_use_in = getattr(field_object, 'use_in', 'all')
+
             if callable(field_use_in):
-                if not field_use_in(bundle):
-                    continue
+                check = field_use_in
+            elif field_use_in in use_in:
+                check = None
             else:
-                if field_use_in not in use_in:
-                    continue
+                # It's not for use in this mode, skip.
+                continue
 
-            # A touch leaky but it makes URI resolution work.
+            # A touch leaky but it makes URI resolution work. Plans are built
+            # on first use, after ``Api.register`` has set the ``api_name``.
             if getattr(field_object, 'dehydrated_type', None) == 'related':
                 field_object.api_name = self._meta.api_name
                 field_object.resource_name = self._meta.resource_name
 
-            bundle.data[field_name] = field_object.dehydrate(bundle, for_list=for_list)
-
-            # Check for an optional method to do further dehydration.
             method = getattr(self, "dehydrate_%s" % field_name, None)
+            plan.append((field_name, field_object, check, method))
+
+        self._dehydration_plans[for_list] = plan
+        return plan
+
+    def full_dehydrate(self, bundle, for_list=False, fields=None):
+        """
+        Given a bundle with an object instance, extract the information from it
+        to populate the resource.
 
+        If ``fields`` is provided, only the fields named in it are
+        dehydrated.
+        """
+        dehydrated = []
+
+        # Dehydrate each field.
+        for field_name, field_object, use_in, method in self.build_dehydration_plan(for_list):
+            if fields is not None and not field_name in fields:
+                continue
+
+            if use_in is not None and not use_in(bundle):
+                continue
+
+            dehydrated.append(field_name)
+            bundle.data[field_name] = field_object.dehydrate(bundle, for_list=for_list)
+
+            # Run the optional method to do further dehydration.
             if method:
                 bundle.data[field_name] = method(bundle)
 
+        bundle.shape = self.get_bundle_shape(tuple(dehydrated))
         bundle = self.dehydrate(bundle)
         return bundle
 
+    def get_bundle_shape(self, field_names):
+        """
+        Returns the shape of the data in bundles where ``field_names`` were
+        dehydrated: a tuple of ``(field_name, dehydrated_type)`` pairs, sorted
+        by name.
+
+        Bundles with the same shape can be serialized the same way, so the
+        ``Serializer`` only works out how to write each value once per shape
+        (see ``JSONEncoder.write_bundle``). Shapes are remembered for the
+        100 most recently used ``field_names``, as ``?fields=`` lets clients
+        pick any number of them.
+        """
+        shape = self._bundle_shapes.get(field_names)
+
+        if shape is None:
+            shape = tuple(sorted([(field_name, getattr(self.fields[field_name], 'dehydrated_type', None)) for field_name in field_names]))
+            self._bundle_shapes.set(field_names, shape)
+
+        return shape
+
     def dehydrate(self, bundle):
         """
         A hook to allow a final manipulation of data once all fields/methods
@@ -1042,60 +1488,202 @@ class Resource(object):
         # Use a list plus a ``.join()`` because it's faster than concatenation.
         return "%s:%s:%s:%s" % (self._meta.api_name, self._meta.resource_name, ':'.join(args), ':'.join(smooshed))
 
-    # Data access methods.
-
-    def get_object_list(self, request):
+    def use_response_cache(self, request):
         """
-        A hook to allow making returning the list of available objects.
-
-        This needs to be implemented at the user level.
+        Whether the response to ``request`` may be served from (& stored in)
+        the response cache. See ``Meta.cache_responses``.
 
-        ``ModelResource`` includes a full working version specific to Django's
-        ``Models``.
+        Only ``GET`` requests are.
         """
-        raise NotImplementedError()
+        return self._meta.cache_responses and request.method == 'GET'
 
-    def apply_authorization_limits(self, request, object_list):
+    def generate_response_cache_key(self, request_type, request, **kwargs):
         """
-        Deprecated.
+        Creates the cache key for the whole response to ``request``.
 
-        FIXME: REMOVE BEFORE 1.0
+        The key covers everything the response depends on: the view's
+        ``kwargs``, the query string (with the parameters sorted & those in
+        ``Meta.response_cache_ignored_params`` left out), the negotiated
+        format, the headers the ``Meta.cache`` varies on (other than
+        ``Accept``, which the format covers) & the authenticated user. It
+        also includes the current ``get_response_cache_version``, so
+        invalidating the cache is a matter of changing that.
+
+        Override this if responses depend on anything else.
         """
-        return self._meta.authorization.apply_limits(request, object_list)
+        ignored = set(self._meta.response_cache_ignored_params)
+        ignored.add('format')
 
-    def can_create(self):
+        if hasattr(request.GET, 'lists'):
+            params = [(key, value) for key, values in request.GET.lists() for value in values if not key in ignored]
+        else:
+            params = [(key, value) for key, value in request.GET.items() if not key in ignored]
+
+        headers = []
+
+        for header in getattr(self._meta.cache, 'varies', []):
+            if header.lower() == 'accept':
+                continue
+
+            meta_key = 'HTTP_%s' % header.upper().replace('-', '_')
+            headers.append((header.lower(), request.META.get(meta_key)))
+
+        user = getattr(request, 'user', None)
+
+        if user is not None and user.is_authenticated():
+            identity = user.pk
+        else:
+            identity = None
+
+        canonical = repr((
+            sorted(kwargs.items()),
+            sorted(params),
+            self.determine_format(request),
+            sorted(headers),
+            identity,
+        ))
+        digest = hashlib.md5(canonical).hexdigest()
+        return self.generate_cache_key('response', request_type, self.get_response_cache_version(), digest)
+
+    def get_response_cache_version(self):
         """
-        Checks to ensure ``post`` is within ``allowed_methods``.
+        Returns the version all of the resource's cached responses are keyed
+        with, picking one if there isn't one in the cache yet.
         """
-        allowed = set(self._meta.list_allowed_methods + self._meta.detail_allowed_methods)
-        return 'post' in allowed
+        version_key = self.generate_cache_key('response_version')
+        version = self._meta.cache.get(version_key)
 
-    def can_update(self):
+        if version is None:
+            version = uuid.uuid4().hex
+            self._meta.cache.set(version_key, version)
+
+        return version
+
+    def invalidate_response_cache(self):
         """
-        Checks to ensure ``put`` is within ``allowed_methods``.
+        Stops all of the resource's cached responses from being used, by
+        changing the version they're keyed with.
 
-        Used when hydrating related data.
+        Called by ``dispatch`` after any successful request that isn't a
+        ``GET``, ``HEAD`` or ``OPTIONS``. Call it yourself if the data changes
+        any other way (or rely on the cache's timeout).
         """
-        allowed = set(self._meta.list_allowed_methods + self._meta.detail_allowed_methods)
-        return 'put' in allowed
+        self._meta.cache.set(self.generate_cache_key('response_version'), uuid.uuid4().hex)
 
-    def can_delete(self):
+    def get_cached_response(self, cache_key):
         """
-        Checks to ensure ``delete`` is within ``allowed_methods``.
+        Rebuilds the response stored by ``cache_response`` under
+        ``cache_key``, or returns ``None`` if there isn't one.
         """
-        allowed = set(self._meta.list_allowed_methods + self._meta.detail_allowed_methods)
-        return 'delete' in allowed
+        cached = self._meta.cache.get(cache_key)
 
-    def apply_filters(self, request, applicable_filters):
-        """
-        A hook to alter how the filters are applied to the object list.
+        if cached is None:
+            return None
 
-        This needs to be implemented at the user level.
+        status_code, content, headers = cached
+        response = HttpResponse(content, status=status_code)
 
-        ``ModelResource`` includes a full working version specific to Django's
-        ``Models``.
+        for header, value in headers:
+            response[header] = value
+
+        return response
+
+    def cache_response(self, cache_key, request, response):
         """
-        raise NotImplementedError()
+        Stores the serialized content, status & headers of ``response``
+        under ``cache_key``, if ``Meta.cache`` considers it ``cacheable``.
+
+        Streamed responses aren't stored.
+        """
+        if not isinstance(response, HttpResponseBase):
+            return False
+
+        if getattr(response, 'streaming', False) or getattr(response, '_base_content_is_iter', False):
+            return False
+
+        if not self._meta.cache.cacheable(request, response):
+            return False
+
+        self._meta.cache.set(cache_key, (response.status_code, response.content, response.items()))
+        return True
+
+    # Data access methods.
+
+    def get_object_list(self, request):
+        """
+        A hook to allow making returning the list of available objects.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        raise NotImplementedError()
+
+    def get_identity_map(self, request):
+        """
+        Returns the ``IdentityMap`` of the model instances already loaded
+        while handling ``request``.
+
+        Returns ``None`` if ``Meta.identity_map`` is disabled or the request
+        didn't come through ``dispatch``.
+        """
+        if not self._meta.identity_map:
+            return None
+
+        return get_identity_map(request)
+
+    def clear_dehydration_memo(self, request):
+        """
+        Forgets the related resources fully dehydrated so far while handling
+        ``request``, so changes to the data are picked up.
+        """
+        memo = get_dehydration_memo(request)
+
+        if memo is not None:
+            memo.clear()
+
+    def apply_authorization_limits(self, request, object_list):
+        """
+        Deprecated.
+
+        FIXME: REMOVE BEFORE 1.0
+        """
+        return self._meta.authorization.apply_limits(request, object_list)
+
+    def can_create(self):
+        """
+        Checks to ensure ``post`` is within ``allowed_methods``.
+        """
+        allowed = set(self._meta.list_allowed_methods + self._meta.detail_allowed_methods)
+        return 'post' in allowed
+
+    def can_update(self):
+        """
+        Checks to ensure ``put`` is within ``allowed_methods``.
+
+        Used when hydrating related data.
+        """
+        allowed = set(self._meta.list_allowed_methods + self._meta.detail_allowed_methods)
+        return 'put' in allowed
+
+    def can_delete(self):
+        """
+        Checks to ensure ``delete`` is within ``allowed_methods``.
+        """
+        allowed = set(self._meta.list_allowed_methods + self._meta.detail_allowed_methods)
+        return 'delete' in allowed
+
+    def apply_filters(self, request, applicable_filters):
+        """
+        A hook to alter how the filters are applied to the object list.
+
+        This needs to be implemented at the user level.
+
+        ``ModelResource`` includes a full working version specific to Django's
+        ``Models``.
+        """
+        raise NotImplementedError()
 
     def obj_get_list(self, bundle, **kwargs):
         """
@@ -1148,6 +1736,77 @@ class Resource(object):
 
         return cached_bundle
 
+    def obj_get_multiple(self, bundle, identifiers):
+        """
+        Fetches the objects on the resource matching the given
+        ``detail_uri_name`` values.
+
+        Returns a dictionary of the objects found, keyed by identifier.
+        Identifiers that don't match an object are left out.
+
+        By default, calls ``obj_get`` once per identifier. ``ModelResource``
+        includes a version specific to Django's ``Models`` that uses a single
+        query.
+        """
+        objects = {}
+
+        for identifier in identifiers:
+            try:
+                objects[identifier] = self.obj_get(bundle=bundle, **{self._meta.detail_uri_name: identifier})
+            except (ObjectDoesNotExist, Unauthorized):
+                pass
+
+        return objects
+
+    def cached_obj_get_multiple(self, bundle, identifiers):
+        """
+        A version of ``obj_get_multiple`` that uses the cache as a means to get
+        commonly-accessed data faster.
+
+        Shares its cache keys with ``cached_obj_get``. All the keys are looked
+        up at once with ``get_many`` & only the misses are passed along to
+        ``obj_get_multiple``. Objects found in the cache are still filtered
+        with ``authorized_read_list`` (see ``get_cached_object_list``), so
+        ones the user can't read are left out, just like uncached ones.
+        """
+        keys = dict((identifier, self.generate_cache_key('detail', **{self._meta.detail_uri_name: identifier})) for identifier in identifiers)
+        cached = self._meta.cache.get_many(keys.values())
+        objects = {}
+        missing = []
+
+        for identifier in identifiers:
+            obj = cached.get(keys[identifier])
+
+            if obj is None:
+                missing.append(identifier)
+            else:
+                objects[identifier] = obj
+
+        if objects:
+            object_list = self.get_cached_object_list(bundle, objects.values())
+            readable = set(getattr(obj, self._meta.detail_uri_name) for obj in self.authorized_read_list(object_list, bundle))
+
+            for identifier, obj in objects.items():
+                if getattr(obj, self._meta.detail_uri_name) not in readable:
+                    del objects[identifier]
+
+        if missing:
+            fetched = self.obj_get_multiple(bundle, missing)
+            self._meta.cache.set_many(dict((keys[identifier], obj) for identifier, obj in fetched.items()))
+            objects.update(fetched)
+
+        return objects
+
+    def get_cached_object_list(self, bundle, objects):
+        """
+        Wraps the objects ``cached_obj_get_multiple`` found in the cache up
+        for ``authorized_read_list``.
+
+        Simply a list by default. ``ModelResource`` includes a version that
+        returns a ``QuerySet``, as its authorization classes expect.
+        """
+        return list(objects)
+
     def obj_create(self, bundle, **kwargs):
         """
         Creates a new object based on the provided data.
@@ -1214,6 +1873,18 @@ class Resource(object):
         serialized = self.serialize(request, data, desired_format)
         return response_class(content=serialized, content_type=build_content_type(desired_format), **response_kwargs)
 
+    def create_streaming_response(self, request, data, response_class=StreamingHttpResponse, **response_kwargs):
+        """
+        Like ``create_response``, but serializes ``data`` as the response is
+        sent (see ``serialize_stream``).
+
+        Note that any errors raised while the response is being sent can no
+        longer be turned into an error response.
+        """
+        desired_format = self.determine_format(request)
+        serialized = self.serialize_stream(request, data, desired_format)
+        return response_class(serialized, content_type=build_content_type(desired_format), **response_kwargs)
+
     def error_response(self, request, errors, response_class=None):
         """
         Extracts the common "which-format/serialize/return-error-response"
@@ -1293,26 +1964,133 @@ class Resource(object):
 
         Should return a HttpResponse (200 OK).
         """
-        # TODO: Uncached for now. Invalidation that works for everyone may be
-        #       impossible.
+        # TODO: Objects are uncached for now. Invalidation that works for
+        #       everyone may be impossible. Whole responses can be cached
+        #       (see ``Meta.cache_responses``).
         base_bundle = self.build_bundle(request=request)
+        fields = self.get_sparse_fields(request)
         objects = self.obj_get_list(bundle=base_bundle, **self.remove_api_resource_names(kwargs))
         sorted_objects = self.apply_sorting(objects, options=request.GET)
+        sorted_objects = self.apply_sparse_fields(sorted_objects, fields=fields, for_list=True)
+        sorted_objects = self.apply_prefetch_plan(sorted_objects, for_list=True, fields=fields)
+        values_plan = self.build_values_plan(sorted_objects, for_list=True, fields=fields)
+
+        if values_plan is not None:
+            sorted_objects = self.apply_values_plan(sorted_objects, values_plan)
+
+        if self.use_export(request):
+            # Stream every object, unpaginated, straight from ``sorted_objects``.
+            to_be_serialized = {
+                self._meta.collection_name: self.iter_dehydrated(request, sorted_objects, for_list=True, fields=fields, values_plan=values_plan),
+            }
+            to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
+            return self.create_streaming_response(request, to_be_serialized)
 
         paginator = self._meta.paginator_class(request.GET, sorted_objects, resource_uri=self.get_resource_uri(), limit=self._meta.limit, max_limit=self._meta.max_limit, collection_name=self._meta.collection_name)
         to_be_serialized = paginator.page()
 
+        if self._meta.streaming:
+            # Dehydrate the bundles as they're serialized.
+            to_be_serialized[self._meta.collection_name] = self.iter_dehydrated(request, to_be_serialized[self._meta.collection_name], for_list=True, fields=fields, values_plan=values_plan)
+            to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
+            return self.create_streaming_response(request, to_be_serialized)
+
         # Dehydrate the bundles in preparation for serialization.
         bundles = []
 
-        for obj in to_be_serialized[self._meta.collection_name]:
-            bundle = self.build_bundle(obj=obj, request=request)
-            bundles.append(self.full_dehydrate(bundle, for_list=True))
+        if values_plan is not None:
+            for row in to_be_serialized[self._meta.collection_name]:
+                bundles.append(self.full_dehydrate_values(row, values_plan, request=request))
+        else:
+            page_objects = self.load_related_pks(to_be_serialized[self._meta.collection_name], for_list=True, fields=fields)
+
+            for obj in page_objects:
+                bundle = self.build_bundle(obj=obj, request=request)
+                bundles.append(self.full_dehydrate(bundle, for_list=True, fields=fields))
 
         to_be_serialized[self._meta.collection_name] = bundles
         to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
         return self.create_response(request, to_be_serialized)
 
+    def use_export(self, request):
+        """
+        Whether ``get_list`` should stream every matching object (without
+        pagination) in response to ``request``.
+
+        True when the requested format is one of ``Meta.export_formats``.
+        """
+        if not self._meta.export_formats:
+            return False
+
+        desired_format = self.determine_format(request)
+        return self._meta.serializer.serialize_formats.get(desired_format) in self._meta.export_formats
+
+    def use_packed_arrays(self, request):
+        """
+        Whether ``ListFields`` with a ``typecode`` should be dehydrated as
+        ``PackedArrays`` in response to ``request``.
+
+        True when the request has a ``packed`` parameter of ``true`` (or
+        ``1``), or the requested format is one of ``Meta.packed_formats``
+        (unless ``packed`` is given as anything else).
+        """
+        packed = request.GET.get('packed')
+
+        if packed is not None:
+            return packed.lower() in ('true', '1')
+
+        if not self._meta.packed_formats:
+            return False
+
+        desired_format = self.determine_format(request)
+        return self._meta.serializer.serialize_formats.get(desired_format) in self._meta.packed_formats
+
+    def iter_dehydrated(self, request, obj_list, for_list=True, fields=None, values_plan=None):
+        """
+        Yields a fully dehydrated bundle for each object in ``obj_list``.
+
+        Objects are fetched & dehydrated ``Meta.streaming_chunk_size`` at a
+        time (see ``iter_object_chunks``), so only one chunk is held in
+        memory at once. The related objects loaded & fully dehydrated for a
+        chunk are forgotten once it's done, as well.
+
+        If a ``values_plan`` is provided, ``obj_list`` holds rows of plain
+        data that are dehydrated with ``full_dehydrate_values`` instead.
+        """
+        for chunk in self.iter_object_chunks(obj_list):
+            if values_plan is not None:
+                for row in chunk:
+                    yield self.full_dehydrate_values(row, values_plan, request=request)
+            else:
+                chunk = self.load_related_pks(chunk, for_list=for_list, fields=fields)
+
+                for obj in chunk:
+                    bundle = self.build_bundle(obj=obj, request=request)
+                    yield self.full_dehydrate(bundle, for_list=for_list, fields=fields)
+
+            self.clear_dehydration_memo(request)
+            identity_map = self.get_identity_map(request)
+
+            if identity_map is not None:
+                identity_map.clear()
+
+    def iter_object_chunks(self, obj_list):
+        """
+        Yields lists of up to ``Meta.streaming_chunk_size`` objects from
+        ``obj_list``.
+        """
+        chunk = []
+
+        for obj in obj_list:
+            chunk.append(obj)
+
+            if len(chunk) >= self._meta.streaming_chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
     def get_detail(self, request, **kwargs):
         """
         Returns a single serialized resource.
@@ -1323,6 +2101,7 @@ class Resource(object):
         Should return a HttpResponse (200 OK).
         """
         basic_bundle = self.build_bundle(request=request)
+        fields = self.get_sparse_fields(request)
 
         try:
             obj = self.cached_obj_get(bundle=basic_bundle, **self.remove_api_resource_names(kwargs))
@@ -1332,7 +2111,7 @@ class Resource(object):
             return http.HttpMultipleChoices("More than one resource is found at this URI.")
 
         bundle = self.build_bundle(obj=obj, request=request)
-        bundle = self.full_dehydrate(bundle)
+        bundle = self.full_dehydrate(bundle, fields=fields)
         bundle = self.alter_detail_data_to_serialize(request, bundle)
         return self.create_response(request, bundle)
 
@@ -1387,32 +2166,45 @@ class Resource(object):
 
         Return ``HttpAccepted`` (202 Accepted) if
         ``Meta.always_return_data = True``.
+
+        With ``Meta.streaming_deserialization``, the collection is cleared
+        before the rest of the body has been read, so invalid data part way
+        through is only found afterward. ``rollback`` removes the objects
+        created so far, but restoring the deleted ones needs a transaction
+        (as ``ModelResource`` uses).
         """
-        if django.VERSION >= (1, 4):
-            body = request.body
+        body = self.read_list_body(request)
+
+        if self.use_streaming_deserialization():
+            pairs = self.deserialize_stream(request, body, format=request.META.get('CONTENT_TYPE', 'application/json'))
+            collection = self.read_streamed_collection(pairs, self._meta.collection_name)
+
+            if collection is None:
+                raise BadRequest("Invalid data sent.")
         else:
-            body = request.raw_post_data
-        deserialized = self.deserialize(request, body, format=request.META.get('CONTENT_TYPE', 'application/json'))
-        deserialized = self.alter_deserialized_list_data(request, deserialized)
+            deserialized = self.deserialize(request, body, format=request.META.get('CONTENT_TYPE', 'application/json'))
+            deserialized = self.alter_deserialized_list_data(request, deserialized)
 
-        if not self._meta.collection_name in deserialized:
-            raise BadRequest("Invalid data sent.")
+            if not self._meta.collection_name in deserialized:
+                raise BadRequest("Invalid data sent.")
+
+            collection = deserialized[self._meta.collection_name]
 
         basic_bundle = self.build_bundle(request=request)
         self.obj_delete_list_for_update(bundle=basic_bundle, **self.remove_api_resource_names(kwargs))
         bundles_seen = []
 
-        for object_data in deserialized[self._meta.collection_name]:
-            bundle = self.build_bundle(data=dict_strip_unicode_keys(object_data), request=request)
-
-            # Attempt to be transactional, deleting any previously created
-            # objects if validation fails.
-            try:
+        # Attempt to be transactional, deleting any previously created
+        # objects if validation (or, when streaming, reading the rest of the
+        # data) fails.
+        try:
+            for object_data in collection:
+                bundle = self.build_bundle(data=dict_strip_unicode_keys(object_data), request=request)
                 self.obj_create(bundle=bundle, **self.remove_api_resource_names(kwargs))
                 bundles_seen.append(bundle)
-            except ImmediateHttpResponse:
-                self.rollback(bundles_seen)
-                raise
+        except (ImmediateHttpResponse, BadRequest):
+            self.rollback(bundles_seen)
+            raise
 
         if not self._meta.always_return_data:
             return http.HttpNoContent()
@@ -1552,63 +2344,89 @@ class Resource(object):
         Substitute appropriate names for ``objects`` and
         ``deleted_objects`` if ``Meta.collection_name`` is set to something
         other than ``objects`` (default).
+
+        Objects are handled ``Meta.streaming_chunk_size`` at a time, with
+        ``preload_via_uris`` called for the URIs in each chunk.
         """
         request = convert_post_to_patch(request)
-        if django.VERSION >= (1, 4):
-            body = request.body
-        else:
-            body = request.raw_post_data
-        deserialized = self.deserialize(request, body, format=request.META.get('CONTENT_TYPE', 'application/json'))
+        body = self.read_list_body(request)
 
         collection_name = self._meta.collection_name
         deleted_collection_name = 'deleted_%s' % collection_name
-        if collection_name not in deserialized:
-            raise BadRequest("Invalid data sent: missing '%s'" % collection_name)
 
-        if len(deserialized[collection_name]) and 'put' not in self._meta.detail_allowed_methods:
-            raise ImmediateHttpResponse(response=http.HttpMethodNotAllowed())
+        if self.use_streaming_deserialization():
+            # The deleted objects are only handled after the others, so if
+            # they come first they're kept until then.
+            pairs = self.deserialize_stream(request, body, format=request.META.get('CONTENT_TYPE', 'application/json'))
+            deferred = {deleted_collection_name: []}
+            collection = self.read_streamed_collection(pairs, collection_name, deferred)
 
-        bundles_seen = []
+            if collection is None:
+                raise BadRequest("Invalid data sent: missing '%s'" % collection_name)
+        else:
+            deserialized = self.deserialize(request, body, format=request.META.get('CONTENT_TYPE', 'application/json'))
 
-        for data in deserialized[collection_name]:
-            # If there's a resource_uri then this is either an
-            # update-in-place or a create-via-PUT.
-            if "resource_uri" in data:
-                uri = data.pop('resource_uri')
+            if collection_name not in deserialized:
+                raise BadRequest("Invalid data sent: missing '%s'" % collection_name)
 
-                try:
-                    obj = self.get_via_uri(uri, request=request)
+            pairs = iter([])
+            deferred = {deleted_collection_name: deserialized.get(deleted_collection_name, [])}
+            collection = deserialized[collection_name]
 
-                    # The object does exist, so this is an update-in-place.
-                    bundle = self.build_bundle(obj=obj, request=request)
-                    bundle = self.full_dehydrate(bundle, for_list=True)
-                    bundle = self.alter_detail_data_to_serialize(request, bundle)
-                    self.update_in_place(request, bundle, data)
-                except (ObjectDoesNotExist, MultipleObjectsReturned):
-                    # The object referenced by resource_uri doesn't exist,
-                    # so this is a create-by-PUT equivalent.
+        bundles_seen = []
+
+        # The objects are handled a chunk at a time, so the existing objects
+        # a chunk refers to can be loaded together.
+        for chunk in self.iter_object_chunks(collection):
+            if 'put' not in self._meta.detail_allowed_methods:
+                raise ImmediateHttpResponse(response=http.HttpMethodNotAllowed())
+
+            self.preload_via_uris(request, [data['resource_uri'] for data in chunk if isinstance(data, dict) and 'resource_uri' in data])
+
+            for data in chunk:
+                # If there's a resource_uri then this is either an
+                # update-in-place or a create-via-PUT.
+                if "resource_uri" in data:
+                    uri = data.pop('resource_uri')
+
+                    try:
+                        obj = self.get_via_uri(uri, request=request)
+
+                        # The object does exist, so this is an update-in-place.
+                        bundle = self.build_bundle(obj=obj, request=request)
+                        bundle = self.full_dehydrate(bundle, for_list=True)
+                        bundle = self.alter_detail_data_to_serialize(request, bundle)
+                        self.update_in_place(request, bundle, data)
+                    except (ObjectDoesNotExist, MultipleObjectsReturned):
+                        # The object referenced by resource_uri doesn't exist,
+                        # so this is a create-by-PUT equivalent.
+                        data = self.alter_deserialized_detail_data(request, data)
+                        bundle = self.build_bundle(data=dict_strip_unicode_keys(data), request=request)
+                        self.obj_create(bundle=bundle)
+                else:
+                    # There's no resource URI, so this is a create call just
+                    # like a POST to the list resource.
                     data = self.alter_deserialized_detail_data(request, data)
                     bundle = self.build_bundle(data=dict_strip_unicode_keys(data), request=request)
                     self.obj_create(bundle=bundle)
-            else:
-                # There's no resource URI, so this is a create call just
-                # like a POST to the list resource.
-                data = self.alter_deserialized_detail_data(request, data)
-                bundle = self.build_bundle(data=dict_strip_unicode_keys(data), request=request)
-                self.obj_create(bundle=bundle)
 
-            bundles_seen.append(bundle)
+                bundles_seen.append(bundle)
 
-        deleted_collection = deserialized.get(deleted_collection_name, [])
+        # Picks up the deleted objects if they came after the others.
+        self.read_streamed_collection(pairs, None, deferred)
+        deleted_collection = deferred[deleted_collection_name]
 
         if deleted_collection:
             if 'delete' not in self._meta.detail_allowed_methods:
                 raise ImmediateHttpResponse(response=http.HttpMethodNotAllowed())
 
-            for uri in deleted_collection:
-                obj = self.get_via_uri(uri, request=request)
-                bundle = self.build_bundle(obj=obj, request=request)
-                self.obj_delete(bundle=bundle)
+            for chunk in self.iter_object_chunks(deleted_collection):
+                self.preload_via_uris(request, chunk)
+
+                for uri in chunk:
+                    obj = self.get_via_uri(uri, request=request)
+                    bundle = self.build_bundle(obj=obj, request=request)
+                    self.obj_delete(bundle=bundle)
 
         if not self._meta.always_return_data:
             return http.HttpAccepted()
@@ -1700,30 +2518,41 @@ class Resource(object):
         Returns a serialized list of resources based on the identifiers
         from the URL.
 
-        Calls ``obj_get`` to fetch only the objects requested. This method
-        only responds to HTTP GET.
+        Calls ``cached_obj_get_multiple`` to fetch only the objects requested,
+        in one go. This method responds to HTTP GET & to HTTP POST, for
+        lists of identifiers too long to fit in a URL. A POST body should
+        hold the identifiers as a list under ``<detail_uri_name>_list``
+        (e.g. ``{"pk_list": [1, 2, 3]}``).
 
         Should return a HttpResponse (200 OK).
         """
-        self.method_check(request, allowed=['get'])
+        self.method_check(request, allowed=['get', 'post'])
         self.is_authenticated(request)
         self.throttle_check(request)
 
         # Rip apart the list then iterate.
         kwarg_name = '%s_list' % self._meta.detail_uri_name
-        obj_identifiers = kwargs.get(kwarg_name, '').split(';')
+
+        if request.method == 'POST':
+            obj_identifiers = self.get_posted_identifiers(request, kwarg_name)
+        else:
+            obj_identifiers = (kwargs.get(kwarg_name) or '').split(';')
+
         objects = []
         not_found = []
         base_bundle = self.build_bundle(request=request)
+        fields = self.get_sparse_fields(request)
+        found = self.cached_obj_get_multiple(bundle=base_bundle, identifiers=obj_identifiers)
+        self.load_related_pks(found.values(), for_list=True, fields=fields)
 
         for identifier in obj_identifiers:
-            try:
-                obj = self.obj_get(bundle=base_bundle, **{self._meta.detail_uri_name: identifier})
-                bundle = self.build_bundle(obj=obj, request=request)
-                bundle = self.full_dehydrate(bundle, for_list=True)
-                objects.append(bundle)
-            except (ObjectDoesNotExist, Unauthorized):
+            if not identifier in found:
                 not_found.append(identifier)
+                continue
+
+            bundle = self.build_bundle(obj=found[identifier], request=request)
+            bundle = self.full_dehydrate(bundle, for_list=True, fields=fields)
+            objects.append(bundle)
 
         object_list = {
             self._meta.collection_name: objects,
@@ -1735,6 +2564,25 @@ class Resource(object):
         self.log_throttled_access(request)
         return self.create_response(request, object_list)
 
+    def get_posted_identifiers(self, request, kwarg_name):
+        """
+        Pulls the list of identifiers for ``get_multiple`` out of the body
+        of a POST request.
+
+        Raises ``BadRequest`` if the body doesn't hold a list of them.
+        """
+        if django.VERSION >= (1, 4):
+            body = request.body
+        else:
+            body = request.raw_post_data
+
+        deserialized = self.deserialize(request, body, format=request.META.get('CONTENT_TYPE', 'application/json'))
+
+        if not isinstance(deserialized, dict) or not isinstance(deserialized.get(kwarg_name), (list, tuple)):
+            raise BadRequest("The body must hold a list of identifiers under '%s'." % kwarg_name)
+
+        return [u'%s' % identifier for identifier in deserialized[kwarg_name]]
+
 
 class ModelDeclarativeMetaclass(DeclarativeMetaclass):
     def __new__(cls, name, bases, attrs):
@@ -2074,6 +2922,418 @@ class ModelResource(Resource):
 
         return obj_list.order_by(*order_by_args)
 
+    def build_prefetch_plan(self, for_list=False, fields=None):
+        """
+        Inspects the related fields on the resource (descending into any
+        related resources that will be fully dehydrated) & returns a
+        dictionary of the ``select_related`` & ``prefetch_related`` lookups
+        needed to avoid a query per object during ``full_dehydrate``.
+
+        If ``fields`` is provided, only the fields named in it (at the top
+        level) are considered.
+
+        Mostly useful for seeing what ``apply_prefetch_plan`` will do.
+        """
+        select_related = set()
+        prefetch_related = set()
+        self._collect_prefetch_lookups(select_related, prefetch_related, for_list=for_list, fields=fields)
+        return {
+            'select_related': sorted(select_related),
+            'prefetch_related': sorted(prefetch_related),
+        }
+
+    def _collect_prefetch_lookups(self, select_related, prefetch_related, for_list=False, prefix='', selectable=True, seen=None, fields=None):
+        seen = set(seen or [])
+        seen.add(self.__class__)
+        use_in = ['all', 'list' if for_list else 'detail']
+
+        for field_name, field_object in self.fields.items():
+            if fields is not None and not field_name in fields:
+                continue
+
+            if not callable(field_object.use_in) and not field_object.use_in in use_in:
+                continue
+
+            if not isinstance(field_object.attribute, basestring):
+                continue
+
+            is_related = getattr(field_object, 'is_related', False)
+            attrs = field_object.attribute.split(LOOKUP_SEP)
+
+            if not is_related:
+                # The last bit is the data itself, not a relation.
+                attrs = attrs[:-1]
+
+            model = self._meta.object_class
+            path = []
+            path_selectable = selectable
+
+            for attr in attrs:
+                model, single = self._follow_relation(model, attr)
+
+                if model is None:
+                    break
+
+                path.append(attr)
+                path_selectable = path_selectable and single
+
+            if not path:
+                continue
+
+            # URI-only foreign keys are built from the key's column alone.
+            if hasattr(field_object, 'get_uri_foreign_key') and field_object.get_uri_foreign_key(self._meta.object_class, for_list=for_list) is not None:
+                continue
+
+            # URI-only to-many relations on the page are handled by
+            # ``load_related_pks``.
+            if not prefix and hasattr(field_object, 'get_pk_relation') and field_object.get_pk_relation(self._meta.object_class, for_list=for_list) is not None:
+                continue
+
+            lookup = prefix + LOOKUP_SEP.join(path)
+
+            if path_selectable:
+                select_related.add(lookup)
+            else:
+                prefetch_related.add(lookup)
+
+            # Only descend if the whole ``attribute`` was a relation & the
+            # related resource will be dehydrated in full.
+            if not is_related or len(path) != len(attrs):
+                continue
+
+            if not field_object.full:
+                continue
+
+            full_in_mode = field_object.full_list if for_list else field_object.full_detail
+
+            if not full_in_mode:
+                continue
+
+            related_class = field_object.to_class
+
+            if related_class in seen or not hasattr(related_class, '_collect_prefetch_lookups'):
+                continue
+
+            # Related resources are always fully dehydrated as a detail.
+            field_object.get_pooled_resource(related_class)._collect_prefetch_lookups(select_related, prefetch_related, for_list=False, prefix=lookup + LOOKUP_SEP, selectable=path_selectable, seen=seen)
+
+    def _follow_relation(self, model, attr):
+        """
+        Returns the model found by following ``attr`` off of ``model`` and
+        whether it can be followed with ``select_related``.
+
+        If ``attr`` isn't a relation, returns ``(None, False)``.
+        """
+        if model is None:
+            return None, False
+
+        opts = model._meta
+
+        for field in opts.fields:
+            if field.name == attr:
+                if getattr(field, 'rel', None) is None:
+                    return None, False
+
+                return field.rel.to, True
+
+        for field in opts.many_to_many:
+            if field.name == attr:
+                return field.rel.to, False
+
+        for related in opts.get_all_related_objects() + opts.get_all_related_many_to_many_objects():
+            if related.get_accessor_name() == attr:
+                return related.model, False
+
+        return None, False
+
+    def apply_prefetch_plan(self, obj_list, for_list=False, fields=None):
+        """
+        An ORM-specific implementation of ``apply_prefetch_plan``.
+
+        Applies the lookups from ``build_prefetch_plan`` to the provided
+        ``QuerySet``. Disabled by setting ``Meta.auto_prefetch = False``.
+        """
+        if not self._meta.auto_prefetch:
+            return obj_list
+
+        plan = self.build_prefetch_plan(for_list=for_list, fields=fields)
+
+        if plan['select_related'] and hasattr(obj_list, 'select_related'):
+            obj_list = obj_list.select_related(*plan['select_related'])
+
+        # ``prefetch_related`` is only available in Django 1.4+.
+        if plan['prefetch_related'] and hasattr(obj_list, 'prefetch_related'):
+            obj_list = obj_list.prefetch_related(*plan['prefetch_related'])
+
+        return obj_list
+
+    def apply_sparse_fields(self, obj_list, fields=None, for_list=False):
+        """
+        An ORM-specific implementation of ``apply_sparse_fields``.
+
+        Narrows the ``QuerySet`` down to the columns the requested ``fields``
+        need with ``only``. If any of them might need other data (a callable
+        ``attribute``, a ``dehydrate_FOO`` method, a custom ``dehydrate``...),
+        the ``QuerySet`` is left alone rather than risk a query per object.
+        """
+        if fields is None or not hasattr(obj_list, 'only'):
+            return obj_list
+
+        columns = self.get_sparse_columns(fields, for_list=for_list)
+
+        if columns is None:
+            return obj_list
+
+        # Django won't defer a key that's explicitly ``select_related``.
+        select_related = getattr(getattr(obj_list, 'query', None), 'select_related', None)
+
+        if isinstance(select_related, dict):
+            columns = sorted(set(columns) | set(select_related.keys()))
+
+        return obj_list.only(*columns)
+
+    def get_sparse_columns(self, fields, for_list=False):
+        """
+        Returns the names of the model fields needed to dehydrate the given
+        ``fields``, or ``None`` if that can't be determined.
+        """
+        if self.__class__.dehydrate.__func__ is not Resource.dehydrate.__func__:
+            return None
+
+        model = self._meta.object_class
+        opts = model._meta
+        concrete = set([field.name for field in opts.fields])
+        columns = set([opts.pk.name])
+
+        for field_name, field_object, check, method in self.build_dehydration_plan(for_list=for_list):
+            if not field_name in fields:
+                continue
+
+            if field_name == 'resource_uri' and self.__class__.dehydrate_resource_uri.__func__ is Resource.dehydrate_resource_uri.__func__:
+                if self._meta.detail_uri_name in concrete:
+                    columns.add(self._meta.detail_uri_name)
+                elif self._meta.detail_uri_name != 'pk':
+                    return None
+
+                continue
+
+            if method is not None or not isinstance(field_object.attribute, basestring):
+                return None
+
+            attr = field_object.attribute.split(LOOKUP_SEP)[0]
+
+            if attr in concrete:
+                columns.add(attr)
+            elif self._follow_relation(model, attr)[0] is None:
+                # Could be a property or method using anything on the model.
+                return None
+
+        return sorted(columns)
+
+    def load_related_pks(self, obj_list, for_list=False, fields=None):
+        """
+        An ORM-specific implementation of ``load_related_pks``.
+
+        For each ``ToManyField`` that only needs the related URIs, fetches
+        the related primary keys for every object in ``obj_list`` with a
+        single query & stores them on the objects for ``dehydrate`` to use.
+        Disabled by setting ``Meta.auto_prefetch = False``.
+        """
+        obj_list = list(obj_list)
+
+        if not self._meta.auto_prefetch:
+            return obj_list
+
+        objects = [obj for obj in obj_list if getattr(obj, 'pk', None) is not None]
+
+        if not objects:
+            return obj_list
+
+        model = self._meta.object_class
+        pks = [obj.pk for obj in objects]
+
+        for field_name, field_object, check, method in self.build_dehydration_plan(for_list=for_list):
+            if fields is not None and not field_name in fields:
+                continue
+
+            if not hasattr(field_object, 'get_pk_relation'):
+                continue
+
+            relation = field_object.get_pk_relation(model, for_list=for_list)
+
+            if relation is None:
+                continue
+
+            related_model, lookup = relation
+            related_pks = dict((pk, []) for pk in pks)
+
+            # Keep well under the bound-parameter limits of some backends.
+            for offset in range(0, len(pks), 500):
+                filters = {"%s__in" % lookup: pks[offset:offset + 500]}
+                rows = related_model._default_manager.filter(**filters).values_list(lookup, 'pk')
+
+                for obj_pk, related_pk in rows:
+                    related_pks[obj_pk].append(related_pk)
+
+            for obj in objects:
+                if not hasattr(obj, '_related_pks_cache'):
+                    obj._related_pks_cache = {}
+
+                obj._related_pks_cache[field_object.attribute] = related_pks[obj.pk]
+
+        return obj_list
+
+    def build_values_plan(self, obj_list, for_list=False, fields=None):
+        """
+        An ORM-specific implementation of ``build_values_plan``.
+
+        Only resources where every field being dehydrated is a plain column
+        of the model (no related fields, ``dehydrate_FOO`` methods, callable
+        ``use_in`` or custom ``dehydrate``) qualify & ``obj_list`` must be a
+        ``QuerySet`` without any ``prefetch_related`` lookups. Disabled by
+        setting ``Meta.auto_values = False``.
+
+        The plan is a list of ``(field_name, field_object, column)`` tuples,
+        where ``field_object`` is ``None`` for the ``resource_uri``.
+        """
+        if not self._meta.auto_values:
+            return None
+
+        if not isinstance(obj_list, QuerySet) or isinstance(obj_list, ValuesQuerySet):
+            return None
+
+        if getattr(obj_list, '_prefetch_related_lookups', None):
+            return None
+
+        plans = getattr(self, '_values_plans', None)
+
+        if plans is None:
+            plans = self._values_plans = {}
+
+        if fields is None and for_list in plans:
+            return plans[for_list]
+
+        plan = self._build_values_plan(for_list, field_names=fields)
+
+        if fields is None:
+            plans[for_list] = plan
+
+        return plan
+
+    def _build_values_plan(self, for_list=False, field_names=None):
+        cls = self.__class__
+
+        for method_name in ('build_bundle', 'full_dehydrate', 'dehydrate', 'alter_list_data_to_serialize'):
+            if getattr(cls, method_name).__func__ is not getattr(Resource, method_name).__func__:
+                return None
+
+        opts = self._meta.object_class._meta
+        concrete = dict((field.name, field) for field in opts.fields)
+        plan = []
+
+        for field_name, field_object, check, method in self.build_dehydration_plan(for_list=for_list):
+            if field_names is not None and not field_name in field_names:
+                continue
+
+            if check is not None:
+                return None
+
+            if field_name == 'resource_uri' and cls.dehydrate_resource_uri.__func__ is Resource.dehydrate_resource_uri.__func__:
+                if self._meta.detail_uri_name == 'pk':
+                    target = opts.pk
+                else:
+                    target = concrete.get(self._meta.detail_uri_name)
+
+                if target is None or target.rel is not None or not self._can_build_uri_from(target):
+                    return None
+
+                plan.append((field_name, None, target.name))
+                continue
+
+            if method is not None or getattr(field_object, 'is_related', False):
+                return None
+
+            # Custom fields may do anything with the object. ``ListField``
+            # only packs the value, which ``full_dehydrate_values`` does too.
+            if type(field_object).dehydrate.__func__ not in (fields.ApiField.dehydrate.__func__, fields.ListField.dehydrate.__func__):
+                return None
+
+            model_field = concrete.get(field_object.attribute)
+
+            # Only Django's own column types come back from ``values`` as
+            # the same value the model instance would have held (files,
+            # geometries & custom fields are converted on the instance).
+            if model_field is None or model_field.rel is not None or type(model_field).__module__ != 'django.db.models.fields':
+                return None
+
+            plan.append((field_name, field_object, model_field.name))
+
+        return plan
+
+    def apply_values_plan(self, obj_list, plan):
+        """
+        An ORM-specific implementation of ``apply_values_plan``.
+
+        Turns the ``QuerySet`` into a ``ValuesQuerySet`` of just the columns
+        the ``plan`` needs.
+        """
+        columns = sorted(set([column for field_name, field_object, column in plan]))
+        return obj_list.values(*columns)
+
+    def full_dehydrate_values(self, row, plan, request=None):
+        """
+        An ORM-specific implementation of ``full_dehydrate_values``.
+
+        Runs each column through its field's ``convert`` (with the same
+        ``default``/``null`` handling as ``ApiField.dehydrate``), skipping
+        building the model instance altogether. ``ListFields`` are packed
+        as ``ListField.dehydrate`` would. The ``Bundle`` has no ``obj``.
+        """
+        data = {}
+
+        for field_name, field_object, column in plan:
+            value = row[column]
+
+            if field_object is None:
+                data[field_name] = self.get_resource_uri_from_value(value)
+                continue
+
+            if value is None:
+                if field_object.has_default():
+                    value = field_object._default
+
+                    if callable(value):
+                        value = value()
+                elif not field_object.null:
+                    raise fields.ApiFieldError("The object '%r' has an empty attribute '%s' and doesn't allow a default or null value." % (row, column))
+
+            data[field_name] = field_object.convert(value)
+
+            if isinstance(field_object, fields.ListField):
+                data[field_name] = field_object.pack(data[field_name], request)
+
+        bundle = Bundle(data=data, request=request)
+        bundle.shape = self.get_bundle_shape(tuple([field_name for field_name, field_object, column in plan]))
+        return bundle
+
+    def iter_object_chunks(self, obj_list):
+        """
+        An ORM-specific implementation of ``iter_object_chunks``.
+
+        Uses ``QuerySet.iterator`` so the results aren't cached, applying any
+        ``prefetch_related`` lookups to each chunk instead.
+        """
+        lookups = getattr(obj_list, '_prefetch_related_lookups', None)
+
+        if hasattr(obj_list, 'iterator'):
+            obj_list = obj_list.iterator()
+
+        for chunk in super(ModelResource, self).iter_object_chunks(obj_list):
+            if lookups:
+                prefetch_related_objects(chunk, lookups)
+
+            yield chunk
+
     def apply_filters(self, request, applicable_filters):
         """
         An ORM-specific implementation of ``apply_filters``.
@@ -2120,22 +3380,215 @@ class ModelResource(Resource):
 
         Takes optional ``kwargs``, which are used to narrow the query to find
         the instance.
+
+        Lookups by primary key are answered from the request's identity map
+        when the object has already been loaded. Otherwise, at most two rows
+        are fetched.
         """
+        identity_map = self.get_identity_map(bundle.request)
+        pk = self.get_identity_pk(kwargs)
+
+        if identity_map is not None and pk is not None:
+            obj = identity_map.get(self._meta.object_class, pk)
+
+            if obj is not None:
+                bundle.obj = obj
+                self.authorized_read_detail(self.get_cached_object_list(bundle, [obj]), bundle)
+                return bundle.obj
+
         try:
             object_list = self.get_object_list(bundle.request).filter(**kwargs)
             stringified_kwargs = ', '.join(["%s=%s" % (k, v) for k, v in kwargs.items()])
 
-            if len(object_list) <= 0:
+            # Two rows are enough to tell "exactly one" from "more than one".
+            matches = list(object_list[:2])
+
+            if len(matches) <= 0:
                 raise self._meta.object_class.DoesNotExist("Couldn't find an instance of '%s' which matched '%s'." % (self._meta.object_class.__name__, stringified_kwargs))
-            elif len(object_list) > 1:
+            elif len(matches) > 1:
                 raise MultipleObjectsReturned("More than '%s' matched '%s'." % (self._meta.object_class.__name__, stringified_kwargs))
 
-            bundle.obj = object_list[0]
+            bundle.obj = matches[0]
             self.authorized_read_detail(object_list, bundle)
+
+            if identity_map is not None:
+                identity_map.add(bundle.obj)
+
             return bundle.obj
         except ValueError:
             raise NotFound("Invalid resource lookup data provided (mismatched type).")
 
+    def get_identity_pk(self, kwargs):
+        """
+        Returns the primary key ``obj_get`` is being asked for, if ``kwargs``
+        is a plain primary key lookup the identity map can answer. Otherwise
+        returns ``None``.
+
+        Objects in the identity map skip the ``get_object_list`` query, so
+        it's only used when neither ``get_object_list`` nor ``Meta.queryset``
+        narrow down the rows.
+        """
+        if len(kwargs) != 1:
+            return None
+
+        name, value = kwargs.items()[0]
+        pk = self._meta.object_class._meta.pk
+
+        if not name in ('pk', pk.name, pk.attname):
+            return None
+
+        if self.__class__.get_object_list.__func__ is not ModelResource.get_object_list.__func__:
+            return None
+
+        if self._meta.queryset is None or self._meta.queryset.query.where:
+            return None
+
+        return value
+
+    def preload_via_uris(self, request, uris):
+        """
+        A ORM-specific implementation of ``preload_via_uris``.
+
+        Fetches the objects behind primary key URIs with ``obj_get_multiple``
+        (a single query), adding them to the request's identity map for
+        ``obj_get`` to find.
+
+        Does nothing without an identity map, or if ``get_via_uri`` or
+        ``obj_get`` have been customized.
+        """
+        if self.get_identity_map(request) is None:
+            return
+
+        if self.__class__.get_via_uri.__func__ is not Resource.get_via_uri.__func__:
+            return
+
+        if self.__class__.obj_get.__func__ is not ModelResource.obj_get.__func__:
+            return
+
+        identifiers = []
+
+        for uri in uris:
+            if not isinstance(uri, basestring):
+                continue
+
+            try:
+                kwargs = self.resolve_uri_kwargs(uri)
+            except NotFound:
+                continue
+
+            if kwargs.keys() == [self._meta.detail_uri_name] and self.get_identity_pk(kwargs) is not None:
+                identifiers.append(kwargs[self._meta.detail_uri_name])
+
+        # A single object is no cheaper to load ahead of time.
+        if len(identifiers) < 2:
+            return
+
+        try:
+            self.obj_get_multiple(self.build_bundle(request=request), identifiers)
+        except (NotFound, ImmediateHttpResponse):
+            # The objects will still be looked up one at a time.
+            pass
+
+    def get_cached_object_list(self, bundle, objects):
+        """
+        A ORM-specific implementation of ``get_cached_object_list``.
+
+        Returns a ``QuerySet`` limited to the cached objects, with its results
+        already filled in from them. Authorization that returns it as-is
+        costs no query; authorization that filters it runs just that query.
+
+        ``obj_get`` uses it for objects found in the identity map, too.
+        """
+        objects = list(objects)
+        object_list = self.get_object_list(bundle.request).filter(pk__in=[obj.pk for obj in objects])
+        object_list._result_cache = objects
+        object_list._prefetch_done = True
+        return object_list
+
+    def obj_get_multiple(self, bundle, identifiers):
+        """
+        A ORM-specific implementation of ``obj_get_multiple``.
+
+        Fetches the objects with a single ``__in`` query (per 500
+        identifiers) & authorizes them together with ``authorized_read_list``,
+        so objects the user can't read are simply not found. Objects are
+        matched back to the identifiers by value or, failing that, by
+        ``get_identifier_key``.
+
+        Falls back to calling ``obj_get`` per identifier if ``obj_get`` has
+        been customized or ``detail_uri_name`` isn't a plain field on the
+        model.
+        """
+        opts = self._meta.object_class._meta
+
+        if self._meta.detail_uri_name == 'pk':
+            field = opts.pk
+        else:
+            field = dict((f.name, f) for f in opts.fields).get(self._meta.detail_uri_name)
+
+        if field is None or field.rel is not None or self.__class__.obj_get.__func__ is not ModelResource.obj_get.__func__:
+            return super(ModelResource, self).obj_get_multiple(bundle, identifiers)
+
+        values = {}
+
+        for identifier in identifiers:
+            try:
+                values[identifier] = field.to_python(identifier)
+            except ValidationError:
+                raise NotFound("Invalid resource lookup data provided (mismatched type).")
+
+        unique_values = list(set(values.values()))
+        identity_map = self.get_identity_map(bundle.request)
+        matches = {}
+        loose_matches = {}
+
+        # Keep well under the bound-parameter limits of some backends.
+        for offset in range(0, len(unique_values), 500):
+            filters = {"%s__in" % field.name: unique_values[offset:offset + 500]}
+
+            try:
+                object_list = self.get_object_list(bundle.request).filter(**filters)
+                object_list = self.authorized_read_list(object_list, bundle)
+
+                for obj in object_list:
+                    value = getattr(obj, field.attname)
+                    matches.setdefault(value, []).append(obj)
+                    loose_matches.setdefault(self.get_identifier_key(value), []).append(obj)
+
+                    if identity_map is not None:
+                        identity_map.add(obj)
+            except ValueError:
+                raise NotFound("Invalid resource lookup data provided (mismatched type).")
+
+        objects = {}
+
+        for identifier, value in values.items():
+            found = matches.get(value) or loose_matches.get(self.get_identifier_key(value), [])
+
+            if len(found) > 1:
+                raise MultipleObjectsReturned("More than '%s' matched '%s=%s'." % (self._meta.object_class.__name__, self._meta.detail_uri_name, identifier))
+            elif found:
+                objects[identifier] = found[0]
+
+        return objects
+
+    def get_identifier_key(self, value):
+        """
+        Returns a normalized, stringified form of a ``detail_uri_name`` value,
+        used by ``obj_get_multiple`` for both the requested identifiers & the
+        values the database returned.
+
+        Lets rows the database matched more loosely than Python compares
+        (i.e. under a case-insensitive collation, or a decimal or UUID
+        spelled another way) still be found.
+        """
+        if isinstance(value, Decimal):
+            value = value.normalize()
+        elif isinstance(value, uuid.UUID):
+            value = value.hex
+
+        return force_unicode(value).lower()
+
     def obj_create(self, bundle, **kwargs):
         """
         A ORM-specific implementation of ``obj_create``.
@@ -2251,8 +3704,27 @@ class ModelResource(Resource):
                 raise NotFound("A model instance matching the provided arguments could not be found.")
 
         self.authorized_delete_detail(self.get_object_list(bundle.request), bundle)
+        identity_map = self.get_identity_map(bundle.request)
+
+        if identity_map is not None:
+            identity_map.discard(bundle.obj)
+
+        self.clear_dehydration_memo(bundle.request)
         bundle.obj.delete()
 
+    @transaction.commit_on_success()
+    def put_list(self, request, **kwargs):
+        """
+        An ORM-specific implementation of ``put_list``.
+
+        Necessary because the existing objects are deleted before the new
+        ones are created and, with ``Meta.streaming_deserialization``, before
+        the rest of the body has been read. Invalid data part way through
+        must leave the collection as it was, which is only possible at the
+        database level.
+        """
+        return super(ModelResource, self).put_list(request, **kwargs)
+
     @transaction.commit_on_success()
     def patch_list(self, request, **kwargs):
         """
@@ -2295,10 +3767,15 @@ class ModelResource(Resource):
         # Save the main object.
         bundle.obj.save()
         bundle.objects_saved.add(self.create_identifier(bundle.obj))
+        identity_map = self.get_identity_map(bundle.request)
+
+        if identity_map is not None:
+            identity_map.add(bundle.obj)
 
         # Now pick up the M2M bits.
         m2m_bundle = self.hydrate_m2m(bundle)
         self.save_m2m(m2m_bundle)
+        self.clear_dehydration_memo(bundle.request)
         return bundle
 
     def save_related(self, bundle):
@@ -2447,6 +3924,72 @@ class ModelResource(Resource):
 
         return kwargs
 
+    def can_use_uri_templates(self, detail=False):
+        """
+        An ORM-specific implementation of ``can_use_uri_templates``.
+
+        Detail URIs can be built from templates as long as
+        ``detail_uri_kwargs`` hasn't been customized.
+        """
+        if detail and self.__class__.detail_uri_kwargs.__func__ is not ModelResource.detail_uri_kwargs.__func__:
+            return False
+
+        return super(ModelResource, self).can_use_uri_templates(detail=False)
+
+    def can_build_uri_from_fk(self, foreign_key):
+        """
+        Returns ``True`` if the detail URI for the object ``foreign_key``
+        points at can be built from the key's column value alone.
+
+        That's only the case when ``detail_uri_name`` is the field the key
+        points at & the URI-building methods haven't been customized.
+        """
+        return self._can_build_uri_from(foreign_key.rel.get_related_field())
+
+    def can_build_uri_from_pk(self):
+        """
+        Returns ``True`` if the detail URI for an object can be built from
+        its primary key alone.
+        """
+        return self._can_build_uri_from(self._meta.object_class._meta.pk)
+
+    def _can_build_uri_from(self, target):
+        detail_uri_name = self._meta.detail_uri_name
+
+        if not (detail_uri_name == target.name or (detail_uri_name == 'pk' and target.primary_key)):
+            return False
+
+        cls = self.__class__
+        return (
+            cls.detail_uri_kwargs.__func__ is ModelResource.detail_uri_kwargs.__func__ and
+            cls.resource_uri_kwargs.__func__ is Resource.resource_uri_kwargs.__func__ and
+            cls.get_resource_uri.__func__ is Resource.get_resource_uri.__func__
+        )
+
+    def get_resource_uri_from_value(self, value):
+        """
+        Builds the detail URI for an object from its ``detail_uri_name``
+        value, without loading the object.
+
+        Should only be used when ``can_build_uri_from_fk`` or
+        ``can_build_uri_from_pk`` is ``True``.
+        """
+        template = self.get_uri_template('api_dispatch_detail', detail=True)
+
+        if template is not None:
+            uri = self.fill_uri_template(template, value)
+
+            if uri is not None:
+                return uri
+
+        kwargs = self.resource_uri_kwargs()
+        kwargs[self._meta.detail_uri_name] = value
+
+        try:
+            return self._build_reverse_url('api_dispatch_detail', kwargs=kwargs)
+        except NoReverseMatch:
+            return ''
+
 
 class NamespacedModelResource(ModelResource):
     """
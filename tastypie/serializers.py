@@ -1,9 +1,12 @@
+import collections
+import csv
 import datetime
+import re
+from decimal import Decimal
 from StringIO import StringIO
 import django
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
-from django.core.serializers import json
 try:
     import json as simplejson
 except ImportError: # < Python 2.6
@@ -11,33 +14,43 @@ except ImportError: # < Python 2.6
 from django.utils.encoding import force_unicode
 from tastypie.bundle import Bundle
 from tastypie.exceptions import BadRequest, UnsupportedFormat
-from tastypie.utils import format_datetime, format_date, format_time, make_naive
+from tastypie.utils import Backend, DatetimeFormatter, PackedArray, RawJSON, format_backends
+from tastypie.utils.lru import LRUCache
 try:
-    import defusedxml.lxml as lxml
-    from defusedxml.common import DefusedXmlException
-    from defusedxml.lxml import parse as parse_xml
-    from lxml.etree import Element, tostring, LxmlError
-except ImportError:
-    lxml = None
-try:
-    import yaml
-    from django.core.serializers import pyyaml
-except ImportError:
-    yaml = None
-try:
-    import biplist
+    # simplejson's C speedups escape strings the same way as the ``json``
+    # module, only faster.
+    from simplejson.encoder import c_encode_basestring as encode_json_string
 except ImportError:
-    biplist = None
+    encode_json_string = None
+
+if encode_json_string is None:
+    from json.encoder import encode_basestring as encode_json_string
+
+
+# The libraries behind the optional formats are imported the first time
+# they're used, so processes that only ever serve JSON don't pay for them.
+@format_backends.register('xml')
+def load_xml():
+    from defusedxml.common import DefusedXmlException
+    from defusedxml.lxml import parse, check_docinfo, RestrictedElement
+    from lxml.etree import Element, ElementDefaultClassLookup, iterparse, tostring, LxmlError
+    return Backend(parse=parse, check_docinfo=check_docinfo, RestrictedElement=RestrictedElement,
+                   DefusedXmlException=DefusedXmlException, Element=Element,
+                   ElementDefaultClassLookup=ElementDefaultClassLookup, iterparse=iterparse,
+                   tostring=tostring, LxmlError=LxmlError)
 
 
-# Ugh & blah.
-# So doing a regular dump is generally fine, since Tastypie doesn't usually
-# serialize advanced types. *HOWEVER*, it will dump out Python Unicode strings
-# as a custom YAML tag, which of course ``yaml.safe_load`` can't handle.
-if yaml is not None:
+@format_backends.register('yaml')
+def load_yaml():
+    import yaml
+    from django.core.serializers import pyyaml
     from yaml.constructor import SafeConstructor
     from yaml.loader import Reader, Scanner, Parser, Composer, Resolver
 
+    # Ugh & blah.
+    # So doing a regular dump is generally fine, since Tastypie doesn't usually
+    # serialize advanced types. *HOWEVER*, it will dump out Python Unicode strings
+    # as a custom YAML tag, which of course ``yaml.safe_load`` can't handle.
     class TastypieConstructor(SafeConstructor):
         def construct_yaml_unicode_dammit(self, node):
             value = self.construct_scalar(node)
@@ -57,6 +70,519 @@ if yaml is not None:
             TastypieConstructor.__init__(self)
             Resolver.__init__(self)
 
+    return Backend(dump=yaml.dump, load=yaml.load, TastypieLoader=TastypieLoader)
+
+
+@format_backends.register('plist')
+def load_plist():
+    import biplist
+    return biplist
+
+
+@format_backends.register('msgpack')
+def load_msgpack():
+    import msgpack
+    return msgpack
+
+
+class JSONEncoder(object):
+    """
+    Writes the JSON for Python data (``Bundles``, dictionaries, lists & the
+    values ``to_simple`` understands) in a single pass, with the same output
+    as running ``to_simple`` & then ``json.dumps`` (with sorted keys), except
+    that ``RawJSON`` values are written out verbatim.
+
+    Values are looked up by type in a table of writers, only falling back to
+    the ``isinstance`` checks ``to_simple`` uses for subclasses. ``Bundles``
+    with a ``shape`` (from ``Resource.full_dehydrate``) are written by a
+    writer built for that shape, which knows the key order & the writer for
+    each field's type up front. Only the writers for the
+    ``bundle_writer_cache_size`` most recently seen shapes are kept.
+    """
+    bundle_writer_cache_size = 100
+
+    def __init__(self, serializer, options=None):
+        self.serializer = serializer
+        self.options = options or {}
+        self.writers = {
+            dict: self.write_dict,
+            list: self.write_list,
+            tuple: self.write_list,
+            Bundle: self.write_bundle,
+            unicode: self.write_unicode,
+            str: self.write_string,
+            bool: self.write_bool,
+            int: self.write_integer,
+            long: self.write_integer,
+            float: self.write_float,
+            type(None): self.write_null,
+            datetime.datetime: self.write_datetime,
+            datetime.date: self.write_date,
+            datetime.time: self.write_time,
+            Decimal: self.write_string,
+            RawJSON: self.write_raw_json,
+            PackedArray: self.write_packed_array,
+        }
+        # Writers for the values of fields, by ``dehydrated_type``. Each
+        # checks it got the type it expects, falling back to ``write``.
+        self.field_writers = {
+            'string': self.write_string_field,
+            'integer': self.write_integer_field,
+            'boolean': self.write_boolean_field,
+            'datetime': self.write_datetime_field,
+            'date': self.write_date_field,
+            'time': self.write_time_field,
+            'json': self.write_raw_json_field,
+        }
+        self.bundle_writers = LRUCache(size=self.bundle_writer_cache_size)
+
+    def encode(self, data):
+        chunks = []
+        self.write(data, chunks)
+        return ''.join(chunks)
+
+    def write(self, data, chunks):
+        writer = self.writers.get(type(data))
+
+        if writer is None:
+            writer = self.find_writer(data)
+
+        writer(data, chunks)
+
+    def find_writer(self, data):
+        """
+        Picks the writer for a type missing from the table, in the same order
+        ``to_simple`` checks things.
+        """
+        if isinstance(data, (list, tuple)):
+            return self.write_list
+        elif isinstance(data, dict):
+            return self.write_dict
+        elif isinstance(data, Bundle):
+            return self.write_bundle
+        elif isinstance(data, RawJSON):
+            return self.write_raw_json
+        elif isinstance(data, PackedArray):
+            return self.write_packed_array
+        elif hasattr(data, 'dehydrated_type'):
+            return self.write_field
+        elif isinstance(data, datetime.datetime):
+            return self.write_datetime
+        elif isinstance(data, datetime.date):
+            return self.write_date
+        elif isinstance(data, datetime.time):
+            return self.write_time
+        elif isinstance(data, bool):
+            return self.write_bool
+
+        return self.write_string
+
+    def write_list(self, data, chunks):
+        chunks.append('[')
+        first = True
+
+        for item in data:
+            if first:
+                first = False
+            else:
+                chunks.append(', ')
+
+            self.write(item, chunks)
+
+        chunks.append(']')
+
+    def write_dict(self, data, chunks):
+        chunks.append('{')
+        first = True
+
+        for key, value in sorted(data.iteritems(), key=lambda item: item[0]):
+            if first:
+                first = False
+            else:
+                chunks.append(', ')
+
+            chunks.append(self.encode_key(key))
+            chunks.append(': ')
+            self.write(value, chunks)
+
+        chunks.append('}')
+
+    def write_bundle(self, data, chunks):
+        if data.shape is not None and len(data.data) == len(data.shape):
+            writer = self.bundle_writers.get(data.shape)
+
+            if writer is None:
+                writer = self.build_bundle_writer(data.shape)
+                self.bundle_writers.set(data.shape, writer)
+
+            if writer(data.data, chunks):
+                return
+
+        self.write_dict(data.data, chunks)
+
+    def build_bundle_writer(self, shape):
+        """
+        Builds a function that writes the ``data`` of a ``Bundle`` with the
+        given ``shape`` (see ``Resource.get_bundle_shape``), returning
+        ``False`` (having written nothing) if the keys don't match it.
+
+        The key order, the encoded keys & the writer for each value are all
+        settled here, once per shape.
+        """
+        steps = []
+
+        for position, (key, dehydrated_type) in enumerate(shape):
+            prefix = '%s%s: ' % (position and ', ' or '{', self.encode_key(key))
+            steps.append((key, prefix, self.field_writers.get(dehydrated_type, self.write)))
+
+        keys = [key for key, prefix, writer in steps]
+
+        def write_bundle_data(data, chunks):
+            try:
+                values = [data[key] for key in keys]
+            except KeyError:
+                return False
+
+            if not steps:
+                chunks.append('{')
+
+            for (key, prefix, writer), value in zip(steps, values):
+                chunks.append(prefix)
+                writer(value, chunks)
+
+            chunks.append('}')
+            return True
+
+        return write_bundle_data
+
+    def write_string_field(self, data, chunks):
+        if type(data) is unicode:
+            chunks.append(encode_json_string(data))
+        else:
+            self.write(data, chunks)
+
+    def write_integer_field(self, data, chunks):
+        if type(data) is int:
+            chunks.append(str(data))
+        else:
+            self.write(data, chunks)
+
+    def write_boolean_field(self, data, chunks):
+        if data is True:
+            chunks.append('true')
+        elif data is False:
+            chunks.append('false')
+        else:
+            self.write(data, chunks)
+
+    def write_datetime_field(self, data, chunks):
+        if type(data) is datetime.datetime:
+            chunks.append(encode_json_string(force_unicode(self.serializer.format_datetime(data))))
+        else:
+            self.write(data, chunks)
+
+    def write_date_field(self, data, chunks):
+        if type(data) is datetime.date:
+            chunks.append(encode_json_string(force_unicode(self.serializer.format_date(data))))
+        else:
+            self.write(data, chunks)
+
+    def write_time_field(self, data, chunks):
+        if type(data) is datetime.time:
+            chunks.append(encode_json_string(force_unicode(self.serializer.format_time(data))))
+        else:
+            self.write(data, chunks)
+
+    def write_raw_json_field(self, data, chunks):
+        if type(data) is RawJSON:
+            chunks.append(data.json)
+        else:
+            self.write(data, chunks)
+
+    def write_field(self, data, chunks):
+        if getattr(data, 'dehydrated_type', None) == 'related' and data.is_m2m == False:
+            if data.full:
+                self.write(data.fk_resource, chunks)
+            else:
+                self.write(data.value, chunks)
+        elif getattr(data, 'dehydrated_type', None) == 'related' and data.is_m2m == True:
+            if data.full:
+                self.write_list(data.m2m_bundles, chunks)
+            else:
+                self.write_list(data.value, chunks)
+        else:
+            self.write(data.value, chunks)
+
+    def write_unicode(self, data, chunks):
+        chunks.append(encode_json_string(data))
+
+    def write_string(self, data, chunks):
+        chunks.append(encode_json_string(force_unicode(data)))
+
+    def write_bool(self, data, chunks):
+        chunks.append(data and 'true' or 'false')
+
+    def write_integer(self, data, chunks):
+        chunks.append(str(data))
+
+    def write_float(self, data, chunks):
+        chunks.append(encode_json_float(data))
+
+    def write_null(self, data, chunks):
+        chunks.append('null')
+
+    def write_raw_json(self, data, chunks):
+        chunks.append(data.json)
+
+    def write_packed_array(self, data, chunks):
+        # Base64 & dtypes never need escaping.
+        simple = data.to_simple()
+        chunks.append('{"data": "%s", "dtype": "%s"}' % (simple['data'], simple['dtype']))
+
+    def write_datetime(self, data, chunks):
+        self.write(self.serializer.format_datetime(data), chunks)
+
+    def write_date(self, data, chunks):
+        self.write(self.serializer.format_date(data), chunks)
+
+    def write_time(self, data, chunks):
+        self.write(self.serializer.format_time(data), chunks)
+
+    def encode_key(self, key):
+        """
+        Converts a dictionary key the way ``json.dumps`` does.
+        """
+        if isinstance(key, basestring):
+            return encode_json_string(force_unicode(key))
+        elif key is True:
+            return '"true"'
+        elif key is False:
+            return '"false"'
+        elif key is None:
+            return '"null"'
+        elif isinstance(key, (int, long)):
+            return '"%s"' % key
+        elif isinstance(key, float):
+            return '"%s"' % encode_json_float(key)
+
+        raise TypeError("key %r is not a string" % (key,))
+
+
+def encode_json_float(value):
+    """
+    Converts a float the way ``json.dumps`` does.
+    """
+    if value != value:
+        return 'NaN'
+    elif value == float('inf'):
+        return 'Infinity'
+    elif value == float('-inf'):
+        return '-Infinity'
+
+    return repr(value)
+
+
+class XMLStreamReader(object):
+    """
+    Reads an XML document incrementally (with ``iterparse``), yielding the
+    ``(key, value)`` pairs of the dictionary ``Serializer.from_etree`` would
+    turn it into.
+
+    Lists are yielded as iterators of their deserialized items. Each item's
+    elements are discarded once it's read, so the document is never held in
+    memory as a whole. A list needs consuming before the next pair is read;
+    whatever is left of it is skipped.
+
+    The same DTD/entity protections as ``Serializer.from_xml`` apply.
+    """
+    def __init__(self, serializer, content, forbid_dtd=True, forbid_entities=True):
+        self.serializer = serializer
+        self.content = content
+        self.forbid_dtd = forbid_dtd
+        self.forbid_entities = forbid_entities
+        self.xml = format_backends.get('xml')
+        self.events = self.xml.iterparse(StringIO(content), events=('start', 'end'), resolve_entities=False)
+        self.events.set_element_class_lookup(self.xml.ElementDefaultClassLookup(element=self.xml.RestrictedElement))
+        self.depth = 0
+
+    def next_event(self):
+        try:
+            event, element = self.events.next()
+        except self.xml.LxmlError:
+            raise BadRequest
+
+        if event == 'start':
+            self.depth += 1
+        else:
+            self.depth -= 1
+
+        return event, element
+
+    def skip_to(self, depth):
+        # Reads on until the element open at ``depth`` is the innermost one.
+        while self.depth > depth:
+            self.next_event()
+
+    def discard(self, element):
+        element.clear()
+
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    def __iter__(self):
+        event, root = self.next_event()
+
+        try:
+            self.xml.check_docinfo(root.getroottree(), forbid_dtd=self.forbid_dtd, forbid_entities=self.forbid_entities)
+        except self.xml.DefusedXmlException:
+            raise BadRequest
+
+        if root.tag == 'request':
+            # An ``<object>`` or ``<objects>`` anywhere amongst the children
+            # changes what the whole request means, so it can't be read a
+            # child at a time.
+            data = self.serializer.from_xml(self.content, forbid_dtd=self.forbid_dtd, forbid_entities=self.forbid_entities)
+
+            if isinstance(data, dict):
+                for pair in data.iteritems():
+                    yield pair
+
+            return
+
+        if root.tag != 'object' and root.get('type') != 'hash':
+            # Not a dictionary, so there are no pairs.
+            return
+
+        while True:
+            event, element = self.next_event()
+
+            if event == 'end':
+                # The end of the root.
+                return
+
+            if element.tag != 'object' and element.get('type') != 'hash' and (element.tag == 'objects' or element.get('type') == 'list'):
+                items = self.iter_items()
+                yield element.tag, items
+                items.close()
+                self.skip_to(1)
+            else:
+                self.skip_to(1)
+                yield element.tag, self.serializer.from_etree(element)
+
+            self.discard(element)
+
+    def iter_items(self):
+        while True:
+            event, element = self.next_event()
+
+            if event == 'end':
+                # The end of the list.
+                return
+
+            self.skip_to(2)
+            item = self.serializer.from_etree(element)
+            self.discard(element)
+            yield item
+
+
+class JSONStreamReader(object):
+    """
+    Reads a JSON object incrementally, yielding its ``(key, value)`` pairs.
+
+    Arrays are yielded as iterators of their decoded items, so only one item
+    is built at a time. An array needs consuming before the next pair is
+    read; whatever is left of it is skipped. If the data isn't an object,
+    there are no pairs.
+    """
+    whitespace = re.compile(r'[ \t\n\r]*')
+
+    def __init__(self, content):
+        self.content = content
+        self.decoder = simplejson.JSONDecoder()
+        self.position = 0
+
+    def skip_whitespace(self):
+        self.position = self.whitespace.match(self.content, self.position).end()
+
+        try:
+            return self.content[self.position]
+        except IndexError:
+            raise BadRequest("Unexpected end of JSON data.")
+
+    def expect(self, *characters):
+        character = self.skip_whitespace()
+
+        if character not in characters:
+            raise BadRequest("Invalid JSON data sent: expected %s at position %d." % (" or ".join(characters), self.position))
+
+        self.position += 1
+        return character
+
+    def decode(self):
+        self.skip_whitespace()
+
+        try:
+            value, self.position = self.decoder.raw_decode(self.content, self.position)
+        except ValueError, e:
+            raise BadRequest("Invalid JSON data sent: %s" % e)
+
+        return value
+
+    def __iter__(self):
+        if self.skip_whitespace() != '{':
+            # Still needs to be valid.
+            self.decode()
+            self.finish()
+            return
+
+        self.position += 1
+
+        if self.skip_whitespace() == '}':
+            self.position += 1
+            self.finish()
+            return
+
+        while True:
+            key = self.decode()
+
+            if not isinstance(key, basestring):
+                raise BadRequest("Invalid JSON data sent: keys must be strings.")
+
+            self.expect(':')
+
+            if self.skip_whitespace() == '[':
+                items = self.iter_items()
+                yield key, items
+
+                for item in items:
+                    pass
+            else:
+                yield key, self.decode()
+
+            if self.expect(',', '}') == '}':
+                break
+
+        self.finish()
+
+    def iter_items(self):
+        self.position += 1
+
+        if self.skip_whitespace() == ']':
+            self.position += 1
+            return
+
+        while True:
+            yield self.decode()
+
+            if self.expect(',', ']') == ']':
+                return
+
+    def finish(self):
+        self.position = self.whitespace.match(self.content, self.position).end()
+
+        if self.position != len(self.content):
+            raise BadRequest("Invalid JSON data sent: extra data at position %d." % self.position)
+
 
 class Serializer(object):
     """
@@ -70,6 +596,9 @@ class Serializer(object):
         * yaml
         * html
         * plist (see http://explorapp.com/biplist/)
+        * msgpack (Disabled by default, see http://msgpack.org/)
+        * csv (Disabled by default)
+        * ndjson (Disabled by default)
 
     It was designed to make changing behavior easy, either by overridding the
     various format methods (i.e. ``to_json``), by changing the
@@ -83,7 +612,13 @@ class Serializer(object):
                      'xml': 'application/xml',
                      'yaml': 'text/yaml',
                      'html': 'text/html',
-                     'plist': 'application/x-plist'}
+                     'plist': 'application/x-plist',
+                     'msgpack': 'application/x-msgpack',
+                     'csv': 'text/csv',
+                     'ndjson': 'application/x-ndjson'}
+
+    accept_cache_size = 100
+    datetime_cache_size = 1000
 
     def __init__(self, formats=None, content_types=None, datetime_formatting=None):
         if datetime_formatting is not None:
@@ -91,6 +626,8 @@ class Serializer(object):
         else:
             self.datetime_formatting = getattr(settings, 'TASTYPIE_DATETIME_FORMATTING', 'iso-8601')
 
+        self.datetime_formatter = DatetimeFormatter(self.datetime_formatting, cache_size=self.datetime_cache_size)
+
         self.supported_formats = []
 
         if content_types is not None:
@@ -113,6 +650,48 @@ class Serializer(object):
             except KeyError:
                 raise ImproperlyConfigured("Content type for specified type '%s' not found. Please provide it at either the class level or via the arguments." % format)
 
+        self.build_format_tables()
+
+        # Maps raw ``Accept`` headers to the best of ``supported_formats``.
+        self.accept_formats = LRUCache(size=self.accept_cache_size)
+
+    def build_format_tables(self):
+        """
+        Builds the tables mapping each content type to the short format name
+        ``serialize``, ``serialize_stream``, ``deserialize`` &
+        ``deserialize_stream`` dispatch to, so
+        they don't need to search ``content_types`` for every call.
+
+        Call this again if ``content_types`` or the ``to_<format>`` /
+        ``from_<format>`` methods are changed after the ``Serializer`` is
+        created.
+        """
+        self.serialize_formats = {}
+        self.stream_formats = {}
+        self.deserialize_formats = {}
+        self.deserialize_stream_formats = {}
+
+        for short_format, long_format in self.content_types.items():
+            if hasattr(self, "to_%s" % short_format):
+                chosen = self.serialize_formats.setdefault(long_format, short_format)
+
+                if chosen == short_format and hasattr(self, "stream_%s" % short_format):
+                    self.stream_formats[long_format] = short_format
+
+            if hasattr(self, "from_%s" % short_format):
+                chosen = self.deserialize_formats.setdefault(long_format, short_format)
+
+                # The incremental reader wouldn't use a customized
+                # ``from_<format>``, so it's only used alongside the default.
+                from_method = "from_%s" % short_format
+                default = getattr(Serializer, from_method, None)
+
+                if chosen != short_format or not hasattr(self, "stream_%s" % from_method):
+                    continue
+
+                if default is None or getattr(getattr(self.__class__, from_method, None), '__func__', None) is default.__func__:
+                    self.deserialize_stream_formats[long_format] = short_format
+
     def get_mime_for_format(self, format):
         """
         Given a format, attempts to determine the correct MIME type.
@@ -134,11 +713,7 @@ class Serializer(object):
 
         Default is ``iso-8601``, which looks like "2010-12-16T03:02:14".
         """
-        data = make_naive(data)
-        if self.datetime_formatting == 'rfc-2822':
-            return format_datetime(data)
-
-        return data.isoformat()
+        return self.datetime_formatter.format_datetime(data)
 
     def format_date(self, data):
         """
@@ -149,10 +724,7 @@ class Serializer(object):
 
         Default is ``iso-8601``, which looks like "2010-12-16".
         """
-        if self.datetime_formatting == 'rfc-2822':
-            return format_date(data)
-
-        return data.isoformat()
+        return self.datetime_formatter.format_date(data)
 
     def format_time(self, data):
         """
@@ -163,23 +735,14 @@ class Serializer(object):
 
         Default is ``iso-8601``, which looks like "03:02:14".
         """
-        if self.datetime_formatting == 'rfc-2822':
-            return format_time(data)
-
-        return data.isoformat()
+        return self.datetime_formatter.format_time(data)
 
     def serialize(self, bundle, format='application/json', options={}):
         """
         Given some data and a format, calls the correct method to serialize
         the data and returns the result.
         """
-        desired_format = None
-
-        for short_format, long_format in self.content_types.items():
-            if format == long_format:
-                if hasattr(self, "to_%s" % short_format):
-                    desired_format = short_format
-                    break
+        desired_format = self.serialize_formats.get(format)
 
         if desired_format is None:
             raise UnsupportedFormat("The format indicated '%s' had no available serialization method. Please check your ``formats`` and ``content_types`` on your Serializer." % format)
@@ -187,20 +750,55 @@ class Serializer(object):
         serialized = getattr(self, "to_%s" % desired_format)(bundle, options)
         return serialized
 
+    def serialize_stream(self, bundle, format='application/json', options=None):
+        """
+        Like ``serialize``, but returns an iterator of chunks of the
+        serialized data.
+
+        The values of a top-level dictionary may be iterators (i.e. the
+        ``objects`` of a list response), which are serialized one item at a
+        time. Formats without a ``stream_<format>`` method are serialized in
+        one go, with any iterators turned into lists first.
+        """
+        options = options or {}
+        desired_format = self.serialize_formats.get(format)
+
+        if desired_format is None:
+            raise UnsupportedFormat("The format indicated '%s' had no available serialization method. Please check your ``formats`` and ``content_types`` on your Serializer." % format)
+
+        if format in self.stream_formats and isinstance(bundle, dict):
+            return getattr(self, "stream_%s" % self.stream_formats[format])(bundle, options)
+
+        return iter([getattr(self, "to_%s" % desired_format)(self.exhaust_iterators(bundle), options)])
+
+    def exhaust_iterators(self, data):
+        """
+        Turns any iterators among the values of a top-level dictionary into
+        lists, for formats that can't be streamed.
+        """
+        if isinstance(data, collections.Iterator):
+            return list(data)
+
+        if not isinstance(data, dict):
+            return data
+
+        exhausted = {}
+
+        for key, value in data.items():
+            if isinstance(value, collections.Iterator):
+                value = list(value)
+
+            exhausted[key] = value
+
+        return exhausted
+
     def deserialize(self, content, format='application/json'):
         """
         Given some data and a format, calls the correct method to deserialize
         the data and returns the result.
         """
-        desired_format = None
-
         format = format.split(';')[0]
-
-        for short_format, long_format in self.content_types.items():
-            if format == long_format:
-                if hasattr(self, "from_%s" % short_format):
-                    desired_format = short_format
-                    break
+        desired_format = self.deserialize_formats.get(format)
 
         if desired_format is None:
             raise UnsupportedFormat("The format indicated '%s' had no available deserialization method. Please check your ``formats`` and ``content_types`` on your Serializer." % format)
@@ -208,6 +806,30 @@ class Serializer(object):
         deserialized = getattr(self, "from_%s" % desired_format)(content)
         return deserialized
 
+    def deserialize_stream(self, content, format='application/json'):
+        """
+        Given some data and a format, returns an iterator of the ``(key,
+        value)`` pairs of the dictionary ``deserialize`` would return.
+
+        Formats with a ``stream_from_<format>`` method are read incrementally,
+        with lists coming as iterators of their items (each of which must be
+        consumed before moving on to the next pair). Other formats are
+        deserialized in one go. If the data isn't a dictionary, there are no
+        pairs.
+        """
+        format = format.split(';')[0]
+        desired_format = self.deserialize_stream_formats.get(format)
+
+        if desired_format is not None:
+            return getattr(self, "stream_from_%s" % desired_format)(content)
+
+        deserialized = self.deserialize(content, format=format)
+
+        if not isinstance(deserialized, dict):
+            return iter([])
+
+        return deserialized.iteritems()
+
     def to_simple(self, data, options):
         """
         For a piece of data, attempts to recognize it and provide a simplified
@@ -222,6 +844,10 @@ class Serializer(object):
             return dict((key, self.to_simple(val, options)) for (key, val) in data.iteritems())
         elif isinstance(data, Bundle):
             return dict((key, self.to_simple(val, options)) for (key, val) in data.data.iteritems())
+        elif isinstance(data, RawJSON):
+            return data.load()
+        elif isinstance(data, PackedArray):
+            return data.to_simple()
         elif hasattr(data, 'dehydrated_type'):
             if getattr(data, 'dehydrated_type', None) == 'related' and data.is_m2m == False:
                 if data.full:
@@ -255,6 +881,8 @@ class Serializer(object):
         Given some data, converts that data to an ``etree.Element`` suitable
         for use in the XML output.
         """
+        Element = format_backends.get('xml').Element
+
         if isinstance(data, (list, tuple)):
             element = Element(name or 'objects')
             if name:
@@ -276,6 +904,10 @@ class Serializer(object):
             element = Element(name or 'object')
             for field_name, field_object in data.data.items():
                 element.append(self.to_etree(field_object, options, name=field_name, depth=depth+1))
+        elif isinstance(data, RawJSON):
+            return self.to_etree(data.load(), options, name, depth)
+        elif isinstance(data, PackedArray):
+            return self.to_etree(data.to_simple(), options, name, depth)
         elif hasattr(data, 'dehydrated_type'):
             if getattr(data, 'dehydrated_type', None) == 'related' and data.is_m2m == False:
                 if data.full:
@@ -346,8 +978,20 @@ class Serializer(object):
     def to_json(self, data, options=None):
         """
         Given some Python data, produces JSON output.
+
+        The data is written out in a single pass by a ``JSONEncoder``, unless
+        ``to_simple`` has been customized (in which case it's run first &
+        its result passed to ``json.dumps``).
         """
         options = options or {}
+
+        if self.__class__.to_simple.__func__ is Serializer.to_simple.__func__:
+            return self.get_json_encoder(options).encode(data)
+
+        # Importing Django's serializers imports PyYAML (if it's installed),
+        # so this waits until it's needed.
+        from django.core.serializers import json
+
         data = self.to_simple(data, options)
 
         if django.get_version() >= '1.5':
@@ -355,12 +999,66 @@ class Serializer(object):
         else:
             return simplejson.dumps(data, cls=json.DjangoJSONEncoder, sort_keys=True, ensure_ascii=False)
 
+    def get_json_encoder(self, options=None):
+        """
+        Returns the ``JSONEncoder`` used by ``to_json``.
+
+        The default ``to_simple`` ignores ``options``, so one encoder is kept
+        & reused.
+        """
+        encoder = getattr(self, '_json_encoder', None)
+
+        if encoder is None:
+            encoder = self._json_encoder = JSONEncoder(self, options)
+
+        return encoder
+
+    def stream_json(self, data, options=None):
+        """
+        Given a dictionary (which may have iterators as values), yields the
+        same JSON output as ``to_json``, a chunk at a time.
+        """
+        options = options or {}
+        yield u'{'
+
+        for position, key in enumerate(sorted(data.keys())):
+            value = data[key]
+
+            if position:
+                yield u', '
+
+            yield u'%s: ' % self.to_json(key, options)
+
+            if not isinstance(value, collections.Iterator):
+                yield self.to_json(value, options)
+                continue
+
+            yield u'['
+
+            for item_position, item in enumerate(value):
+                if item_position:
+                    yield u', '
+
+                yield self.to_json(item, options)
+
+            yield u']'
+
+        yield u'}'
+
     def from_json(self, content):
         """
         Given some JSON data, returns a Python dictionary of the decoded data.
         """
         return simplejson.loads(content)
 
+    def stream_from_json(self, content):
+        """
+        Given some JSON data, returns an iterator of the ``(key, value)``
+        pairs of the dictionary ``from_json`` would return, decoding it
+        incrementally (see ``JSONStreamReader``).
+        """
+        return iter(JSONStreamReader(content))
+
     def to_jsonp(self, data, options=None):
         """
         Given some Python data, produces JSON output wrapped in the provided
@@ -376,16 +1074,156 @@ class Serializer(object):
         json = json.replace(u'\u2028', u'\\u2028').replace(u'\u2029', u'\\u2029')
         return u'%s(%s)' % (options['callback'], json)
 
+    def stream_jsonp(self, data, options=None):
+        """
+        Given a dictionary (which may have iterators as values), yields the
+        same output as ``to_jsonp``, a chunk at a time.
+        """
+        options = options or {}
+        yield u'%s(' % options['callback']
+
+        for chunk in self.stream_json(data, options):
+            yield chunk.replace(u'\u2028', u'\\u2028').replace(u'\u2029', u'\\u2029')
+
+        yield u')'
+
     def to_xml(self, data, options=None):
         """
         Given some Python data, produces XML output.
         """
         options = options or {}
 
-        if lxml is None:
+        if format_backends.get('xml') is None:
+            raise ImproperlyConfigured("Usage of the XML aspects requires lxml and defusedxml.")
+
+        return "<?xml version='1.0' encoding='utf-8'?>\n" + ''.join(self.iter_xml(data, options))
+
+    def iter_xml(self, data, options=None, name=None, depth=0):
+        """
+        Given some data, yields the serialized (UTF-8) XML for the element
+        ``to_etree`` would build for it, a chunk at a time.
+
+        Elements are written out as the data is walked, so no tree is built
+        for the whole response. If ``to_etree`` has been customized, its
+        element is built & serialized in one go instead.
+        """
+        options = options or {}
+
+        if self.__class__.to_etree.__func__ is not Serializer.to_etree.__func__:
+            yield format_backends.get('xml').tostring(self.to_etree(data, options, name=name, depth=depth), encoding='utf-8')
+            return
+
+        for chunk in self._iter_xml(data, options, name, depth):
+            yield chunk
+
+    def _iter_xml(self, data, options, name=None, depth=0):
+        # Mirrors ``to_etree`` branch for branch.
+        Element = format_backends.get('xml').Element
+
+        if isinstance(data, (list, tuple)):
+            if name:
+                element = Element(name)
+                element.set('type', 'list')
+            else:
+                element = Element('objects')
+            children = (self._iter_xml(item, options, depth=depth+1) for item in data)
+        elif isinstance(data, dict):
+            if depth == 0:
+                element = Element(name or 'response')
+            else:
+                element = Element(name or 'object')
+                element.set('type', 'hash')
+            children = (self._iter_xml(value, options, name=key, depth=depth+1) for (key, value) in data.iteritems())
+        elif isinstance(data, Bundle):
+            element = Element(name or 'object')
+            children = (self._iter_xml(field_object, options, name=field_name, depth=depth+1) for field_name, field_object in data.data.items())
+        elif isinstance(data, RawJSON):
+            return self._iter_xml(data.load(), options, name, depth)
+        elif isinstance(data, PackedArray):
+            return self._iter_xml(data.to_simple(), options, name, depth)
+        elif hasattr(data, 'dehydrated_type'):
+            if getattr(data, 'dehydrated_type', None) == 'related' and data.is_m2m == False:
+                if data.full:
+                    return self._iter_xml(data.fk_resource, options, name, depth+1)
+                else:
+                    return self._iter_xml(data.value, options, name, depth+1)
+            elif getattr(data, 'dehydrated_type', None) == 'related' and data.is_m2m == True:
+                element = Element(name or 'objects')
+
+                if data.full:
+                    children = (self._iter_xml(bundle, options, bundle.resource_name, depth+1) for bundle in data.m2m_bundles)
+                else:
+                    children = (self._iter_xml(value, options, name, depth=depth+1) for value in data.value)
+            else:
+                return self._iter_xml(data.value, options, name)
+        else:
+            element = Element(name or 'value')
+            simple_data = self.to_simple(data, options)
+            data_type = get_type_string(simple_data)
+
+            if data_type != 'string':
+                element.set('type', data_type)
+
+            if data_type != 'null':
+                if isinstance(simple_data, unicode):
+                    element.text = simple_data
+                else:
+                    element.text = force_unicode(simple_data)
+
+            return iter([format_backends.get('xml').tostring(element, encoding='utf-8')])
+
+        return self._iter_xml_element(element, children)
+
+    def _iter_xml_element(self, element, children):
+        # Empty elements are self-closing, so the start tag is only written
+        # once there's a child to go in it.
+        tostring = format_backends.get('xml').tostring
+        opened = False
+
+        for child in children:
+            if not opened:
+                yield tostring(element, encoding='utf-8')[:-2] + '>'
+                opened = True
+
+            for chunk in child:
+                yield chunk
+
+        if opened:
+            tag = element.tag
+
+            if isinstance(tag, unicode):
+                tag = tag.encode('utf-8')
+
+            yield '</%s>' % tag
+        else:
+            yield tostring(element, encoding='utf-8')
+
+    def stream_xml(self, data, options=None):
+        """
+        Given a dictionary (which may have iterators as values), yields the
+        same XML output as ``to_xml``, an element at a time.
+        """
+        options = options or {}
+
+        xml = format_backends.get('xml')
+
+        if xml is None:
             raise ImproperlyConfigured("Usage of the XML aspects requires lxml and defusedxml.")
 
-        return tostring(self.to_etree(data, options), xml_declaration=True, encoding='utf-8')
+        yield "<?xml version='1.0' encoding='utf-8'?>\n"
+
+        for chunk in self._iter_xml_element(xml.Element('response'), self._stream_xml_children(data, options)):
+            yield chunk
+
+    def _stream_xml_children(self, data, options):
+        for key, value in data.iteritems():
+            if not isinstance(value, collections.Iterator):
+                yield self.iter_xml(value, options, name=key, depth=1)
+                continue
+
+            element = format_backends.get('xml').Element(key)
+            element.set('type', 'list')
+            yield self._iter_xml_element(element, (self.iter_xml(item, options, depth=2) for item in value))
 
     def from_xml(self, content, forbid_dtd=True, forbid_entities=True):
         """
@@ -395,23 +1233,40 @@ class Serializer(object):
         exception content but subclasses may choose to override this if
         necessary.
         """
-        if lxml is None:
+        xml = format_backends.get('xml')
+
+        if xml is None:
             raise ImproperlyConfigured("Usage of the XML aspects requires lxml and defusedxml.")
 
         try:
-            parsed = parse_xml(StringIO(content), forbid_dtd=forbid_dtd,
+            parsed = xml.parse(StringIO(content), forbid_dtd=forbid_dtd,
                                forbid_entities=forbid_entities)
-        except (LxmlError, DefusedXmlException):
+        except (xml.LxmlError, xml.DefusedXmlException):
             raise BadRequest
 
         return self.from_etree(parsed.getroot())
 
+    def stream_from_xml(self, content, forbid_dtd=True, forbid_entities=True):
+        """
+        Given some XML data, returns an iterator of the ``(key, value)``
+        pairs of the dictionary ``from_xml`` would return, parsing it
+        incrementally (see ``XMLStreamReader``).
+
+        The same DTD & entity restrictions as ``from_xml`` apply.
+        """
+        if format_backends.get('xml') is None:
+            raise ImproperlyConfigured("Usage of the XML aspects requires lxml and defusedxml.")
+
+        return iter(XMLStreamReader(self, content, forbid_dtd=forbid_dtd, forbid_entities=forbid_entities))
+
     def to_yaml(self, data, options=None):
         """
         Given some Python data, produces YAML output.
         """
         options = options or {}
 
+        yaml = format_backends.get('yaml')
+
         if yaml is None:
             raise ImproperlyConfigured("Usage of the YAML aspects requires yaml.")
 
@@ -421,10 +1276,12 @@ class Serializer(object):
         """
         Given some YAML data, returns a Python dictionary of the decoded data.
         """
+        yaml = format_backends.get('yaml')
+
         if yaml is None:
             raise ImproperlyConfigured("Usage of the YAML aspects requires yaml.")
 
-        return yaml.load(content, Loader=TastypieLoader)
+        return yaml.load(content, Loader=yaml.TastypieLoader)
 
     def to_plist(self, data, options=None):
         """
@@ -432,6 +1289,8 @@ class Serializer(object):
         """
         options = options or {}
 
+        biplist = format_backends.get('plist')
+
         if biplist is None:
             raise ImproperlyConfigured("Usage of the plist aspects requires biplist.")
 
@@ -441,11 +1300,191 @@ class Serializer(object):
         """
         Given some binary plist data, returns a Python dictionary of the decoded data.
         """
+        biplist = format_backends.get('plist')
+
         if biplist is None:
             raise ImproperlyConfigured("Usage of the plist aspects requires biplist.")
 
         return biplist.readPlistFromString(content)
 
+    def to_msgpack(self, data, options=None):
+        """
+        Given some Python data, produces MessagePack output.
+
+        Dates, times & ``Decimals`` are written as the same strings the other
+        formats use. Lists, dictionaries & plain values are packed directly,
+        only handing the rest (``Bundles`` included) to ``to_simple`` as
+        they're reached, unless ``to_simple`` has been customized (in which
+        case it's run over all of the data first).
+        """
+        options = options or {}
+
+        msgpack = format_backends.get('msgpack')
+
+        if msgpack is None:
+            raise ImproperlyConfigured("Usage of the MessagePack aspects requires msgpack.")
+
+        if self.__class__.to_simple.__func__ is not Serializer.to_simple.__func__:
+            return msgpack.packb(self.to_simple(data, options))
+
+        def simplify(value):
+            if isinstance(value, Bundle):
+                return value.data
+
+            return self.to_simple(value, options)
+
+        return msgpack.packb(data, default=simplify)
+
+    def from_msgpack(self, content):
+        """
+        Given some MessagePack data, returns a Python dictionary of the decoded
+        data.
+        """
+        msgpack = format_backends.get('msgpack')
+
+        if msgpack is None:
+            raise ImproperlyConfigured("Usage of the MessagePack aspects requires msgpack.")
+
+        if msgpack.version >= (0, 5, 2):
+            return msgpack.unpackb(content, raw=False)
+
+        return msgpack.unpackb(content, encoding='utf-8')
+
+    def iter_rows(self, data, options=None):
+        """
+        Yields the rows the ``csv`` & ``ndjson`` formats write, as flat
+        dictionaries (see ``to_row``).
+
+        A dictionary holding the ``collection_name`` from ``options``
+        (``objects`` by default) gives a row per item in that collection, as
+        does a list. Anything else is a single row.
+        """
+        options = options or {}
+        collection_name = options.get('collection_name', 'objects')
+
+        if isinstance(data, dict) and collection_name in data:
+            data = data[collection_name]
+        elif not isinstance(data, (list, tuple)):
+            data = [data]
+
+        for item in data:
+            yield self.to_row(item, options)
+
+    def to_row(self, data, options=None):
+        """
+        Flattens a ``Bundle`` (or dictionary) into a dictionary of simple
+        values. Related objects are replaced by their URIs, even if they were
+        dehydrated in full.
+        """
+        options = options or {}
+
+        if isinstance(data, Bundle):
+            data = data.data
+
+        if not isinstance(data, dict):
+            return {'value': self.to_simple(data, options)}
+
+        return dict((key, self.to_simple(self.related_uris(value), options)) for (key, value) in data.iteritems())
+
+    def related_uris(self, data):
+        """
+        Replaces any ``Bundles`` in ``data`` (or in a list of them) with their
+        ``resource_uri``.
+        """
+        if isinstance(data, Bundle):
+            return data.data.get('resource_uri')
+
+        if isinstance(data, (list, tuple)):
+            return [self.related_uris(item) for item in data]
+
+        return data
+
+    def to_csv(self, data, options=None):
+        """
+        Given some Python data, produces CSV output, with a header row of the
+        field names (sorted) & then a row per object.
+
+        For a list, the field names are those in ``options['field_names']``
+        (which ``Resource.serialize`` fills in) along with the keys of every
+        row. If the objects come from an iterator, only the first row's keys
+        are known up front & ``ValueError`` is raised if a later row has any
+        others, rather than dropping them.
+
+        Strings, dates & times are written as-is & ``None`` as an empty
+        cell. Numbers, booleans, lists & dictionaries are written as JSON.
+        """
+        return ''.join(self.stream_csv(data, options))
+
+    def stream_csv(self, data, options=None):
+        """
+        Given some Python data (a dictionary's values may be iterators),
+        yields the same output as ``to_csv``, a row at a time.
+        """
+        options = options or {}
+        buffer = StringIO()
+        writer = None
+        field_names = set()
+        rows = self.iter_rows(data, options)
+        collection = data
+
+        if isinstance(data, dict):
+            collection = data.get(options.get('collection_name', 'objects'))
+
+        if collection is not None and not isinstance(collection, dict):
+            field_names.update(options.get('field_names') or [])
+
+        if isinstance(collection, (list, tuple)):
+            # Already in memory, so every row's fields can be found first.
+            rows = list(rows)
+
+            for row in rows:
+                field_names.update(row.keys())
+
+        for row in rows:
+            if writer is None:
+                field_names = sorted(field_names.union(row.keys()))
+                writer = csv.DictWriter(buffer, field_names, restval='', extrasaction='raise')
+                # ``DictWriter.writeheader`` is Python 2.7+.
+                writer.writerow(dict(zip(field_names, [self.to_csv_cell(name) for name in field_names])))
+
+            writer.writerow(dict((key, self.to_csv_cell(value)) for (key, value) in row.iteritems()))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def to_csv_cell(self, value):
+        """
+        Converts a simple value to the UTF-8 bytestring the ``csv`` module
+        expects.
+        """
+        if value is None:
+            return ''
+
+        if isinstance(value, unicode):
+            return value.encode('utf-8')
+
+        if isinstance(value, str):
+            return value
+
+        return simplejson.dumps(value, sort_keys=True)
+
+    def to_ndjson(self, data, options=None):
+        """
+        Given some Python data, produces newline-delimited JSON output, with a
+        JSON object (see ``to_row``) on a line per object.
+        """
+        return u''.join(self.stream_ndjson(data, options))
+
+    def stream_ndjson(self, data, options=None):
+        """
+        Given some Python data (a dictionary's values may be iterators),
+        yields the same output as ``to_ndjson``, a line at a time.
+        """
+        options = options or {}
+
+        for row in self.iter_rows(data, options):
+            yield u'%s\n' % self.to_json(row, options)
+
     def to_html(self, data, options=None):
         """
         Reserved for future usage.
@@ -381,6 +381,12 @@ class ResourceTestCase(TestCase):
         """
         return self.assertEqual(resp.status_code, 410)
 
+    def assertHttpRequestEntityTooLarge(self, resp):
+        """
+        Ensures the response is returning a HTTP 413.
+        """
+        return self.assertEqual(resp.status_code, 413)
+
     def assertHttpTooManyRequests(self, resp):
         """
         Ensures the response is returning a HTTP 429.
@@ -431,6 +437,14 @@ class ResourceTestCase(TestCase):
         # Just try the load. If it throws an exception, the test case will fail.
         self.serializer.from_plist(data)
 
+    def assertValidMsgPack(self, data):
+        """
+        Given the provided ``data`` as a string, ensures that it is valid
+        MessagePack & can be loaded properly.
+        """
+        # Just try the load. If it throws an exception, the test case will fail.
+        self.serializer.from_msgpack(data)
+
     def assertValidJSONResponse(self, resp):
         """
         Given a ``HttpResponse`` coming back from using the ``client``, assert that
@@ -442,7 +456,7 @@ class ResourceTestCase(TestCase):
         """
         self.assertHttpOK(resp)
         self.assertTrue(resp['Content-Type'].startswith('application/json'))
-        self.assertValidJSON(resp.content)
+        self.assertValidJSON(self.get_content(resp))
 
     def assertValidXMLResponse(self, resp):
         """
@@ -455,7 +469,7 @@ class ResourceTestCase(TestCase):
         """
         self.assertHttpOK(resp)
         self.assertTrue(resp['Content-Type'].startswith('application/xml'))
-        self.assertValidXML(resp.content)
+        self.assertValidXML(self.get_content(resp))
 
     def assertValidYAMLResponse(self, resp):
         """
@@ -468,7 +482,7 @@ class ResourceTestCase(TestCase):
         """
         self.assertHttpOK(resp)
         self.assertTrue(resp['Content-Type'].startswith('text/yaml'))
-        self.assertValidYAML(resp.content)
+        self.assertValidYAML(self.get_content(resp))
 
     def assertValidPlistResponse(self, resp):
         """
@@ -481,7 +495,33 @@ class ResourceTestCase(TestCase):
         """
         self.assertHttpOK(resp)
         self.assertTrue(resp['Content-Type'].startswith('application/x-plist'))
-        self.assertValidPlist(resp.content)
+        self.assertValidPlist(self.get_content(resp))
+
+    def assertValidMsgPackResponse(self, resp):
+        """
+        Given a ``HttpResponse`` coming back from using the ``client``, assert that
+        you get back:
+
+        * An HTTP 200
+        * The correct content-type (``application/x-msgpack``)
+        * The content is valid MessagePack data
+        """
+        self.assertHttpOK(resp)
+        self.assertTrue(resp['Content-Type'].startswith('application/x-msgpack'))
+        self.assertValidMsgPack(self.get_content(resp))
+
+    def get_content(self, resp):
+        """
+        Given a ``HttpResponse`` (or ``StreamingHttpResponse``) coming back from
+        using the ``client``, returns the full body of the response.
+        """
+        if not getattr(resp, 'streaming', False):
+            return resp.content
+
+        content = ''.join(resp.streaming_content)
+        # Allow the body to be read again.
+        resp.streaming_content = [content]
+        return content
 
     def deserialize(self, resp):
         """
@@ -491,7 +531,7 @@ class ResourceTestCase(TestCase):
 
         It returns a Python datastructure (typically a ``dict``) of the serialized data.
         """
-        return self.serializer.deserialize(resp.content, format=resp['Content-Type'])
+        return self.serializer.deserialize(self.get_content(resp), format=resp['Content-Type'])
 
     def serialize(self, data, format='application/json'):
         """
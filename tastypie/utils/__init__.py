@@ -1,5 +1,9 @@
 from tastypie.utils.dict import dict_strip_unicode_keys
-from tastypie.utils.formatting import mk_datetime, format_datetime, format_date, format_time
+from tastypie.utils.backends import Backend, BackendRegistry, format_backends
+from tastypie.utils.identity import IdentityMap, attach_identity_map, get_identity_map, DehydrationMemo, attach_dehydration_memo, get_dehydration_memo
+from tastypie.utils.formatting import mk_datetime, format_datetime, format_date, format_time, DatetimeFormatter
+from tastypie.utils.packed import PackedArray, attach_packed_arrays, get_packed_arrays
+from tastypie.utils.raw_json import RawJSON
 from tastypie.utils.urls import trailing_slash
 from tastypie.utils.validate_jsonp import is_valid_jsonp_callback_value
 from tastypie.utils.timezone import now, make_aware, make_naive, aware_date, aware_datetime
@@ -0,0 +1,71 @@
+import threading
+
+
+class Backend(object):
+    """
+    The names an optional dependency provides, as returned by a loader
+    registered with ``BackendRegistry``.
+    """
+    def __init__(self, **names):
+        self.__dict__.update(names)
+
+
+class BackendRegistry(object):
+    """
+    Imports optional dependencies (i.e. the libraries behind serialization
+    formats) the first time they're used, rather than when Tastypie is.
+
+    Each backend has a loader, which does the imports & returns whatever the
+    caller needs from them. Loaders run at most once; a loader raising
+    ``ImportError`` leaves its backend as ``None`` (i.e. not installed).
+    """
+    def __init__(self):
+        self.loaders = {}
+        self.backends = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, loader=None):
+        """
+        Registers the ``loader`` for the backend called ``name``, replacing
+        any already registered (& loaded). May be used as a decorator.
+        """
+        if loader is None:
+            def decorator(loader):
+                return self.register(name, loader)
+
+            return decorator
+
+        with self._lock:
+            self.loaders[name] = loader
+            self.backends.pop(name, None)
+
+        return loader
+
+    def get(self, name):
+        """
+        Returns the backend called ``name``, loading it if need be, or
+        ``None`` if what it needs isn't installed.
+        """
+        try:
+            return self.backends[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self.backends:
+                try:
+                    self.backends[name] = self.loaders[name]()
+                except ImportError:
+                    self.backends[name] = None
+
+            return self.backends[name]
+
+    def is_loaded(self, name):
+        """
+        Whether the backend called ``name`` has been loaded (or tried to be).
+        """
+        return name in self.backends
+
+
+# Tastypie's own backends are registered here, by the modules that use them.
+format_backends = BackendRegistry()
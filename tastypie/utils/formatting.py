@@ -1,16 +1,36 @@
 import email
 import datetime
 import time
+from django.conf import settings
 from django.utils import dateformat
+from django.utils.encoding import force_unicode
+from django.utils.translation import get_language
+from tastypie.utils.backends import format_backends
 from tastypie.utils.timezone import make_aware, make_naive, aware_datetime
-
-# Try to use dateutil for maximum date-parsing niceness. Fall back to
-# hard-coded RFC2822 parsing if that's not possible.
 try:
-    from dateutil.parser import parse as mk_datetime
-except ImportError:
-    def mk_datetime(string):
-        return make_aware(datetime.datetime.fromtimestamp(time.mktime(email.utils.parsedate(string))))
+    from django.utils import timezone
+except ImportError: # Django < 1.4
+    timezone = None
+
+
+@format_backends.register('dateutil')
+def load_dateutil():
+    from dateutil.parser import parse
+    return parse
+
+def mk_datetime(string):
+    """
+    Parses a datetime string.
+
+    Uses dateutil for maximum date-parsing niceness (imported on first use).
+    Falls back to hard-coded RFC2822 parsing if that's not possible.
+    """
+    parse = format_backends.get('dateutil')
+
+    if parse is not None:
+        return parse(string)
+
+    return make_aware(datetime.datetime.fromtimestamp(time.mktime(email.utils.parsedate(string))))
 
 def format_datetime(dt):
     """
@@ -34,3 +54,136 @@ def format_time(t):
     # again, workaround dateformat input requirement
     dt = aware_datetime(2000, 1, 1, t.hour, t.minute, t.second)
     return dateformat.format(dt, 'H:i:s O')
+
+
+def compile_date_format(format_string):
+    """
+    Splits a ``django.utils.dateformat`` format string into a list of
+    ``(method_name, literal)`` pairs, so it only needs parsing once.
+    """
+    parts = []
+
+    for i, piece in enumerate(dateformat.re_formatchars.split(force_unicode(format_string))):
+        if i % 2:
+            parts.append((piece, None))
+        elif piece:
+            parts.append((None, dateformat.re_escaped.sub(r'\1', piece)))
+
+    return parts
+
+# The RFC 2822 formats, as used by ``format_datetime``, ``format_date`` &
+# ``format_time`` ('r' is spelled out so it isn't parsed again each time).
+RFC_2822_DATETIME = compile_date_format('D, j M Y H:i:s O')
+RFC_2822_DATE = compile_date_format('j M Y')
+RFC_2822_TIME = compile_date_format('H:i:s O')
+
+
+def format_compiled(value, parts):
+    """
+    Formats a date/datetime with the output of ``compile_date_format``.
+    """
+    formatter = dateformat.DateFormat(value)
+    return u''.join([force_unicode(getattr(formatter, name)()) if name else literal for name, literal in parts])
+
+
+class DatetimeFormatter(object):
+    """
+    Formats datetimes, dates & times as either ISO 8601 (the default) or RFC
+    2822 strings, with the same output as ``Serializer`` has always had.
+
+    The timezone (``USE_TZ``/``TIME_ZONE``) & format are worked out once,
+    when the formatter is created. The output for recently seen values is
+    remembered (up to ``cache_size`` of each kind), as a response tends to
+    repeat the same timestamps over & over.
+    """
+    def __init__(self, formatting='iso-8601', cache_size=1000):
+        self.formatting = formatting
+        self.rfc_2822 = formatting == 'rfc-2822'
+        self.cache_size = cache_size
+        self.timezone = None
+
+        if timezone is not None and getattr(settings, 'USE_TZ', False):
+            self.timezone = timezone.get_default_timezone()
+
+        self._datetimes = {}
+        self._dates = {}
+        self._times = {}
+
+    def remember(self, cache, key, value):
+        if len(cache) >= self.cache_size:
+            # Cheaper than tracking what was least recently used.
+            cache.clear()
+
+        cache[key] = value
+        return value
+
+    def cache_key(self, data, tzinfo=None):
+        # The ``tzinfo`` goes first, so naive & aware values (which can't be
+        # compared) are never compared. RFC 2822 names are translated.
+        if self.rfc_2822:
+            return (get_language(), tzinfo, data)
+
+        return (tzinfo, data)
+
+    def make_naive(self, data):
+        if self.timezone is not None and data.tzinfo is not None and data.tzinfo.utcoffset(data) is not None:
+            return timezone.make_naive(data, self.timezone)
+
+        return data
+
+    def format_datetime(self, data):
+        tzinfo = data.tzinfo
+
+        if tzinfo is not None and self.timezone is not None:
+            # Converted to the default timezone, so only the moment matters.
+            tzinfo = True
+
+        key = self.cache_key(data, tzinfo)
+        formatted = self._datetimes.get(key)
+
+        if formatted is not None:
+            return formatted
+
+        data = self.make_naive(data)
+
+        if self.rfc_2822:
+            formatted = format_compiled(data, RFC_2822_DATETIME)
+        else:
+            formatted = data.isoformat()
+
+        return self.remember(self._datetimes, key, formatted)
+
+    def format_date(self, data):
+        key = self.cache_key(data)
+        formatted = self._dates.get(key)
+
+        if formatted is not None:
+            return formatted
+
+        if self.rfc_2822:
+            # Only the day, month & year are used, so the date itself will do.
+            formatted = format_compiled(data, RFC_2822_DATE)
+        else:
+            formatted = data.isoformat()
+
+        return self.remember(self._dates, key, formatted)
+
+    def format_time(self, data):
+        key = self.cache_key(data, data.tzinfo)
+        formatted = self._times.get(key)
+
+        if formatted is not None:
+            return formatted
+
+        if self.rfc_2822:
+            # ``dateformat`` needs a datetime for the UTC offset.
+            dt = datetime.datetime(2000, 1, 1, data.hour, data.minute, data.second)
+
+            if self.timezone is not None:
+                dt = timezone.make_aware(dt, self.timezone)
+
+            formatted = format_compiled(dt, RFC_2822_TIME)
+        else:
+            formatted = data.isoformat()
+
+        return self.remember(self._times, key, formatted)
@@ -0,0 +1,160 @@
+from django.core.exceptions import ValidationError
+
+
+IDENTITY_MAP_ATTRIBUTE = '_tastypie_identity_map'
+DEHYDRATION_MEMO_ATTRIBUTE = '_tastypie_dehydration_memo'
+
+
+class IdentityMap(object):
+    """
+    Holds the model instances loaded while handling a single request, keyed
+    by ``(model, pk)``, so that the same row is only fetched (& the same
+    instance is used) no matter how many times it's referenced.
+    """
+    def __init__(self):
+        self._objects = {}
+
+    def _key(self, model, pk):
+        if pk is None or not hasattr(model, '_meta'):
+            return None
+
+        try:
+            return (model, model._meta.pk.to_python(pk))
+        except (ValidationError, TypeError, ValueError):
+            return None
+
+    def get(self, model, pk):
+        """
+        Returns the instance of ``model`` with the given ``pk`` if it's been
+        loaded, otherwise ``None``.
+        """
+        key = self._key(model, pk)
+
+        if key is None:
+            return None
+
+        return self._objects.get(key)
+
+    def add(self, obj):
+        """
+        Remembers ``obj``. Unsaved objects are ignored.
+        """
+        key = self._key(type(obj), getattr(obj, 'pk', None))
+
+        if key is not None:
+            self._objects[key] = obj
+
+        return obj
+
+    def discard(self, obj):
+        """
+        Forgets ``obj`` (if it's known), e.g. because it's being deleted.
+        """
+        key = self._key(type(obj), getattr(obj, 'pk', None))
+
+        if key is not None:
+            self._objects.pop(key, None)
+
+    def clear(self):
+        """
+        Forgets every object, e.g. once a chunk of a streamed list is done.
+        """
+        self._objects = {}
+
+    def __len__(self):
+        return len(self._objects)
+
+
+class DehydrationMemo(object):
+    """
+    Holds the fully dehydrated related bundles built while handling a single
+    request, keyed by ``(related resource, model, pk, for_list)``, so each
+    distinct related object is only dehydrated once per mode.
+
+    Also tracks the related objects currently being dehydrated, so cycles
+    (e.g. ``to='self'`` with ``full=True``) can be cut short.
+    """
+    def __init__(self):
+        self._bundles = {}
+        self._in_progress = set()
+
+    def key(self, resource, obj, for_list):
+        """
+        Returns the key for dehydrating ``obj`` with ``resource``, or ``None``
+        if ``obj`` can't be told apart from other objects (not saved).
+        """
+        pk = getattr(obj, 'pk', None)
+
+        if pk is None:
+            return None
+
+        return (type(resource), type(obj), pk, bool(for_list))
+
+    def get(self, key):
+        return self._bundles.get(key)
+
+    def set(self, key, bundle):
+        self._bundles[key] = bundle
+        return bundle
+
+    def is_dehydrating(self, key):
+        return key in self._in_progress
+
+    def start(self, key):
+        self._in_progress.add(key)
+
+    def finish(self, key):
+        self._in_progress.discard(key)
+
+    def clear(self):
+        """
+        Forgets the dehydrated bundles, e.g. because objects were saved.
+        """
+        self._bundles = {}
+
+    def __len__(self):
+        return len(self._bundles)
+
+
+def attach_identity_map(request):
+    """
+    Gives ``request`` an ``IdentityMap`` (unless it already has one) &
+    returns it.
+    """
+    identity_map = getattr(request, IDENTITY_MAP_ATTRIBUTE, None)
+
+    if identity_map is None:
+        identity_map = IdentityMap()
+        setattr(request, IDENTITY_MAP_ATTRIBUTE, identity_map)
+
+    return identity_map
+
+
+def get_identity_map(request):
+    """
+    Returns the ``IdentityMap`` attached to ``request``, or ``None`` if it
+    doesn't have one.
+    """
+    return getattr(request, IDENTITY_MAP_ATTRIBUTE, None)
+
+
+def attach_dehydration_memo(request):
+    """
+    Returns the ``DehydrationMemo`` for ``request``, creating it the first
+    time it's needed.
+    """
+    memo = getattr(request, DEHYDRATION_MEMO_ATTRIBUTE, None)
+
+    if memo is None:
+        memo = DehydrationMemo()
+        setattr(request, DEHYDRATION_MEMO_ATTRIBUTE, memo)
+
+    return memo
+
+
+def get_dehydration_memo(request):
+    """
+    Returns the ``DehydrationMemo`` attached to ``request``, or ``None`` if
+    it doesn't have one.
+    """
+    return getattr(request, DEHYDRATION_MEMO_ATTRIBUTE, None)
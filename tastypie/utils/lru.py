@@ -0,0 +1,52 @@
+import threading
+try:
+    from collections import OrderedDict
+except ImportError: # Python < 2.7
+    from django.utils.datastructures import SortedDict as OrderedDict
+
+
+class LRUCache(object):
+    """
+    A small, bounded mapping that forgets the least recently used key once
+    it holds more than ``size`` keys.
+
+    Serializers (& so their caches) are shared between threads, so access is
+    guarded by a lock.
+    """
+    def __init__(self, size=100):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                return default
+
+            # Move it to the most recently used end.
+            self._data[key] = value
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+
+            while len(self._data) > self.size:
+                self._data.pop(iter(self._data).next())
+
+    def clear(self):
+        with self._lock:
+            self._data = OrderedDict()
+
+    def __deepcopy__(self, memo):
+        # Locks can't be copied. A copy starts out empty.
+        return self.__class__(size=self.size)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -3,6 +3,10 @@ import mimeparse
 from tastypie.exceptions import BadRequest
 
 
+# Marks ``Accept`` headers ``mimeparse`` couldn't make sense of.
+INVALID_ACCEPT = object()
+
+
 def determine_format(request, serializer, default_format='application/json'):
     """
     Tries to "smartly" determine which output format is desired.
@@ -29,17 +33,10 @@ def determine_format(request, serializer, default_format='application/json'):
         return serializer.get_mime_for_format('jsonp')
 
     # Try to fallback on the Accepts header.
-    if request.META.get('HTTP_ACCEPT', '*/*') != '*/*':
-        formats = list(serializer.supported_formats) or []
-        # Reverse the list, because mimeparse is weird like that. See also
-        # https://github.com/toastdriven/django-tastypie/issues#issue/12 for
-        # more information.
-        formats.reverse()
-
-        try:
-            best_format = mimeparse.best_match(formats, request.META['HTTP_ACCEPT'])
-        except ValueError:
-            raise BadRequest('Invalid Accept header')
+    accept = request.META.get('HTTP_ACCEPT', '*/*')
+
+    if accept != '*/*':
+        best_format = best_format_for_accept(serializer, accept)
 
         if best_format:
             return best_format
@@ -48,6 +45,47 @@ def determine_format(request, serializer, default_format='application/json'):
     return default_format
 
 
+def best_format_for_accept(serializer, accept):
+    """
+    Returns the best of the serializer's ``supported_formats`` for the
+    ``Accept`` header given, or an empty string if none of them will do.
+
+    Raises ``BadRequest`` if the header is malformed.
+
+    Results are remembered in the serializer's ``accept_formats`` cache (if
+    it has one), as real traffic only has a handful of distinct ``Accept``
+    headers.
+    """
+    cache = getattr(serializer, 'accept_formats', None)
+
+    if cache is not None:
+        best_format = cache.get(accept)
+
+        if best_format is INVALID_ACCEPT:
+            raise BadRequest('Invalid Accept header')
+        elif best_format is not None:
+            return best_format
+
+    formats = list(serializer.supported_formats) or []
+    # Reverse the list, because mimeparse is weird like that. See also
+    # https://github.com/toastdriven/django-tastypie/issues#issue/12 for
+    # more information.
+    formats.reverse()
+
+    try:
+        best_format = mimeparse.best_match(formats, accept)
+    except ValueError:
+        if cache is not None:
+            cache.set(accept, INVALID_ACCEPT)
+
+        raise BadRequest('Invalid Accept header')
+
+    if cache is not None:
+        cache.set(accept, best_format)
+
+    return best_format
+
+
 def build_content_type(format, encoding='utf-8'):
     """
     Appends character encoding to the provided format if not already present.
@@ -55,7 +93,7 @@ def build_content_type(format, encoding='utf-8'):
     if 'charset' in format:
         return format
 
-    if format in ('application/json', 'text/javascript'):
+    if format in ('application/json', 'text/javascript', 'application/x-msgpack'):
         return format
 
     return "%s; charset=%s" % (format, encoding)
@@ -0,0 +1,133 @@
+import array
+import base64
+import binascii
+import sys
+
+
+PACKED_ARRAYS_ATTRIBUTE = '_tastypie_packed_arrays'
+
+
+def get_dtype(typecode):
+    """
+    Returns the NumPy-style dtype (i.e. ``'<f8'``) matching an ``array``
+    typecode, always little-endian.
+    """
+    itemsize = array.array(typecode).itemsize
+
+    if typecode in 'fd':
+        kind = 'f'
+    elif typecode in 'BHIL':
+        kind = 'u'
+    else:
+        kind = 'i'
+
+    return '<%s%d' % (kind, itemsize)
+
+# The numeric ``array`` typecodes, by the dtype each is packed as (the
+# first typecode with a given dtype is used when unpacking).
+TYPECODES = {}
+
+for typecode in 'bBhHiIlLfd':
+    TYPECODES.setdefault(get_dtype(typecode), typecode)
+
+
+class PackedArray(object):
+    """
+    A list of numbers held as an ``array.array``, serialized compactly as a
+    dictionary of its ``dtype`` & the base64 of its little-endian bytes,
+    i.e. ``{"data": "AAAAAAAA8D8AAAAAAAAAQA==", "dtype": "<f8"}``.
+
+    Packing & unpacking are done by ``array`` & ``base64`` in one go, with
+    no per-number work in Python. See ``ListField(typecode=...)``.
+    """
+    def __init__(self, values, typecode='d'):
+        if not isinstance(values, array.array) or values.typecode != typecode:
+            values = array.array(typecode, values)
+
+        self.array = values
+
+    @property
+    def dtype(self):
+        return get_dtype(self.array.typecode)
+
+    def pack(self):
+        """
+        Returns the numbers as a bytestring, little-endian.
+        """
+        if sys.byteorder == 'little':
+            return self.array.tostring()
+
+        swapped = array.array(self.array.typecode, self.array)
+        swapped.byteswap()
+        return swapped.tostring()
+
+    def to_simple(self):
+        return {'dtype': self.dtype, 'data': base64.b64encode(self.pack())}
+
+    @classmethod
+    def from_simple(cls, data):
+        """
+        Builds a ``PackedArray`` from the dictionary ``to_simple`` returns.
+
+        Raises ``ValueError`` if it isn't one (or the dtype is unknown).
+        """
+        if not isinstance(data, dict) or not 'dtype' in data or not 'data' in data:
+            raise ValueError("Packed arrays need both a 'dtype' & 'data'.")
+
+        typecode = TYPECODES.get(data['dtype'])
+
+        if typecode is None:
+            raise ValueError("Unsupported dtype for a packed array: %r" % data['dtype'])
+
+        try:
+            packed = base64.b64decode(data['data'])
+        except (TypeError, binascii.Error, UnicodeEncodeError):
+            raise ValueError("The data of a packed array must be base64.")
+
+        values = array.array(typecode)
+
+        if len(packed) % values.itemsize:
+            raise ValueError("The data of a packed array isn't a whole number of '%s' items." % data['dtype'])
+
+        values.fromstring(packed)
+
+        if sys.byteorder != 'little':
+            values.byteswap()
+
+        return cls(values, typecode)
+
+    def tolist(self):
+        return self.array.tolist()
+
+    def __len__(self):
+        return len(self.array)
+
+    def __eq__(self, other):
+        if isinstance(other, PackedArray):
+            return self.array == other.array
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, PackedArray):
+            return self.array != other.array
+
+        return NotImplemented
+
+    def __repr__(self):
+        return '<PackedArray %s x %d>' % (self.dtype, len(self))
+
+
+def attach_packed_arrays(request):
+    """
+    Marks ``request`` as wanting ``ListFields`` with a ``typecode`` to be
+    dehydrated as ``PackedArrays``.
+    """
+    setattr(request, PACKED_ARRAYS_ATTRIBUTE, True)
+
+
+def get_packed_arrays(request):
+    """
+    Whether ``request`` was marked by ``attach_packed_arrays``.
+    """
+    return getattr(request, PACKED_ARRAYS_ATTRIBUTE, False)
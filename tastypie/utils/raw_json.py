@@ -0,0 +1,41 @@
+try:
+    import json as simplejson
+except ImportError: # < Python 2.6
+    from django.utils import simplejson
+
+
+class RawJSON(object):
+    """
+    A value that's already been serialized as JSON (for instance, a JSON
+    document stored in a text column).
+
+    ``Serializer.to_json`` writes it out verbatim, rather than decoding it
+    only to encode it all over again. Other formats ``load`` it first.
+    """
+    def __init__(self, json):
+        if isinstance(json, str):
+            json = json.decode('utf-8')
+
+        self.json = json
+
+    def load(self):
+        """
+        Returns the decoded data. It isn't kept, so each call decodes afresh
+        (& the data can be freely altered).
+        """
+        return simplejson.loads(self.json)
+
+    def __eq__(self, other):
+        if isinstance(other, RawJSON):
+            return self.json == other.json
+
+        return NotImplemented
+
+    def __ne__(self, other):
+        if isinstance(other, RawJSON):
+            return self.json != other.json
+
+        return NotImplemented
+
+    def __repr__(self):
+        return '<RawJSON: %r>' % self.json
@@ -28,6 +28,20 @@ class NoCacheTestCase(TestCase):
         self.assertEqual(cache.get('foo'), None)
         self.assertEqual(cache.get('moof'), None)
 
+    def test_get_many(self):
+        cache.set('foo', 'bar', 60)
+
+        no_cache = NoCache()
+        self.assertEqual(no_cache.get_many(['foo', 'moof']), {})
+
+    def test_set_many(self):
+        no_cache = NoCache()
+        no_cache.set_many({'foo': 'bar', 'moof': 'baz'})
+
+        # Use the underlying cache system to verify.
+        self.assertEqual(cache.get('foo'), None)
+        self.assertEqual(cache.get('moof'), None)
+
 
 class SimpleCacheTestCase(TestCase):
     def tearDown(self):
@@ -57,3 +71,21 @@ class SimpleCacheTestCase(TestCase):
         time.sleep(2)
         self.assertEqual(cache.get('moof'), None)
         self.assertEqual(cache.get('foo'), 'bar')
+
+    def test_get_many(self):
+        cache.set('foo', 'bar', 60)
+
+        simple_cache = SimpleCache()
+        self.assertEqual(simple_cache.get_many(['foo', 'moof']), {'foo': 'bar'})
+
+    def test_set_many(self):
+        simple_cache = SimpleCache(timeout=1)
+        simple_cache.set_many({'foo': 'bar', 'moof': 'baz'})
+
+        # Use the underlying cache system to verify.
+        self.assertEqual(cache.get('foo'), 'bar')
+        self.assertEqual(cache.get('moof'), 'baz')
+
+        # Check expiration.
+        time.sleep(2)
+        self.assertEqual(cache.get('foo'), None)
@@ -11,7 +11,7 @@ from tastypie.resources import ModelResource
 from core.models import Note, Subject, MediaBit
 from core.tests.mocks import MockRequest
 
-from tastypie.utils import aware_datetime, aware_date
+from tastypie.utils import aware_datetime, aware_date, RawJSON, PackedArray, attach_packed_arrays
 
 
 class ApiFieldTestCase(TestCase):
@@ -93,6 +93,15 @@ class ApiFieldTestCase(TestCase):
         field_6 = ApiField(attribute='what_time_is_it', default=True)
         self.assertEqual(field_6.dehydrate(bundle), aware_datetime(2010, 4, 1, 0, 48))
 
+    def test_get_attribute_bits(self):
+        field_1 = ApiField(attribute='author__username')
+        self.assertEqual(field_1.get_attribute_bits(), ['author', 'username'])
+        self.assertTrue(field_1.get_attribute_bits() is field_1.get_attribute_bits())
+
+        # Changing the attribute is picked up.
+        field_1.attribute = 'title'
+        self.assertEqual(field_1.get_attribute_bits(), ['title'])
+
     def test_convert(self):
         field_1 = ApiField()
         self.assertEqual(field_1.convert('foo'), 'foo')
@@ -348,6 +357,56 @@ class ListFieldTestCase(TestCase):
         field_2 = ListField(default=['abc'])
         self.assertEqual(field_2.dehydrate(bundle), ['abc'])
 
+    def test_dehydrate_packed(self):
+        note = Note.objects.get(pk=1)
+        request = MockRequest()
+        bundle = Bundle(obj=note, request=request)
+
+        field_1 = ListField(default=[1.5, 2.25, 3], typecode='d')
+        self.assertEqual(field_1.typecode, 'd')
+        # Only packed when the request asks.
+        self.assertEqual(field_1.dehydrate(bundle), [1.5, 2.25, 3])
+
+        attach_packed_arrays(request)
+        packed = field_1.dehydrate(bundle)
+        self.assertTrue(isinstance(packed, PackedArray))
+        self.assertEqual(packed.to_simple(), {'dtype': '<f8', 'data': 'AAAAAAAA+D8AAAAAAAACQAAAAAAAAAhA'})
+        self.assertEqual(packed.tolist(), [1.5, 2.25, 3.0])
+
+        # Without a ``typecode``, lists are left alone.
+        field_2 = ListField(default=[1, 2, 3])
+        self.assertEqual(field_2.dehydrate(bundle), [1, 2, 3])
+
+        field_3 = ListField(default=['abc'], typecode='d')
+        field_3.instance_name = 'samples'
+        self.assertRaises(ApiFieldError, field_3.dehydrate, bundle)
+
+        field_4 = ListField(null=True, typecode='d')
+        self.assertEqual(field_4.dehydrate(bundle), None)
+
+    def test_hydrate_packed(self):
+        field_1 = ListField(typecode='d')
+        field_1.instance_name = 'samples'
+
+        bundle = Bundle(data={'samples': [1.5, 2.25, 3]})
+        self.assertEqual(field_1.hydrate(bundle), [1.5, 2.25, 3])
+
+        bundle = Bundle(data={'samples': {'dtype': '<f8', 'data': 'AAAAAAAA+D8AAAAAAAACQAAAAAAAAAhA'}})
+        self.assertEqual(field_1.hydrate(bundle), [1.5, 2.25, 3.0])
+
+        # Whatever the field's ``typecode``, the data's own dtype is used.
+        bundle = Bundle(data={'samples': PackedArray([7, 8], 'i').to_simple()})
+        self.assertEqual(field_1.hydrate(bundle), [7, 8])
+
+        bundle = Bundle(data={'samples': {'dtype': '<c16', 'data': ''}})
+        self.assertRaises(ApiFieldError, field_1.hydrate, bundle)
+
+        bundle = Bundle(data={'samples': {'dtype': '<f8', 'data': 'AAAA'}})
+        self.assertRaises(ApiFieldError, field_1.hydrate, bundle)
+
+        bundle = Bundle(data={'samples': {'dtype': '<f8'}})
+        self.assertRaises(ApiFieldError, field_1.hydrate, bundle)
+
 
 class DictFieldTestCase(TestCase):
     fixtures = ['note_testdata.json']
@@ -374,6 +433,49 @@ class DictFieldTestCase(TestCase):
         self.assertEqual(field_2.dehydrate(bundle), {'name': 'Daniel'})
 
 
+class RawJSONFieldTestCase(TestCase):
+    fixtures = ['note_testdata.json']
+
+    def test_init(self):
+        field_1 = RawJSONField()
+        self.assertEqual(field_1.help_text, 'Data stored as JSON. Ex: {"price": 26.73, "name": "Daniel"}')
+
+    def test_dehydrated_type(self):
+        field_1 = RawJSONField()
+        self.assertEqual(field_1.dehydrated_type, 'json')
+
+    def test_dehydrate(self):
+        note = Note.objects.get(pk=1)
+        note.data = '{"price": 12.34, "tags": ["a"]}'
+        bundle = Bundle(obj=note)
+
+        field_1 = RawJSONField(attribute='data')
+        self.assertEqual(field_1.dehydrate(bundle), RawJSON('{"price": 12.34, "tags": ["a"]}'))
+        self.assertEqual(field_1.dehydrate(bundle).load(), {'price': 12.34, 'tags': ['a']})
+
+        field_2 = RawJSONField(default={'name': 'Daniel'})
+        self.assertEqual(field_2.dehydrate(bundle), {'name': 'Daniel'})
+
+        field_3 = RawJSONField(attribute='missing', null=True)
+        self.assertEqual(field_3.dehydrate(bundle), None)
+
+    def test_hydrate(self):
+        note = Note.objects.get(pk=1)
+        note.data = '{"price": 12.34}'
+        bundle = Bundle(obj=note, data={'data': {'price': 56.78}})
+
+        field_1 = RawJSONField(attribute='data')
+        field_1.instance_name = 'data'
+        self.assertEqual(field_1.hydrate(bundle), '{"price": 56.78}')
+
+        # What's already stored is left alone.
+        bundle = Bundle(obj=note, data={})
+        self.assertEqual(field_1.hydrate(bundle), '{"price": 12.34}')
+
+        bundle = Bundle(obj=note, data={'data': RawJSON('[1, 2]')})
+        self.assertEqual(field_1.hydrate(bundle), '[1, 2]')
+
+
 class BooleanFieldTestCase(TestCase):
     fixtures = ['note_testdata.json']
 
@@ -696,6 +798,20 @@ class ToOneFieldTestCase(TestCase):
         self.assertEqual(user_bundle.data['username'], u'johndoe')
         self.assertEqual(user_bundle.data['email'], u'john@doe.com')
 
+    def test_get_related_resource_is_pooled(self):
+        field_1 = ToOneField(UserResource, 'author', full=True)
+        user_resource = field_1.get_related_resource(User.objects.get(pk=1))
+        self.assertTrue(isinstance(user_resource, UserResource))
+        self.assertTrue(field_1.get_related_resource(User.objects.get(pk=2)) is user_resource)
+        self.assertFalse(hasattr(user_resource, 'instance'))
+
+        # The per-object data travels on the bundle instead.
+        note_1 = Note.objects.get(pk=1)
+        note_2 = Note.objects.get(pk=2)
+        note_2.author = User.objects.get(pk=2)
+        self.assertEqual(field_1.dehydrate(Bundle(obj=note_1)).data['username'], u'johndoe')
+        self.assertEqual(field_1.dehydrate(Bundle(obj=note_2)).data['username'], note_2.author.username)
+
     def test_dehydrate_with_callable(self):
         note = Note.objects.get(pk=1)
         bundle = Bundle(obj=note)
@@ -4,28 +4,30 @@ import datetime
 from decimal import Decimal
 import django
 import json
+import uuid
 from mock import patch
 
 from django.conf import settings
-from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser, User
 from django.core.cache import cache
 from django.core.exceptions import FieldError, MultipleObjectsReturned
 from django.core import mail
 from django.core.urlresolvers import reverse
 from django import forms
 from django.http import HttpRequest, QueryDict, Http404
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 
 from tastypie.authentication import BasicAuthentication
 from tastypie.authorization import Authorization
 from tastypie.bundle import Bundle
+from tastypie.cache import SimpleCache
 from tastypie.exceptions import InvalidFilterError, InvalidSortError, ImmediateHttpResponse, BadRequest, NotFound
 from tastypie import fields
 from tastypie.paginator import Paginator
 from tastypie.resources import Resource, ModelResource, ALL, ALL_WITH_RELATIONS, convert_post_to_put, convert_post_to_patch
 from tastypie.serializers import Serializer
 from tastypie.throttle import CacheThrottle
-from tastypie.utils import aware_datetime, make_naive
+from tastypie.utils import aware_datetime, make_naive, attach_identity_map
 from tastypie.validation import FormValidation
 from core.models import Note, NoteWithEditor, Subject, MediaBit, AutoNowNote, DateRecord, Counter
 from core.tests.mocks import MockRequest
@@ -385,6 +387,26 @@ class ResourceTestCase(TestCase):
         self.assertEqual(bundle_2.data['view_count'], 12)
         self.assertEqual(bundle_2.data.get('date_joined'), None)
 
+    def test_build_dehydration_plan(self):
+        basic = BasicResourceWithDifferentListAndDetailFields()
+
+        detail_plan = basic.build_dehydration_plan(for_list=False)
+        self.assertEqual(sorted([entry[0] for entry in detail_plan]), ['name', 'resource_uri', 'view_count'])
+        self.assertTrue(basic.build_dehydration_plan(for_list=False) is detail_plan)
+
+        list_plan = dict((entry[0], entry) for entry in basic.build_dehydration_plan(for_list=True))
+        self.assertEqual(sorted(list_plan.keys()), ['date_joined', 'name', 'resource_uri'])
+        self.assertEqual(list_plan['date_joined'][1], basic.fields['date_joined'])
+        self.assertEqual(list_plan['date_joined'][2], None)
+        self.assertEqual(list_plan['date_joined'][3], basic.dehydrate_date_joined)
+        self.assertEqual(list_plan['name'][3], None)
+
+        # Callables are kept around to be checked against each bundle.
+        basic = BasicResourceWithDifferentListAndDetailFieldsCallable()
+        plan = dict((entry[0], entry) for entry in basic.build_dehydration_plan(for_list=True))
+        self.assertEqual(sorted(plan.keys()), ['date_joined', 'name', 'resource_uri', 'view_count'])
+        self.assertTrue(callable(plan['view_count'][2]))
+
     def test_full_dehydrate(self):
         test_object_1 = TestObject()
         test_object_1.name = 'Daniel'
@@ -877,6 +899,22 @@ class AlwaysDataNoteResourceUseIn(NoteResource):
         authorization = Authorization()
 
 
+class StreamingDeserializationNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.filter(is_active=True)
+        authorization = Authorization()
+        streaming_deserialization = True
+
+
+class LimitedBodyNoteResource(NoteResource):
+    class Meta:
+        resource_name = 'notes'
+        queryset = Note.objects.all()
+        authorization = Authorization()
+        max_list_body_size = 100
+
+
 class VeryCustomNoteResource(NoteResource):
     author = fields.CharField(attribute='author__username')
     constant = fields.IntegerField(default=20)
@@ -1032,6 +1070,18 @@ class AlternativeCollectionNameNoteResource(ModelResource):
         authorization = Authorization()
 
 
+class SamplesNoteResource(ModelResource):
+    samples = fields.ListField(default=[0.5, 1.5], typecode='d')
+
+    class Meta:
+        queryset = Note.objects.filter(is_active=True)
+        resource_name = 'notes'
+        fields = ['title']
+        include_resource_uri = False
+        serializer = Serializer(formats=['json', 'xml'])
+        packed_formats = ['xml']
+
+
 class SubjectResource(ModelResource):
     class Meta:
         queryset = Subject.objects.all()
@@ -2049,6 +2099,28 @@ class ModelResourceTestCase(TestCase):
         self.assertEqual(resp.status_code, 202)
         self.assertTrue(resp.content.startswith('{"objects": ['))
 
+    def test_put_list_streaming_deserialization(self):
+        resource = StreamingDeserializationNoteResource()
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.META = {'CONTENT_TYPE': 'application/xml'}
+        request.method = 'PUT'
+
+        self.assertEqual(Note.objects.count(), 6)
+        setattr(request, self.body_attr, '<object><objects type="list"><object><content>The cat is back. The dog coughed him up out back.</content><created>2010-04-03 20:05:00</created><is_active type="boolean">True</is_active><slug>cat-is-back-again</slug><title>The Cat Is Back</title><updated>2010-04-03 20:05:00</updated></object></objects></object>')
+
+        resp = resource.put_list(request)
+        self.assertEqual(resp.status_code, 204)
+        self.assertEqual(Note.objects.count(), 3)
+        self.assertEqual(Note.objects.filter(is_active=True).count(), 1)
+        new_note = Note.objects.get(slug='cat-is-back-again')
+        self.assertEqual(new_note.content, "The cat is back. The dog coughed him up out back.")
+
+        # Broken data after the first object rolls back what was created.
+        setattr(request, self.body_attr, '<object><objects type="list"><object><content>Cut off.</content><created>2010-04-03 20:05:00</created><is_active type="boolean">True</is_active><slug>cut-off</slug><title>Cut Off</title><updated>2010-04-03 20:05:00</updated></object><object><content>Cut')
+        self.assertRaises(BadRequest, resource.put_list, request)
+        self.assertEqual(Note.objects.filter(slug='cut-off').count(), 0)
+
     def test_put_list_with_use_in(self):
         request = MockRequest()
         request.GET = {'format': 'json'}
@@ -2253,6 +2325,100 @@ class ModelResourceTestCase(TestCase):
         updated_note = Note.objects.get(pk=2)
         self.assertEqual(updated_note.content, "This is note 2.")
 
+    def test_patch_list_streaming_deserialization(self):
+        resource = StreamingDeserializationNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.META['CONTENT_TYPE'] = 'application/xml'
+        request.method = 'PATCH'
+        request._read_started = False
+
+        self.assertEqual(Note.objects.count(), 6)
+        # The deleted objects come first, but are still handled last.
+        request._raw_post_data = request._body = '<object><deleted_objects type="list"><value>/api/v1/notes/1/</value></deleted_objects><objects type="list"><object><content>The cat is back. The dog coughed him up out back.</content><created>2010-04-03 20:05:00</created><is_active type="boolean">True</is_active><slug>cat-is-back-again</slug><title>The Cat Is Back</title><updated>2010-04-03 20:05:00</updated></object><object><resource_uri>/api/v1/notes/2/</resource_uri><content>This is note 2.</content></object></objects></object>'
+
+        resp = resource.patch_list(request)
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(Note.objects.count(), 6)
+        self.assertEqual(Note.objects.filter(is_active=True).count(), 4)
+        new_note = Note.objects.get(slug='cat-is-back-again')
+        self.assertEqual(new_note.content, "The cat is back. The dog coughed him up out back.")
+        updated_note = Note.objects.get(pk=2)
+        self.assertEqual(updated_note.content, "This is note 2.")
+
+        # Missing the objects entirely.
+        request._raw_post_data = request._body = '<object><deleted_objects type="list"><value>/api/v1/notes/2/</value></deleted_objects></object>'
+        self.assertRaises(BadRequest, resource.patch_list, request)
+        self.assertEqual(Note.objects.filter(pk=2).count(), 1)
+
+    def test_patch_list_streaming_deserialization_json(self):
+        resource = StreamingDeserializationNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PATCH'
+        request._read_started = False
+
+        self.assertEqual(Note.objects.count(), 6)
+        request._raw_post_data = request._body = '{"deleted_objects": ["/api/v1/notes/1/"], "objects": [{"content": "The cat is back. The dog coughed him up out back.", "created": "2010-04-03 20:05:00", "is_active": true, "slug": "cat-is-back-again", "title": "The Cat Is Back", "updated": "2010-04-03 20:05:00"}, {"resource_uri": "/api/v1/notes/2/", "content": "This is note 2."}]}'
+
+        resp = resource.patch_list(request)
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(Note.objects.count(), 6)
+        self.assertEqual(Note.objects.filter(is_active=True).count(), 4)
+        updated_note = Note.objects.get(pk=2)
+        self.assertEqual(updated_note.content, "This is note 2.")
+
+        # Broken data part way through is a ``BadRequest``.
+        request._raw_post_data = request._body = '{"objects": [{"resource_uri": "/api/v1/notes/2/", "content": "Broken."}, {"content": '
+        self.assertRaises(BadRequest, resource.patch_list, request)
+
+    def test_list_body_size(self):
+        resource = LimitedBodyNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PATCH'
+        request._read_started = False
+        request._raw_post_data = request._body = '{"objects": [{"resource_uri": "/api/v1/notes/2/", "content": "This is note 2, with quite a lot more to say than usual."}]}'
+
+        # Refused by the header, before the body is read.
+        request.META['CONTENT_LENGTH'] = '1000000'
+
+        try:
+            resource.patch_list(request)
+            self.fail()
+        except ImmediateHttpResponse, e:
+            self.assertEqual(e.response.status_code, 413)
+
+        # Or by the body itself.
+        del request.META['CONTENT_LENGTH']
+
+        try:
+            resource.patch_list(request)
+            self.fail()
+        except ImmediateHttpResponse, e:
+            self.assertEqual(e.response.status_code, 413)
+
+        self.assertEqual(Note.objects.get(pk=2).content, "The dog ate my cat today. He looks seriously uncomfortable.")
+
+        request._raw_post_data = request._body = '{"objects": [{"resource_uri": "/api/v1/notes/2/", "content": "Short."}]}'
+        resp = resource.patch_list(request)
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(Note.objects.get(pk=2).content, "Short.")
+
+    def test_preload_via_uris(self):
+        resource = LimitedBodyNoteResource()
+        request = HttpRequest()
+        attach_identity_map(request)
+        identity_map = resource.get_identity_map(request)
+
+        with self.assertNumQueries(1):
+            resource.preload_via_uris(request, ['/api/v1/notes/1/', '/api/v1/notes/2/', '/api/v1/notes/99999/', '/not/a/resource/', None])
+
+        self.assertEqual(len(identity_map), 2)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resource.get_via_uri('/api/v1/notes/2/', request=request).pk, 2)
+
     def test_patch_list_return_data(self):
         always_resource = AlwaysDataNoteResource()
         request = HttpRequest()
@@ -2423,6 +2589,39 @@ class ModelResourceTestCase(TestCase):
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.content, '{"content": "This is my very first post using my shiny new API. Pretty sweet, huh?", "created": "2010-03-30T20:05:00", "id": 1, "is_active": true, "resource_uri": "/api/v1/notes/1/", "slug": "first-post", "title": "First Post!", "updated": "2010-03-30T20:05:00"}')
 
+    def test_dispatch_packed_arrays(self):
+        resource = SamplesNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        resp = resource.dispatch_detail(request, pk=1)
+        self.assertEqual(resp.content, '{"samples": [0.5, 1.5], "title": "First Post!"}')
+
+        request = HttpRequest()
+        request.GET = {'format': 'json', 'packed': 'true'}
+        request.method = 'GET'
+        self.assertTrue(resource.use_packed_arrays(request))
+
+        resp = resource.dispatch_detail(request, pk=1)
+        self.assertEqual(resp.content, '{"samples": {"data": "AAAAAAAA4D8AAAAAAAD4Pw==", "dtype": "<f8"}, "title": "First Post!"}')
+
+        resp = resource.dispatch_list(request)
+        data = json.loads(resp.content)
+        self.assertEqual(data['objects'][0]['samples'], {'data': 'AAAAAAAA4D8AAAAAAAD4Pw==', 'dtype': '<f8'})
+
+        # Packed by default for the ``Meta.packed_formats``...
+        request = HttpRequest()
+        request.GET = {'format': 'xml'}
+        self.assertTrue(resource.use_packed_arrays(request))
+
+        # ...unless the request says otherwise.
+        request.GET = {'format': 'xml', 'packed': 'false'}
+        self.assertFalse(resource.use_packed_arrays(request))
+
+        request.GET = {'format': 'json'}
+        self.assertFalse(resource.use_packed_arrays(request))
+
     def test_dispatch(self):
         resource = NoteResource()
         request = HttpRequest()
@@ -2783,6 +2982,192 @@ class ModelResourceTestCase(TestCase):
             self.assertIn('constant', note)
             self.assertNotIn('author', note)
 
+    def test_get_multiple_batched(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        # One query for all of them, in the order requested.
+        with self.assertNumQueries(1):
+            resp = resource.get_multiple(request, pk_list='6;1;3;2;1')
+
+        self.assertEqual(resp.status_code, 200)
+        content = json.loads(resp.content)
+        self.assertEqual([note['id'] for note in content['objects']], [6, 1, 2, 1])
+        self.assertEqual(content['not_found'], ['3'])
+
+        self.assertRaises(NotFound, resource.get_multiple, request, pk_list='1;abc')
+
+        class NotTwoAuthorization(Authorization):
+            def read_list(self, object_list, bundle):
+                return object_list.exclude(pk=2)
+
+        class NotTwoNoteResource(NoteResource):
+            class Meta(NoteResource.Meta):
+                authorization = NotTwoAuthorization()
+
+        content = json.loads(NotTwoNoteResource().get_multiple(request, pk_list='1;2').content)
+        self.assertEqual([note['id'] for note in content['objects']], [1])
+        self.assertEqual(content['not_found'], ['2'])
+
+    def test_get_multiple_loose_match(self):
+        class CaseInsensitiveAuthorization(Authorization):
+            def read_list(self, object_list, bundle):
+                # What a case-insensitive collation would have matched.
+                return Note.objects.filter(slug__in=['first-post', 'another-post'])
+
+        class SlugNoteResource(NoteResource):
+            class Meta(NoteResource.Meta):
+                detail_uri_name = 'slug'
+                authorization = CaseInsensitiveAuthorization()
+
+        resource = SlugNoteResource()
+        objects = resource.obj_get_multiple(resource.build_bundle(request=HttpRequest()), ['First-Post', 'another-post', 'missing'])
+        self.assertEqual(sorted([(identifier, obj.pk) for identifier, obj in objects.items()]), [('First-Post', 1), ('another-post', 2)])
+
+        self.assertEqual(resource.get_identifier_key(Decimal('1.50')), resource.get_identifier_key(Decimal('1.5')))
+        self.assertEqual(resource.get_identifier_key(uuid.UUID('{12345678-1234-5678-1234-567812345678}')), u'12345678123456781234567812345678')
+
+    def test_get_multiple_post(self):
+        resource = NoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'POST'
+        request._raw_post_data = request._body = '{"pk_list": [4, 3, 1]}'
+
+        resp = resource.get_multiple(request)
+        self.assertEqual(resp.status_code, 200)
+        content = json.loads(resp.content)
+        self.assertEqual([note['id'] for note in content['objects']], [4, 1])
+        self.assertEqual(content['not_found'], ['3'])
+
+        request._raw_post_data = request._body = '{"pk_list": "4;1"}'
+        self.assertRaises(BadRequest, resource.get_multiple, request)
+
+    def test_get_multiple_cached(self):
+        class CachedNoteResource(NoteResource):
+            class Meta(NoteResource.Meta):
+                cache = SimpleCache()
+
+        resource = CachedNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+        cache.clear()
+
+        # Shares the cache with ``cached_obj_get``.
+        resource.cached_obj_get(resource.build_bundle(request=request), pk='1')
+
+        with self.assertNumQueries(1):
+            content = json.loads(resource.get_multiple(request, pk_list='1;2').content)
+
+        self.assertEqual([note['id'] for note in content['objects']], [1, 2])
+
+        with self.assertNumQueries(0):
+            content = json.loads(resource.get_multiple(request, pk_list='2;1').content)
+
+        self.assertEqual([note['id'] for note in content['objects']], [2, 1])
+
+        class NotTwoAuthorization(Authorization):
+            def read_list(self, object_list, bundle):
+                return object_list.exclude(pk=2)
+
+        class NotTwoCachedNoteResource(CachedNoteResource):
+            class Meta(CachedNoteResource.Meta):
+                authorization = NotTwoAuthorization()
+
+        # Cached objects are filtered like fetched ones, not a 401.
+        with self.assertNumQueries(1):
+            content = json.loads(NotTwoCachedNoteResource().get_multiple(request, pk_list='1;2').content)
+
+        self.assertEqual([note['id'] for note in content['objects']], [1])
+        self.assertEqual(content['not_found'], ['2'])
+        cache.clear()
+
+    def test_dispatch_cached_responses(self):
+        class ResponseCachedNoteResource(NoteResource):
+            class Meta(NoteResource.Meta):
+                cache = SimpleCache(varies=['Accept', 'X-Version'])
+                cache_responses = True
+
+        resource = ResponseCachedNoteResource()
+        cache.clear()
+
+        def get(params, **meta):
+            request = HttpRequest()
+            request.GET = QueryDict(params)
+            request.META = meta
+            request.method = 'GET'
+            return resource.wrap_view('dispatch_list')(request)
+
+        with self.assertNumQueries(2):
+            resp = get('format=json&limit=2&offset=1')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/json')
+        self.assertEqual(resp['Vary'], 'Accept, X-Version')
+        content = resp.content
+
+        # The same request (with the parameters in any order & cache busters
+        # ignored) is served straight from the cache.
+        with self.assertNumQueries(0):
+            resp = get('offset=1&limit=2&format=json&_=1234')
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'application/json')
+        self.assertEqual(resp['Vary'], 'Accept, X-Version')
+        self.assertEqual(resp.content, content)
+
+        # As is the same format, negotiated differently.
+        with self.assertNumQueries(0):
+            resp = get('offset=1&limit=2', HTTP_ACCEPT='application/json')
+
+        self.assertEqual(resp.content, content)
+
+        # Anything else that matters isn't.
+        with self.assertNumQueries(2):
+            self.assertEqual(get('format=json&limit=2&offset=2').status_code, 200)
+
+        with self.assertNumQueries(2):
+            resp = get('format=xml&limit=2&offset=1')
+
+        self.assertTrue(resp['Content-Type'].startswith('application/xml'))
+
+        with self.assertNumQueries(2):
+            self.assertEqual(get('format=json&limit=2&offset=1', HTTP_X_VERSION='2').content, content)
+
+        request = HttpRequest()
+        request.GET = {'format': 'json', 'limit': '2', 'offset': '1'}
+        request.method = 'GET'
+        request.user = User.objects.get(username='johndoe')
+        key = resource.generate_response_cache_key('list', request)
+        request.user = AnonymousUser()
+        self.assertNotEqual(resource.generate_response_cache_key('list', request), key)
+
+        # Changes made through the resource invalidate the cached responses.
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        request._read_started = False
+        request._raw_post_data = request._body = '{"title": "Changed", "slug": "another-post"}'
+        self.assertEqual(resource.wrap_view('dispatch_detail')(request, pk=2).status_code, 204)
+
+        with self.assertNumQueries(2):
+            resp = get('format=json&limit=2&offset=1')
+
+        self.assertNotEqual(resp.content, content)
+        self.assertTrue('"title": "Changed"' in resp.content)
+
+        # Errors aren't cached.
+        self.assertEqual(get('format=json&title__nonsense=1').status_code, 400)
+        request = HttpRequest()
+        request.GET = {'format': 'json', 'title__nonsense': '1'}
+        request.method = 'GET'
+        self.assertEqual(resource.get_cached_response(resource.generate_response_cache_key('list', request)), None)
+
+        cache.clear()
+
     def test_check_throttling(self):
         # Stow.
         old_debug = settings.DEBUG
@@ -3605,6 +3990,29 @@ class ModelResourceTestCase(TestCase):
         self.assertEqual(response.status_code, 202)
 
 
+class ModelResourceTransactionTestCase(TransactionTestCase):
+    # ``TestCase`` doesn't really roll transactions back.
+    fixtures = ['note_testdata.json']
+
+    def test_put_list_streaming_deserialization_atomic(self):
+        resource = StreamingDeserializationNoteResource()
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PUT'
+        request._read_started = False
+
+        self.assertEqual(Note.objects.count(), 6)
+        self.assertEqual(Note.objects.filter(is_active=True).count(), 4)
+
+        # The body is cut off after the existing notes have been deleted.
+        request._raw_post_data = request._body = '{"objects": [{"content": "Cut off.", "created": "2010-04-03 20:05:00", "is_active": true, "slug": "cut-off", "title": "Cut Off", "updated": "2010-04-03 20:05:00"}, {"content": '
+        self.assertRaises(BadRequest, resource.put_list, request)
+
+        self.assertEqual(Note.objects.count(), 6)
+        self.assertEqual(Note.objects.filter(is_active=True).count(), 4)
+        self.assertEqual(Note.objects.filter(slug='cut-off').count(), 0)
+
+
 class BasicAuthResourceTestCase(TestCase):
     fixtures = ['note_testdata.json']
 
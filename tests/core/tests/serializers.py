@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import datetime
+import json
+import itertools
 import yaml
 from decimal import Decimal
 from django.conf import settings
@@ -7,16 +9,27 @@ from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase
 from tastypie.bundle import Bundle
 from tastypie import fields
-from tastypie.exceptions import BadRequest
+from tastypie.exceptions import BadRequest, UnsupportedFormat
 from tastypie.serializers import Serializer
 from tastypie.resources import ModelResource
+from tastypie.utils import make_aware, PackedArray, RawJSON
 from core.models import Note
 
+try:
+    from django.utils.timezone import utc
+except ImportError: # Django < 1.4
+    utc = None
+
 try:
     import biplist
 except ImportError:
     biplist = None
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 
 class UnsafeObject(object):
     pass
@@ -48,12 +61,12 @@ class SerializerTestCase(TestCase):
     def test_init(self):
         serializer_1 = Serializer()
         self.assertEqual(serializer_1.formats, ['json', 'xml', 'yaml', 'html', 'plist'])
-        self.assertEqual(serializer_1.content_types, {'xml': 'application/xml', 'yaml': 'text/yaml', 'json': 'application/json', 'jsonp': 'text/javascript', 'html': 'text/html', 'plist': 'application/x-plist'})
+        self.assertEqual(serializer_1.content_types, {'xml': 'application/xml', 'yaml': 'text/yaml', 'json': 'application/json', 'jsonp': 'text/javascript', 'html': 'text/html', 'plist': 'application/x-plist', 'msgpack': 'application/x-msgpack', 'csv': 'text/csv', 'ndjson': 'application/x-ndjson'})
         self.assertEqual(serializer_1.supported_formats, ['application/json', 'application/xml', 'text/yaml', 'text/html', 'application/x-plist'])
 
         serializer_2 = Serializer(formats=['json', 'xml'])
         self.assertEqual(serializer_2.formats, ['json', 'xml'])
-        self.assertEqual(serializer_2.content_types, {'xml': 'application/xml', 'yaml': 'text/yaml', 'json': 'application/json', 'jsonp': 'text/javascript', 'html': 'text/html', 'plist': 'application/x-plist'})
+        self.assertEqual(serializer_2.content_types, {'xml': 'application/xml', 'yaml': 'text/yaml', 'json': 'application/json', 'jsonp': 'text/javascript', 'html': 'text/html', 'plist': 'application/x-plist', 'msgpack': 'application/x-msgpack', 'csv': 'text/csv', 'ndjson': 'application/x-ndjson'})
         self.assertEqual(serializer_2.supported_formats, ['application/json', 'application/xml'])
 
         serializer_3 = Serializer(formats=['json', 'xml'], content_types={'json': 'text/json', 'xml': 'application/xml'})
@@ -80,7 +93,7 @@ class SerializerTestCase(TestCase):
             s = Serializer()
             self.assertItemsEqual(s.formats, ['json', 'xml'])
             self.assertItemsEqual(s.supported_formats, ['application/json', 'application/xml'])
-            self.assertDictEqual(s.content_types, {'xml': 'application/xml', 'yaml': 'text/yaml', 'json': 'application/json', 'jsonp': 'text/javascript', 'html': 'text/html', 'plist': 'application/x-plist'})
+            self.assertDictEqual(s.content_types, {'xml': 'application/xml', 'yaml': 'text/yaml', 'json': 'application/json', 'jsonp': 'text/javascript', 'html': 'text/html', 'plist': 'application/x-plist', 'msgpack': 'application/x-msgpack', 'csv': 'text/csv', 'ndjson': 'application/x-ndjson'})
 
             # Confirm that subclasses which set their own formats list won't be overriden:
             class JSONSerializer(Serializer):
@@ -96,6 +109,20 @@ class SerializerTestCase(TestCase):
             else:
                 settings.TASTYPIE_DEFAULT_FORMATS = old_formats
 
+    def test_format_tables(self):
+        serializer = Serializer()
+        self.assertEqual(serializer.serialize_formats['application/json'], 'json')
+        self.assertEqual(serializer.serialize_formats['text/javascript'], 'jsonp')
+        self.assertEqual(serializer.stream_formats['application/xml'], 'xml')
+        self.assertFalse('text/yaml' in serializer.stream_formats)
+        self.assertEqual(serializer.deserialize_formats['application/x-plist'], 'plist')
+        self.assertFalse('text/javascript' in serializer.deserialize_formats)
+
+        serializer = Serializer(content_types={'json': 'text/json', 'xml': 'application/xml'}, formats=['json', 'xml'])
+        self.assertEqual(serializer.serialize_formats, {'text/json': 'json', 'application/xml': 'xml'})
+        self.assertEqual(serializer.deserialize('{"a": 1}', 'text/json; charset=UTF-8'), {'a': 1})
+        self.assertRaises(UnsupportedFormat, serializer.serialize, {}, 'application/json')
+
     def get_sample1(self):
         return {
             'name': 'Daniel',
@@ -206,6 +233,36 @@ class SerializerTestCase(TestCase):
         # Restore.
         settings.TASTYPIE_DATETIME_FORMATTING = old_format
 
+    def test_format_cached(self):
+        serializer = Serializer()
+        created = datetime.datetime(2010, 12, 16, 2, 31, 33)
+        self.assertEqual(serializer.format_datetime(created), '2010-12-16T02:31:33')
+        self.assertEqual(serializer.format_datetime(created), '2010-12-16T02:31:33')
+        self.assertEqual(len(serializer.datetime_formatter._datetimes), 1)
+
+        if utc is not None:
+            # Aware datetimes are converted to the default timezone. Equal
+            # moments share a cache entry.
+            aware = make_aware(created)
+            self.assertEqual(serializer.format_datetime(aware), '2010-12-16T02:31:33')
+            self.assertEqual(serializer.format_datetime(aware.astimezone(utc)), '2010-12-16T02:31:33')
+            self.assertEqual(len(serializer.datetime_formatter._datetimes), 2)
+            self.assertEqual(Serializer(datetime_formatting='rfc-2822').format_datetime(aware.astimezone(utc)), u'Thu, 16 Dec 2010 02:31:33 -0600')
+
+        serializer = Serializer(datetime_formatting='rfc-2822')
+        self.assertEqual(serializer.format_datetime(created), u'Thu, 16 Dec 2010 02:31:33 -0600')
+        self.assertEqual(serializer.format_date(datetime.date(2010, 12, 16)), u'16 Dec 2010')
+        self.assertEqual(serializer.format_time(datetime.time(2, 31, 33)), u'02:31:33 -0600')
+
+        # The caches are bounded.
+        serializer = Serializer()
+        serializer.datetime_formatter.cache_size = 2
+
+        for day in range(1, 6):
+            self.assertEqual(serializer.format_date(datetime.date(2010, 12, day)), '2010-12-0%d' % day)
+
+        self.assertTrue(len(serializer.datetime_formatter._dates) <= 2)
+
     def test_to_xml(self):
         serializer = Serializer()
         sample_1 = self.get_sample1()
@@ -247,6 +304,63 @@ class SerializerTestCase(TestCase):
         sample_1 = self.get_sample1()
         self.assertEqual(serializer.to_json(sample_1), u'{"age": 27, "date_joined": "2010-03-27", "name": "Daniel", "snowman": "☃"}')
 
+    def test_to_json_encoder(self):
+        serializer = Serializer()
+        data = {
+            'numbers': [1, 2.5, 10 ** 20, Decimal('1.50'), True, None],
+            'strings': [u'☃', 'caf\xc3\xa9', '"quoted"\n\t\\', u'\x01'],
+            'bundle': Bundle(data={
+                'when': datetime.datetime(2010, 12, 16, 3, 2, 14),
+                'day': datetime.date(2010, 12, 16),
+                'time': datetime.time(3, 2, 14),
+            }),
+            'other': (set([1]), {1: 'one', 2.5: 'two and a half', None: 'none'}),
+        }
+
+        # Written in one pass, but the same as simplifying & dumping.
+        expected = json.dumps(serializer.to_simple(data, {}), sort_keys=True, ensure_ascii=False)
+        self.assertEqual(serializer.to_json(data), expected)
+
+        class UpperSerializer(Serializer):
+            def to_simple(self, data, options):
+                data = super(UpperSerializer, self).to_simple(data, options)
+
+                if isinstance(data, unicode):
+                    return data.upper()
+
+                return data
+
+        # A customized ``to_simple`` is still used.
+        self.assertEqual(UpperSerializer().to_json({'name': 'daniel'}), u'{"name": "DANIEL"}')
+
+    def test_raw_json(self):
+        serializer = Serializer()
+        data = {'doc': RawJSON('{"b": [1,2],  "a": "\xe2\x98\x83"}'), 'name': 'Daniel'}
+
+        # JSON gets the string verbatim.
+        self.assertEqual(serializer.to_json(data), u'{"doc": {"b": [1,2],  "a": "\u2603"}, "name": "Daniel"}')
+        self.assertEqual(serializer.to_json(Bundle(data={'doc': RawJSON('[]')})), u'{"doc": []}')
+
+        # Other formats get the decoded data.
+        self.assertEqual(serializer.to_simple(data, {}), {'doc': {'a': u'\u2603', 'b': [1, 2]}, 'name': 'Daniel'})
+        self.assertEqual(serializer.to_xml(data), serializer.to_xml({'doc': {'a': u'\u2603', 'b': [1, 2]}, 'name': 'Daniel'}))
+        self.assertEqual(serializer.to_etree(data).find('doc').get('type'), 'hash')
+
+    def test_packed_array(self):
+        serializer = Serializer()
+        samples = PackedArray([0.5, -1.0, 1e100], 'd')
+        data = {'samples': samples, 'name': 'Daniel'}
+        simple = {'samples': {'dtype': '<f8', 'data': 'AAAAAAAA4D8AAAAAAADwv33DlCWtSbJU'}, 'name': 'Daniel'}
+
+        self.assertEqual(serializer.to_simple(data, {}), simple)
+        self.assertEqual(serializer.to_json(data), json.dumps(simple, sort_keys=True))
+        self.assertEqual(serializer.to_json(Bundle(data=data)), json.dumps(simple, sort_keys=True))
+        self.assertEqual(serializer.to_xml(data), serializer.to_xml(simple))
+
+        # It round trips.
+        self.assertEqual(PackedArray.from_simple(serializer.from_json(serializer.to_json(data))['samples']), samples)
+        self.assertEqual(PackedArray.from_simple(simple['samples']).tolist(), [0.5, -1.0, 1e100])
+
     def test_from_json(self):
         serializer = Serializer()
 
@@ -257,6 +371,34 @@ class SerializerTestCase(TestCase):
         self.assertEqual(sample_1['date_joined'], u'2010-03-27')
         self.assertEqual(sample_1['snowman'], u'☃')
 
+    def test_stream_from_json(self):
+        serializer = Serializer()
+        data = '{"objects": [{"name": "Daniel", "tags": ["a", "b"]}, {"snowman": "\\u2603"}], "deleted_objects": ["/api/v1/notes/1/"], "meta": {"total_count": 2}}'
+
+        pairs = {}
+
+        for key, value in serializer.deserialize_stream(data, 'application/json'):
+            if key in ('objects', 'deleted_objects'):
+                # Arrays come out an item at a time.
+                self.assertFalse(isinstance(value, list))
+                value = list(value)
+
+            pairs[key] = value
+
+        self.assertEqual(pairs, serializer.from_json(data))
+
+        # Whatever's left of an array is skipped.
+        pairs = serializer.stream_from_json(data)
+        key, objects = pairs.next()
+        self.assertEqual(objects.next(), {'name': 'Daniel', 'tags': ['a', 'b']})
+        self.assertEqual([key for key, value in pairs], ['deleted_objects', 'meta'])
+
+        # Anything but an object has no pairs.
+        self.assertEqual(list(serializer.stream_from_json('[1, 2]')), [])
+
+        for broken in ('{"objects": [{"name": "Daniel"}, {"name": ', '{"objects": [] "meta": {}}', '{"objects": []} []'):
+            self.assertRaises(BadRequest, lambda: [list(value) if key == 'objects' else value for key, value in serializer.stream_from_json(broken)])
+
     def test_round_trip_xml(self):
         serializer = Serializer()
         sample_data = self.get_sample2()
@@ -344,6 +486,75 @@ class SerializerTestCase(TestCase):
         self.assertEqual(sample_1['date_joined'], u'2010-03-27')
         self.assertEqual(sample_1['snowman'], u'☃')
 
+    def test_to_msgpack(self):
+        if not msgpack:
+            return
+
+        serializer = Serializer()
+
+        sample_1 = self.get_sample1()
+        packed = serializer.to_msgpack(sample_1)
+        self.assertTrue(isinstance(packed, str))
+        self.assertEqual(serializer.from_msgpack(packed), {'snowman': u'☃', 'age': 27, 'name': u'Daniel', 'date_joined': u'2010-03-27'})
+
+        sample_2 = self.get_sample2()
+        self.assertEqual(serializer.from_msgpack(serializer.to_msgpack(sample_2)), sample_2)
+
+    def test_from_msgpack(self):
+        if not msgpack:
+            return
+
+        serializer = Serializer()
+
+        sample_1 = serializer.from_msgpack('\x84\xa7snowman\xa3\xe2\x98\x83\xa3age\x1b\xa4name\xa6Daniel\xabdate_joined\xaa2010-03-27')
+        self.assertEqual(len(sample_1), 4)
+        self.assertEqual(sample_1['name'], 'Daniel')
+        self.assertEqual(sample_1['age'], 27)
+        self.assertEqual(sample_1['date_joined'], u'2010-03-27')
+        self.assertEqual(sample_1['snowman'], u'☃')
+
+    def test_to_csv(self):
+        serializer = Serializer()
+        related = Bundle(data={'name': 'Ignored', 'resource_uri': '/api/v1/users/1/'})
+        data = {
+            'meta': {'total_count': 2},
+            'objects': [
+                Bundle(data={'name': u'☃, "snowman"', 'age': 27, 'active': True, 'date_joined': datetime.date(2010, 3, 27), 'aliases': ['a', 'b'], 'user': related}),
+                {'name': 'Daniel', 'age': None},
+            ],
+        }
+        self.assertEqual(serializer.to_csv(data), 'active,age,aliases,date_joined,name,user\r\ntrue,27,"[""a"", ""b""]",2010-03-27,"\xe2\x98\x83, ""snowman""",/api/v1/users/1/\r\n,,,,Daniel,\r\n')
+
+        # A single object is a single row. Iterators are streamed a row at a
+        # time.
+        self.assertEqual(serializer.to_csv(related), 'name,resource_uri\r\nIgnored,/api/v1/users/1/\r\n')
+        chunks = list(serializer.stream_csv({'items': iter([{'a': 1}, {'a': 2}])}, {'collection_name': 'items'}))
+        self.assertEqual(chunks, ['a\r\n1\r\n', '2\r\n'])
+
+        # Every field gets a column, whichever row it first turns up in.
+        self.assertEqual(serializer.to_csv([{'a': 1}, {'a': 2, 'b': 3}], {'field_names': ['c']}), 'a,b,c\r\n1,,\r\n2,3,\r\n')
+        chunks = serializer.stream_csv({'objects': iter([{'a': 1}, {'a': 2, 'c': 3}])}, {'field_names': ['c']})
+        self.assertEqual(list(chunks), ['a,c\r\n1,\r\n', '2,3\r\n'])
+
+        # If an iterator's later row has fields that weren't known up front,
+        # they aren't silently dropped.
+        chunks = serializer.stream_csv({'objects': iter([{'a': 1}, {'a': 2, 'b': 3}])})
+        self.assertEqual(chunks.next(), 'a\r\n1\r\n')
+        self.assertRaises(ValueError, chunks.next)
+
+    def test_to_ndjson(self):
+        serializer = Serializer()
+        related = Bundle(data={'name': 'Ignored', 'resource_uri': '/api/v1/users/1/'})
+        data = {
+            'meta': {'total_count': 2},
+            'objects': [
+                Bundle(data={'name': u'☃\nsnowman', 'users': [related]}),
+                {'name': 'Daniel', 'age': None},
+            ],
+        }
+        self.assertEqual(serializer.to_ndjson(data), u'{"name": "☃\\nsnowman", "users": ["/api/v1/users/1/"]}\n{"age": null, "name": "Daniel"}\n')
+        self.assertEqual(list(serializer.stream_ndjson({'objects': iter([{'a': 1}, {'a': 2}])})), [u'{"a": 1}\n', u'{"a": 2}\n'])
+
 class ResourceSerializationTestCase(TestCase):
     fixtures = ['note_testdata.json']
 
@@ -375,6 +586,30 @@ class ResourceSerializationTestCase(TestCase):
         }
         self.assertEqual(serializer.to_xml(data), '<?xml version=\'1.0\' encoding=\'utf-8\'?>\n<response><stuff type="hash"><foo>bar</foo><object><updated>2010-03-30T20:05:00</updated><created>2010-03-30T20:05:00</created><title>First Post!</title><is_active type="boolean">True</is_active><slug>first-post</slug><content>This is my very first post using my shiny new API. Pretty sweet, huh?</content><id type="integer">1</id><resource_uri></resource_uri></object></stuff></response>')
 
+    def test_iter_xml(self):
+        from lxml.etree import tostring
+        serializer = Serializer()
+        data = {
+            'meta': {'total_count': 4, 'previous': None},
+            'objects': self.another_obj_list,
+            'empty': [],
+            'nothing': {},
+        }
+
+        for sample in (data, self.obj_list, self.obj_list[0], {'somelist': ['a', 1, None], 'somehash': {'pi': 3.14}}, []):
+            chunks = list(serializer.iter_xml(sample))
+            self.assertTrue(len(chunks) > 1 or not sample)
+            self.assertEqual(''.join(chunks), tostring(serializer.to_etree(sample), encoding='utf-8'))
+
+        # A customized ``to_etree`` is still used.
+        class CustomSerializer(Serializer):
+            def to_etree(self, data, options=None, name=None, depth=0):
+                element = super(CustomSerializer, self).to_etree(data, options, name, depth)
+                element.set('custom', 'yes')
+                return element
+
+        self.assertEqual(CustomSerializer().to_xml({'foo': 'bar'}), '<?xml version=\'1.0\' encoding=\'utf-8\'?>\n<response custom="yes"><foo custom="yes">bar</foo></response>')
+
     def test_to_json_multirepr(self):
         serializer = Serializer()
         self.assertEqual(serializer.to_json(self.obj_list), '[{"content": "This is my very first post using my shiny new API. Pretty sweet, huh?", "created": "2010-03-30T20:05:00", "id": 1, "is_active": true, "resource_uri": "", "slug": "first-post", "title": "First Post!", "updated": "2010-03-30T20:05:00"}, {"content": "The dog ate my cat today. He looks seriously uncomfortable.", "created": "2010-03-31T20:05:00", "id": 2, "is_active": true, "resource_uri": "", "slug": "another-post", "title": "Another Post", "updated": "2010-03-31T20:05:00"}, {"content": "My neighborhood\'s been kinda weird lately, especially after the lava flow took out the corner store. Granny can hardly outrun the magma with her walker.", "created": "2010-04-01T20:05:00", "id": 4, "is_active": true, "resource_uri": "", "slug": "recent-volcanic-activity", "title": "Recent Volcanic Activity.", "updated": "2010-04-01T20:05:00"}, {"content": "Man, the second eruption came on fast. Granny didn\'t have a chance. On the upshot, I was able to save her walker and I got a cool shawl out of the deal!", "created": "2010-04-02T10:05:00", "id": 6, "is_active": true, "resource_uri": "", "slug": "grannys-gone", "title": "Granny\'s Gone", "updated": "2010-04-02T10:05:00"}]')
@@ -400,6 +635,63 @@ class ResourceSerializationTestCase(TestCase):
         }
         self.assertEqual(serializer.to_json(data), '{"stuff": {"foo": "bar", "object": {"content": "This is my very first post using my shiny new API. Pretty sweet, huh?", "created": "2010-03-30T20:05:00", "id": 1, "is_active": true, "resource_uri": "", "slug": "first-post", "title": "First Post!", "updated": "2010-03-30T20:05:00"}}}')
 
+    def test_to_json_bundle_shapes(self):
+        serializer = Serializer()
+        bundle = self.obj_list[0]
+        self.assertEqual(bundle.shape, self.resource.get_bundle_shape(tuple(self.resource.fields.keys())))
+        self.assertEqual(dict(bundle.shape)['created'], 'datetime')
+
+        def generic(data):
+            return json.dumps(serializer.to_simple(data, {}), sort_keys=True, ensure_ascii=False)
+
+        self.assertEqual(serializer.to_json(self.obj_list), generic(self.obj_list))
+        self.assertEqual(serializer.to_json(self.another_obj_list), generic(self.another_obj_list))
+        self.assertEqual(len(serializer.get_json_encoder().bundle_writers), 2)
+
+        # Values of other types than the field's are still written properly,
+        # as are bundles whose keys no longer match their shape.
+        bundle.data['title'] = 12
+        bundle.data['created'] = None
+        bundle.data['is_active'] = 'yes'
+        self.assertEqual(serializer.to_json(bundle), generic(bundle))
+
+        del bundle.data['title']
+        bundle.data['extra'] = [1, 2]
+        self.assertEqual(serializer.to_json(bundle), generic(bundle))
+
+        # Sparse fields have a shape of their own.
+        bundle = self.resource.full_dehydrate(self.resource.build_bundle(obj=Note.objects.get(pk=1)), fields=['title', 'id'])
+        self.assertEqual(bundle.shape, (('id', 'integer'), ('title', 'string')))
+        self.assertEqual(serializer.to_json(bundle), '{"id": 1, "title": "First Post!"}')
+
+        # Clients pick the fields, so only so many shapes are remembered.
+        field_names = sorted(self.resource.fields.keys())
+
+        for count in range(1, len(field_names) + 1):
+            for combination in itertools.combinations(field_names, count):
+                self.resource.get_bundle_shape(combination)
+
+        self.assertEqual(len(self.resource._bundle_shapes), 100)
+        self.assertEqual(self.resource.get_bundle_shape(('id', 'title')), (('id', 'integer'), ('title', 'string')))
+
+    def test_serialize_stream(self):
+        serializer = Serializer()
+        meta = {'limit': 20, 'next': None, 'offset': 0, 'total_count': 4}
+        expected = {'meta': meta, 'objects': self.obj_list}
+
+        for format in ('application/json', 'application/xml', 'text/yaml'):
+            chunks = serializer.serialize_stream({'meta': meta, 'objects': iter(self.obj_list)}, format)
+            self.assertEqual(u''.join(chunks), serializer.serialize(expected, format))
+
+        options = {'callback': 'myCallback'}
+        chunks = serializer.serialize_stream({'meta': meta, 'objects': iter(self.obj_list)}, 'text/javascript', options)
+        self.assertEqual(u''.join(chunks), serializer.to_jsonp(expected, options))
+
+        # Empty lists are still empty lists.
+        for format in ('application/json', 'application/xml'):
+            chunks = serializer.serialize_stream({'meta': meta, 'objects': iter([])}, format)
+            self.assertEqual(u''.join(chunks), serializer.serialize({'meta': meta, 'objects': []}, format))
+
 
 class StubbedSerializer(Serializer):
     def __init__(self, *args, **kwargs):
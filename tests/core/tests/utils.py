@@ -1,8 +1,13 @@
+import os
+import subprocess
+import sys
+
 from django.http import HttpRequest
 from django.test import TestCase
 
 from tastypie.exceptions import BadRequest
 from tastypie.serializers import Serializer
+from tastypie.utils.backends import BackendRegistry
 from tastypie.utils.mime import determine_format, build_content_type
 
 
@@ -12,13 +17,15 @@ class MimeTestCase(TestCase):
         self.assertEqual(build_content_type('application/json'), 'application/json')
         self.assertEqual(build_content_type('text/javascript'), 'text/javascript')
         self.assertEqual(build_content_type('application/json', encoding='ascii'), 'application/json')
+        # Nor does binary MessagePack.
+        self.assertEqual(build_content_type('application/x-msgpack'), 'application/x-msgpack')
         # Everything else should.
         self.assertEqual(build_content_type('application/xml'), 'application/xml; charset=utf-8')
         self.assertEqual(build_content_type('application/xml', encoding='ascii'), 'application/xml; charset=ascii')
 
     def test_determine_format(self):
         serializer = Serializer()
-        full_serializer = Serializer(formats=['json', 'jsonp', 'xml', 'yaml', 'html', 'plist'])
+        full_serializer = Serializer(formats=['json', 'jsonp', 'xml', 'yaml', 'html', 'plist', 'msgpack'])
         request = HttpRequest()
 
         # Default.
@@ -45,6 +52,11 @@ class MimeTestCase(TestCase):
         request.GET = {'format': 'plist'}
         self.assertEqual(determine_format(request, serializer), 'application/x-plist')
 
+        # MessagePack is also disabled by default.
+        request.GET = {'format': 'msgpack'}
+        self.assertEqual(determine_format(request, serializer), 'application/json')
+        self.assertEqual(determine_format(request, full_serializer), 'application/x-msgpack')
+
         request.GET = {'format': 'foo'}
         self.assertEqual(determine_format(request, serializer), 'application/json')
 
@@ -69,6 +81,10 @@ class MimeTestCase(TestCase):
         request.META = {'HTTP_ACCEPT': 'application/x-plist'}
         self.assertEqual(determine_format(request, serializer), 'application/x-plist')
 
+        request.META = {'HTTP_ACCEPT': 'application/x-msgpack'}
+        self.assertEqual(determine_format(request, serializer), 'application/json')
+        self.assertEqual(determine_format(request, full_serializer), 'application/x-msgpack')
+
         request.META = {'HTTP_ACCEPT': 'text/html'}
         self.assertEqual(determine_format(request, serializer), 'text/html')
 
@@ -89,3 +105,80 @@ class MimeTestCase(TestCase):
 
         request.META = {'HTTP_ACCEPT': 'bogon'}
         self.assertRaises(BadRequest, determine_format, request, serializer)
+
+    def test_determine_format_accept_cache(self):
+        serializer = Serializer()
+        request = HttpRequest()
+        request.META = {'HTTP_ACCEPT': 'text/plain,application/xml,application/json;q=0.9,*/*;q=0.8'}
+        self.assertEqual(determine_format(request, serializer), 'application/xml')
+        self.assertTrue(request.META['HTTP_ACCEPT'] in serializer.accept_formats)
+        self.assertEqual(determine_format(request, serializer), 'application/xml')
+
+        # No match still falls back to the default.
+        request.META = {'HTTP_ACCEPT': 'image/png'}
+        self.assertEqual(determine_format(request, serializer, default_format='application/xml'), 'application/xml')
+        self.assertEqual(determine_format(request, serializer, default_format='text/yaml'), 'text/yaml')
+
+        # Bad headers keep on being bad.
+        request.META = {'HTTP_ACCEPT': 'bogon'}
+        self.assertRaises(BadRequest, determine_format, request, serializer)
+        self.assertRaises(BadRequest, determine_format, request, serializer)
+
+        # The cache is bounded.
+        serializer.accept_formats.size = 2
+
+        for accept in ('application/json', 'application/xml', 'text/yaml'):
+            request.META = {'HTTP_ACCEPT': accept}
+            self.assertEqual(determine_format(request, serializer), accept)
+
+        self.assertEqual(len(serializer.accept_formats), 2)
+        self.assertFalse('application/json' in serializer.accept_formats)
+
+
+class BackendRegistryTestCase(TestCase):
+    def test_get(self):
+        registry = BackendRegistry()
+        calls = []
+
+        @registry.register('thing')
+        def load_thing():
+            calls.append(1)
+            return 'loaded'
+
+        self.assertFalse(registry.is_loaded('thing'))
+        self.assertEqual(calls, [])
+        self.assertEqual(registry.get('thing'), 'loaded')
+        self.assertTrue(registry.is_loaded('thing'))
+        # Only loaded the once.
+        self.assertEqual(registry.get('thing'), 'loaded')
+        self.assertEqual(calls, [1])
+
+        # Re-registering replaces what was loaded.
+        registry.register('thing', lambda: 'replaced')
+        self.assertFalse(registry.is_loaded('thing'))
+        self.assertEqual(registry.get('thing'), 'replaced')
+
+    def test_get_not_installed(self):
+        registry = BackendRegistry()
+
+        @registry.register('missing')
+        def load_missing():
+            import tastypie_no_such_module
+            return tastypie_no_such_module
+
+        self.assertEqual(registry.get('missing'), None)
+        self.assertTrue(registry.is_loaded('missing'))
+        self.assertRaises(KeyError, registry.get, 'unregistered')
+
+    def test_import_is_lazy(self):
+        # The optional format libraries shouldn't be imported along with
+        # Tastypie, only once a format needs them.
+        script = (
+            "import sys; import tastypie.resources; "
+            "print(','.join(sorted(m for m in ('lxml', 'defusedxml', 'yaml', 'biplist', 'msgpack', 'dateutil') if m in sys.modules)))"
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        process = subprocess.Popen([sys.executable, '-c', script], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stdout, stderr = process.communicate()
+        self.assertEqual(process.returncode, 0, stderr)
+        self.assertEqual(stdout.strip(), '')
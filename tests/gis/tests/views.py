@@ -100,6 +100,6 @@ class ViewsTestCase(TestCase):
 
         resp = self.client.options('/api/v1/geonotes/set/2;1/')
         self.assertEqual(resp.status_code, 200)
-        allows = 'GET'
+        allows = 'GET,POST'
         self.assertEqual(resp['Allow'], allows)
         self.assertEqual(resp.content, allows)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+"""
+Measures the cold-start cost of ``import tastypie.resources``.
+
+Each run imports it in a fresh interpreter, so nothing is already in
+``sys.modules``. Run from this directory, like the tests::
+
+    PYTHONPATH=$PWD:$PWD/.. python import_time.py --settings=settings_core
+
+Also reports which of the optional format libraries got imported along
+with it (ideally, none of them).
+"""
+import optparse
+import os
+import subprocess
+import sys
+
+
+OPTIONAL_MODULES = ('lxml', 'defusedxml', 'yaml', 'biplist', 'msgpack', 'dateutil')
+
+SCRIPT = """
+import sys, time
+start = time.time()
+import %(module)s
+elapsed = time.time() - start
+print('%%f %%d %%s' %% (elapsed, len(sys.modules), ','.join(m for m in %(optional)r if m in sys.modules)))
+"""
+
+
+def time_import(module, settings):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings, PYTHONPATH=os.pathsep.join(sys.path))
+    script = SCRIPT % {'module': module, 'optional': OPTIONAL_MODULES}
+    # ``subprocess.check_output`` is Python 2.7+.
+    process = subprocess.Popen([sys.executable, '-c', script], env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    output, errors = process.communicate()
+
+    if process.returncode != 0:
+        raise RuntimeError('Importing %s failed:\n%s' % (module, errors))
+
+    elapsed, module_count, loaded = (output.strip().split(' ') + [''])[:3]
+    return float(elapsed), int(module_count), [name for name in loaded.split(',') if name]
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--settings', default='settings_core')
+    parser.add_option('--module', default='tastypie.resources')
+    parser.add_option('-n', '--runs', type='int', default=20)
+    options, args = parser.parse_args()
+
+    timings = []
+
+    for run in range(options.runs):
+        elapsed, module_count, loaded = time_import(options.module, options.settings)
+        timings.append(elapsed)
+
+    timings.sort()
+    print('import %s (%d runs)' % (options.module, options.runs))
+    print('  min:     %.1fms' % (timings[0] * 1000))
+    print('  median:  %.1fms' % (timings[len(timings) // 2] * 1000))
+    print('  modules: %d' % module_count)
+    print('  optional libraries imported: %s' % (', '.join(loaded) or 'none'))
+
+
+if __name__ == '__main__':
+    main()
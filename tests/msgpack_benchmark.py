@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Compares the ``msgpack`` format with ``json`` on a page of objects shaped
+like the ``core`` notes: how long encoding & decoding take & how big the
+output is. Run from this directory, like the tests::
+
+    PYTHONPATH=$PWD:$PWD/.. python msgpack_benchmark.py --settings=settings_core
+
+``to_simple + json.dumps`` is how ``to_json`` used to encode, before it
+wrote the JSON itself.
+"""
+import datetime
+import json
+import optparse
+import os
+import time
+
+
+def build_page(count):
+    from tastypie.bundle import Bundle
+
+    created = datetime.datetime(2010, 3, 30, 20, 5)
+    objects = []
+
+    for i in range(count):
+        objects.append(Bundle(data={
+            'id': i,
+            'title': u'Note %d' % i,
+            'slug': u'note-%d' % i,
+            'content': u'This is my very first post using my shiny new API. Pretty sweet, huh?',
+            'is_active': i % 2 == 0,
+            'created': created + datetime.timedelta(hours=i),
+            'updated': created + datetime.timedelta(hours=i, minutes=30),
+            'resource_uri': u'/api/v1/notes/%d/' % i,
+        }))
+
+    return {'meta': {'limit': count, 'offset': 0, 'total_count': count, 'next': None, 'previous': None}, 'objects': objects}
+
+
+def best_of(func, runs):
+    timings = []
+
+    for run in range(runs):
+        start = time.time()
+        func()
+        timings.append(time.time() - start)
+
+    return min(timings)
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option('--settings', default='settings_core')
+    parser.add_option('--objects', type='int', default=1000)
+    parser.add_option('-n', '--runs', type='int', default=20)
+    options, args = parser.parse_args()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', options.settings)
+
+    from tastypie.serializers import Serializer
+
+    serializer = Serializer(formats=['json', 'msgpack'])
+    page = build_page(options.objects)
+    as_json = serializer.to_json(page)
+    as_msgpack = serializer.to_msgpack(page)
+
+    results = [
+        ('encode: to_simple + json.dumps', best_of(lambda: json.dumps(serializer.to_simple(page, {}), sort_keys=True), options.runs), None),
+        ('encode: to_json', best_of(lambda: serializer.to_json(page), options.runs), len(as_json)),
+        ('encode: to_msgpack', best_of(lambda: serializer.to_msgpack(page), options.runs), len(as_msgpack)),
+        ('decode: from_json', best_of(lambda: serializer.from_json(as_json), options.runs), None),
+        ('decode: from_msgpack', best_of(lambda: serializer.from_msgpack(as_msgpack), options.runs), None),
+    ]
+
+    print('%d objects (best of %d runs)' % (options.objects, options.runs))
+
+    for name, elapsed, size in results:
+        if size is None:
+            print('  %-32s %8.2fms' % (name, elapsed * 1000))
+        else:
+            print('  %-32s %8.2fms %9d bytes' % (name, elapsed * 1000, size))
+
+
+if __name__ == '__main__':
+    main()
@@ -22,3 +22,8 @@ class NamespacedViewsTestCase(TestCase):
         self.assertRaises(NoReverseMatch, reverse, 'special:api_v1_top_level')
         self.assertEquals(reverse('special:api_v1_top_level', kwargs={'api_name': 'v1'}), '/api/v1/')
         self.assertEquals(reverse('special:api_dispatch_list', kwargs={'api_name': 'v1', 'resource_name': 'notes'}), '/api/v1/notes/')
+
+        # URI templates are reversed within the namespace.
+        resource = api.canonical_resource_for('notes')
+        self.assertEqual(resource.get_uri_template('api_dispatch_detail', detail=True), ('/api/v1/notes/', '/'))
+        self.assertEqual(resource.get_resource_uri(), '/api/v1/notes/')
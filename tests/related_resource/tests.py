@@ -11,10 +11,14 @@ from core.models import Note, MediaBit
 from core.tests.resources import HttpRequest
 from core.tests.mocks import MockRequest
 from tastypie import fields
-from related_resource.api.resources import FreshNoteResource, CategoryResource, PersonResource
+from tastypie.authorization import Authorization
+from tastypie.exceptions import BadRequest, ImmediateHttpResponse
+from tastypie.serializers import Serializer
+from tastypie.utils import attach_identity_map, attach_packed_arrays, get_dehydration_memo, PackedArray
+from related_resource.api.resources import FreshNoteResource, CategoryResource, CompanyResource, PersonResource, DogResource, DogHouseResource, NoteResource, UserResource, ProductResource
 from related_resource.api.urls import api
 from related_resource.models import Category, Tag, Taggable, TaggableTag, ExtraData, Company, Person, Dog, DogHouse, Bone, Product, Address
-from related_resource.models import Label
+from related_resource.models import Label, Post
 from django.db.models.signals import pre_save
 
 class RelatedResourceTest(TestCase):
@@ -592,4 +596,663 @@ class RelatedSaveCallsTest(TestCase):
         tag = Tag.objects.all()[0]
         taggable_tag = tag.taggabletags.all()[0]
         self.assertEqual(taggable_tag.extra, 1234)
-        
\ No newline at end of file
+        
+
+class PrefetchPlanTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def setUp(self):
+        super(PrefetchPlanTestCase, self).setUp()
+
+        for i in range(3):
+            address = Address.objects.create(line='%s Main St.' % i)
+            company = Company.objects.create(name='Company %s' % i, address=address)
+            Product.objects.create(name='Product %s' % i, producer=company)
+            person = Person.objects.create(name='Person %s' % i, company=company)
+
+            for j in range(2):
+                house = DogHouse.objects.create(color='Red')
+                dog = Dog.objects.create(name='Dog %s-%s' % (i, j), owner=person, house=house)
+                Bone.objects.create(dog=dog, color='white')
+
+    def test_build_prefetch_plan(self):
+        pr = PersonResource()
+        self.assertEqual(pr.build_prefetch_plan(for_list=True), {
+            'select_related': ['company', 'company__address'],
+            'prefetch_related': [
+                'company__products',
+                'dogs',
+                'dogs__bones',
+                'dogs__house',
+            ],
+        })
+
+        # URI-only foreign keys don't need the related row at all.
+        self.assertEqual(DogResource().build_prefetch_plan(for_list=True), {
+            'select_related': ['house'],
+            'prefetch_related': ['bones'],
+        })
+
+        # Self-referential resources don't recurse forever.
+        cr = FullCategoryResource()
+        self.assertEqual(cr.build_prefetch_plan(for_list=True), {
+            'select_related': ['parent'],
+            'prefetch_related': [],
+        })
+
+    def test_get_list_queries(self):
+        pr = PersonResource()
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        # One to count, one for the people (with their companies & addresses)
+        # and one per prefetched relation. Relations back to an object that
+        # was just prefetched are already cached by Django.
+        with self.assertNumQueries(6):
+            resp = pr.get_list(request)
+
+        self.assertEqual(resp.status_code, 200)
+        prefetched = json.loads(resp.content)
+
+        class UnplannedPersonResource(PersonResource):
+            class Meta(PersonResource.Meta):
+                auto_prefetch = False
+
+        unplanned = UnplannedPersonResource()
+        self.assertEqual(unplanned.apply_prefetch_plan(Person.objects.all(), for_list=True).query.select_related, False)
+        resp = unplanned.get_list(request)
+        self.assertEqual(json.loads(resp.content), prefetched)
+
+    def test_streaming_get_list(self):
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+        expected = PersonResource().get_list(request).content
+
+        class StreamingPersonResource(PersonResource):
+            class Meta(PersonResource.Meta):
+                streaming = True
+                streaming_chunk_size = 2
+
+        resp = StreamingPersonResource().get_list(request)
+        self.assertTrue(resp.streaming)
+
+        # Nothing is fetched until the response is sent. Then each chunk of
+        # people gets its own round of prefetching.
+        with self.assertNumQueries(9):
+            content = ''.join(resp.streaming_content)
+
+        self.assertEqual(content, expected)
+
+        request.GET = {'format': 'xml'}
+        resource = StreamingPersonResource()
+        content = ''.join(resource.get_list(request).streaming_content)
+        resource._meta.streaming = False
+        self.assertEqual(content, resource.get_list(request).content)
+
+    def test_export_get_list(self):
+        class ExportPersonResource(PersonResource):
+            class Meta(PersonResource.Meta):
+                serializer = Serializer(formats=['json', 'csv', 'ndjson'])
+                export_formats = ['csv', 'ndjson']
+                ordering = ['name']
+                max_limit = 2
+                streaming_chunk_size = 2
+
+        resource = ExportPersonResource()
+        request = MockRequest()
+        request.method = 'GET'
+        request.GET = {'format': 'csv', 'order_by': 'name'}
+        resp = resource.get_list(request)
+        self.assertTrue(resp.streaming)
+        self.assertTrue(resp['Content-Type'].startswith('text/csv'))
+
+        # Every person is sent, despite ``max_limit``, with related objects as
+        # URIs.
+        people = Person.objects.order_by('name')
+        lines = ''.join(resp.streaming_content).splitlines()
+        self.assertEqual(lines[0], 'company,dogs,id,name,resource_uri')
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(lines[1], '/v1/company/%s/,"[""/v1/dog/%s/"", ""/v1/dog/%s/""]",%s,Person 0,/v1/person/%s/' % (
+            people[0].company_id,
+            people[0].dogs.all()[0].pk,
+            people[0].dogs.all()[1].pk,
+            people[0].pk,
+            people[0].pk,
+        ))
+
+        request.GET = {'format': 'ndjson', 'order_by': 'name'}
+        lines = ''.join(resource.get_list(request).streaming_content).splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], ['Person 0', 'Person 1', 'Person 2'])
+        self.assertEqual(json.loads(lines[0])['company'], '/v1/company/%s/' % people[0].company_id)
+
+        # Other formats are still paginated.
+        request.GET = {'format': 'json'}
+        self.assertEqual(len(json.loads(resource.get_list(request).content)['objects']), 2)
+
+        # The columns come from the fields, even ones the first rows lack.
+        class NicknamedPersonResource(ExportPersonResource):
+            nickname = fields.CharField(attribute='name', use_in=lambda bundle: bundle.obj.name == 'Person 2')
+
+        request.GET = {'format': 'csv', 'order_by': 'name', 'fields': 'name,nickname'}
+        lines = ''.join(NicknamedPersonResource().get_list(request).streaming_content).splitlines()
+        self.assertEqual(lines, ['name,nickname', 'Person 0,', 'Person 1,', 'Person 2,Person 2'])
+
+
+class ForeignKeyUriTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def setUp(self):
+        super(ForeignKeyUriTestCase, self).setUp()
+        self.user = User.objects.create(username='fkuri')
+        self.note = Note.objects.create(author=self.user, title='FK URI', slug='fk-uri')
+
+    def test_uri_from_column(self):
+        resource = api.canonical_resource_for('notes')
+        note = Note.objects.get(pk=self.note.pk)
+        bundle = resource.build_bundle(obj=note)
+
+        with self.assertNumQueries(0):
+            uri = resource.author.dehydrate(bundle, for_list=True)
+
+        self.assertEqual(uri, '/v1/users/%s/' % self.user.pk)
+
+        # A null key still follows the usual rules.
+        note.author = None
+        self.assertRaises(fields.ApiFieldError, resource.author.dehydrate, bundle)
+
+    def test_custom_detail_uri_kwargs_falls_back(self):
+        class UsernameUserResource(UserResource):
+            class Meta(UserResource.Meta):
+                detail_uri_name = 'username'
+
+            def detail_uri_kwargs(self, bundle_or_obj):
+                return {'username': bundle_or_obj.obj.username}
+
+        class UsernameNoteResource(NoteResource):
+            author = fields.ForeignKey(UsernameUserResource, 'author')
+
+        resource = UsernameNoteResource()
+        self.assertEqual(resource.author.get_uri_foreign_key(Note), None)
+
+        bundle = resource.build_bundle(obj=Note.objects.get(pk=self.note.pk))
+
+        with self.assertNumQueries(1):
+            resource.author.dehydrate(bundle)
+
+
+class IdentityMapTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def setUp(self):
+        super(IdentityMapTestCase, self).setUp()
+        self.user = User.objects.create(username='identity')
+        self.notes = [Note.objects.create(author=self.user, title='Note %s' % i, slug='note-%s' % i) for i in range(3)]
+
+    def test_obj_get(self):
+        resource = UserResource()
+        request = MockRequest()
+
+        # Without ``dispatch``, there's no identity map.
+        with self.assertNumQueries(2):
+            resource.obj_get(resource.build_bundle(request=request), pk=self.user.pk)
+            resource.obj_get(resource.build_bundle(request=request), pk=self.user.pk)
+
+        attach_identity_map(request)
+
+        with self.assertNumQueries(1):
+            first = resource.obj_get(resource.build_bundle(request=request), pk=self.user.pk)
+            second = resource.get_via_uri('/v1/users/%s/' % self.user.pk, request=request)
+
+        self.assertTrue(first is second)
+
+        # Other lookups still go to the database.
+        with self.assertNumQueries(1):
+            resource.obj_get(resource.build_bundle(request=request), username='identity')
+
+        class NoIdentityMapUserResource(UserResource):
+            class Meta(UserResource.Meta):
+                identity_map = False
+
+        with self.assertNumQueries(1):
+            NoIdentityMapUserResource().obj_get(resource.build_bundle(request=request), pk=self.user.pk)
+
+    def test_obj_get_filtering_authorization(self):
+        class ActiveOnlyAuthorization(Authorization):
+            def read_detail(self, object_list, bundle):
+                return object_list.filter(is_active=True).exists()
+
+        class ActiveOnlyUserResource(UserResource):
+            class Meta(UserResource.Meta):
+                authorization = ActiveOnlyAuthorization()
+
+        resource = ActiveOnlyUserResource()
+        request = MockRequest()
+        attach_identity_map(request).add(self.user)
+
+        # Objects from the identity map are authorized as a ``QuerySet``.
+        self.assertTrue(resource.obj_get(resource.build_bundle(request=request), pk=self.user.pk) is self.user)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertRaises(ImmediateHttpResponse, resource.obj_get, resource.build_bundle(request=request), pk=self.user.pk)
+
+    def test_related_dehydrate(self):
+        class FullNoteResource(NoteResource):
+            author = fields.ForeignKey(UserResource, 'author', full=True)
+
+        resource = FullNoteResource()
+        request = MockRequest()
+        attach_identity_map(request)
+        notes = list(Note.objects.filter(pk__in=[note.pk for note in self.notes]))
+
+        # The author is loaded for the first note & reused for the others.
+        with self.assertNumQueries(1):
+            for note in notes:
+                bundle = resource.build_bundle(obj=note, request=request)
+                self.assertEqual(resource.author.dehydrate(bundle, for_list=True).data['username'], u'identity')
+
+        self.assertTrue(notes[0].author is notes[2].author)
+
+    def test_streamed_chunks(self):
+        class FullNoteResource(NoteResource):
+            author = fields.ForeignKey(UserResource, 'author', full=True)
+
+            class Meta(NoteResource.Meta):
+                streaming_chunk_size = 2
+
+        for i in range(3):
+            Note.objects.create(author=User.objects.create(username='identity-%s' % i), title='Other %s' % i, slug='other-%s' % i)
+
+        resource = FullNoteResource()
+        request = MockRequest()
+        identity_map = attach_identity_map(request)
+        sizes = []
+
+        for bundle in resource.iter_dehydrated(request, Note.objects.filter(title__startswith='Other')):
+            sizes.append(len(identity_map))
+
+        # Each chunk's authors are forgotten before the next chunk.
+        self.assertEqual(sizes, [1, 2, 1])
+
+    def test_patch_list(self):
+        resource = api.canonical_resource_for('notes')
+        request = HttpRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'PATCH'
+        request._read_started = False
+        request._raw_post_data = request._body = json.dumps({
+            'objects': [
+                {'resource_uri': '/v1/notes/%s/' % note.pk, 'author': '/v1/users/%s/' % self.user.pk, 'title': 'Patched'}
+                for note in self.notes
+            ],
+        })
+        identity_map = attach_identity_map(request)
+
+        resp = resource.patch_list(request)
+        self.assertEqual(resp.status_code, 202)
+        self.assertEqual(Note.objects.filter(title='Patched').count(), 3)
+
+        # The notes & their shared author are each held once.
+        self.assertEqual(len(identity_map), 4)
+
+
+class DehydrationMemoTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def test_shared_related_object(self):
+        class FullProductResource(ProductResource):
+            producer = fields.ForeignKey(CompanyResource, 'producer', full=True)
+
+        company = Company.objects.create(name='Shared')
+
+        for i in range(3):
+            Product.objects.create(name='Product %s' % i, producer=company)
+
+        resource = FullProductResource()
+        request = MockRequest()
+        bundles = [resource.full_dehydrate(resource.build_bundle(obj=product, request=request), for_list=True) for product in Product.objects.all()]
+
+        # The company is dehydrated once & reused, each product getting its
+        # own copy of the bundle.
+        self.assertEqual(bundles[0].data['producer'].data['name'], 'Shared')
+        self.assertTrue(bundles[0].data['producer'].obj is bundles[2].data['producer'].obj)
+        self.assertFalse(bundles[0].data['producer'] is bundles[2].data['producer'])
+
+        bundles[0].data['producer'].data['name'] = 'Changed'
+        self.assertEqual(bundles[2].data['producer'].data['name'], 'Shared')
+
+        # Saving (or clearing by hand) forgets what was dehydrated.
+        Company.objects.filter(pk=company.pk).update(name='Renamed')
+        resource.clear_dehydration_memo(request)
+        bundle = resource.full_dehydrate(resource.build_bundle(obj=Product.objects.all()[0], request=request), for_list=True)
+        self.assertEqual(bundle.data['producer'].data['name'], 'Renamed')
+
+    def test_streamed_chunks(self):
+        class FullProductResource(ProductResource):
+            producer = fields.ForeignKey(CompanyResource, 'producer', full=True)
+
+            class Meta(ProductResource.Meta):
+                streaming_chunk_size = 2
+
+        for i in range(6):
+            Product.objects.create(name='Product %s' % i, producer=Company.objects.create(name='Company %s' % i))
+
+        resource = FullProductResource()
+        request = MockRequest()
+        sizes = []
+
+        for bundle in resource.iter_dehydrated(request, Product.objects.all()):
+            sizes.append(len(get_dehydration_memo(request)))
+
+        # Each chunk's companies (& their products) are forgotten before the
+        # next chunk.
+        self.assertEqual(len(sizes), 6)
+        self.assertEqual(sizes, [2, 4, 2, 4, 2, 4])
+
+    def test_cycle(self):
+        dad = Category.objects.create(name='Dad')
+        son = Category.objects.create(parent=dad, name='Son')
+        dad.parent = son
+        dad.save()
+
+        resource = FullCategoryResource()
+        bundle = resource.full_dehydrate(resource.build_bundle(obj=son, request=MockRequest()))
+
+        # Son -> Dad -> Son (again) is cut short with a URI.
+        self.assertEqual(bundle.data['parent'].data['name'], 'Dad')
+        self.assertEqual(bundle.data['parent'].data['parent'].data['name'], 'Son')
+        self.assertEqual(bundle.data['parent'].data['parent'].data['parent'], resource.get_resource_uri(dad))
+
+
+class ToManyUriTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def setUp(self):
+        super(ToManyUriTestCase, self).setUp()
+        self.posts = []
+
+        for i in range(3):
+            post = Post.objects.create(name='Post %s' % i)
+
+            for j in range(2):
+                post.label.add(Label.objects.create(name='Label %s-%s' % (i, j)))
+
+            self.posts.append(post)
+
+    def test_get_pk_relation(self):
+        resource = api.canonical_resource_for('post')
+        self.assertEqual(resource.label.get_pk_relation(Post), (Label, 'post'))
+
+        cr = CompanyResource()
+        self.assertEqual(cr.products.get_pk_relation(Company), None)
+        self.assertEqual(cr.products.get_pk_relation(Company, for_list=False), None)
+
+        employees = fields.ToManyField(PersonResource, 'employees')
+        self.assertEqual(employees.get_pk_relation(Company), (Person, 'company'))
+
+    def test_uris_from_pks(self):
+        resource = api.canonical_resource_for('post')
+        post = Post.objects.get(pk=self.posts[0].pk)
+        bundle = resource.build_bundle(obj=post)
+        expected = ['/v1/label/%s/' % label.pk for label in post.label.all()]
+
+        with self.assertNumQueries(1):
+            self.assertEqual(resource.label.dehydrate(bundle), expected)
+
+        # Prefetched objects are used as-is.
+        post = Post.objects.prefetch_related('label').get(pk=self.posts[0].pk)
+        bundle = resource.build_bundle(obj=post)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(resource.label.dehydrate(bundle), expected)
+
+    def test_get_list_queries(self):
+        resource = api.canonical_resource_for('post')
+        request = MockRequest()
+        request.GET = {'format': 'json'}
+        request.method = 'GET'
+
+        # One to count, one for the posts & one for all of the labels.
+        with self.assertNumQueries(3):
+            resp = resource.get_list(request)
+
+        self.assertEqual(resp.status_code, 200)
+        data = json.loads(resp.content)
+
+        for post, obj in zip(self.posts, data['objects']):
+            self.assertEqual(obj['label'], ['/v1/label/%s/' % label.pk for label in post.label.all()])
+
+        class UnbatchedPostResource(resource.__class__):
+            class Meta(resource.__class__.Meta):
+                auto_prefetch = False
+
+        with self.assertNumQueries(5):
+            resp = UnbatchedPostResource().get_list(request)
+
+        self.assertEqual(json.loads(resp.content), data)
+
+
+class UriTemplateTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def test_get_uri_template(self):
+        resource = api.canonical_resource_for('notes')
+        self.assertEqual(resource.get_uri_template(), ('/v1/notes/',))
+        self.assertEqual(resource.get_uri_template('api_get_schema'), ('/v1/notes/schema/',))
+        self.assertEqual(resource.get_uri_template('api_dispatch_detail', detail=True), ('/v1/notes/', '/'))
+
+        user = User.objects.create(username='template')
+        note = Note.objects.create(author=user, title='Template', slug='template')
+        self.assertEqual(resource.get_resource_uri(), reverse('api_dispatch_list', kwargs={'api_name': 'v1', 'resource_name': 'notes'}))
+        self.assertEqual(resource.get_resource_uri(note), reverse('api_dispatch_detail', kwargs={'api_name': 'v1', 'resource_name': 'notes', 'pk': note.pk}))
+
+    def test_fill_uri_template(self):
+        resource = api.canonical_resource_for('notes')
+        template = resource.get_uri_template('api_dispatch_detail', detail=True)
+        self.assertEqual(resource.fill_uri_template(template, 12), '/v1/notes/12/')
+        self.assertEqual(resource.fill_uri_template(template, u'abc-12'), '/v1/notes/abc-12/')
+
+        # Anything ``reverse`` might handle differently falls back to it.
+        self.assertEqual(resource.fill_uri_template(template, -1), None)
+        self.assertEqual(resource.fill_uri_template(template, 'a b'), None)
+        self.assertEqual(resource.fill_uri_template(template, u'caf\xe9'), None)
+        self.assertEqual(resource.fill_uri_template(template, None), None)
+        self.assertEqual(resource.get_resource_uri_from_value(-1), '')
+
+    def test_customized_resources_fall_back(self):
+        class PrependedNoteResource(NoteResource):
+            def prepend_urls(self):
+                return []
+
+        class SlugNoteResource(NoteResource):
+            def detail_uri_kwargs(self, bundle_or_obj):
+                return {'pk': bundle_or_obj.slug}
+
+        self.assertEqual(NoteResource().can_use_uri_templates(detail=True), True)
+        self.assertEqual(PrependedNoteResource().can_use_uri_templates(), False)
+        self.assertEqual(PrependedNoteResource().get_uri_template(), None)
+        self.assertEqual(SlugNoteResource().can_use_uri_templates(), True)
+        self.assertEqual(SlugNoteResource().can_use_uri_templates(detail=True), False)
+
+        resource = SlugNoteResource(api_name='v1')
+        self.assertEqual(resource.get_resource_uri(Note(pk=3, slug='slug')), '/v1/notes/slug/')
+
+
+class SparseFieldsTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def setUp(self):
+        super(SparseFieldsTestCase, self).setUp()
+        person = Person.objects.create(name='Owner')
+
+        for i in range(3):
+            house = DogHouse.objects.create(color='Blue')
+            dog = Dog.objects.create(name='Dog %s' % i, owner=person, house=house)
+            Bone.objects.create(dog=dog, color='white')
+
+        self.person = person
+        self.request = MockRequest()
+        self.request.method = 'GET'
+
+    def test_get_sparse_fields(self):
+        resource = DogResource()
+        self.request.GET = {}
+        self.assertEqual(resource.get_sparse_fields(self.request), None)
+
+        self.request.GET = {'fields': 'name, owner,'}
+        self.assertEqual(resource.get_sparse_fields(self.request), set(['name', 'owner']))
+
+        self.request.GET = {'fields': 'name,nope'}
+        self.assertRaises(BadRequest, resource.get_sparse_fields, self.request)
+
+    def test_get_sparse_columns(self):
+        resource = DogResource()
+        self.assertEqual(resource.get_sparse_columns(set(['name', 'owner']), for_list=True), ['id', 'name', 'owner'])
+        self.assertEqual(resource.get_sparse_columns(set(['resource_uri', 'bones']), for_list=True), ['id'])
+
+        # Anything that might use other data leaves the ``QuerySet`` alone.
+        class HookedDogResource(DogResource):
+            def dehydrate_name(self, bundle):
+                return bundle.obj.name.upper()
+
+        self.assertEqual(HookedDogResource().get_sparse_columns(set(['name']), for_list=True), None)
+        queryset = Dog.objects.all()
+        self.assertTrue(HookedDogResource().apply_sparse_fields(queryset, fields=set(['name']), for_list=True) is queryset)
+
+        only, defer = resource.apply_sparse_fields(Dog.objects.select_related('house'), fields=set(['name']), for_list=True).query.deferred_loading
+        self.assertEqual((sorted(only), defer), (['house', 'id', 'name'], False))
+
+    def test_get_list(self):
+        resource = DogResource()
+        self.request.GET = {'format': 'json', 'fields': 'name,owner'}
+
+        # One to count & one for the dogs. No houses or bones.
+        with self.assertNumQueries(2):
+            resp = resource.get_list(self.request)
+
+        data = json.loads(resp.content)
+        self.assertEqual(len(data['objects']), 3)
+        self.assertEqual(data['objects'][0], {'name': 'Dog 0', 'owner': '/v1/person/%s/' % self.person.pk})
+
+        self.request.GET = {'format': 'json', 'fields': 'name,nope'}
+        resp = resource.wrap_view('get_list')(self.request)
+        self.assertEqual(resp.status_code, 400)
+
+    def test_use_in(self):
+        class DetailNameDogResource(DogResource):
+            name = fields.CharField(attribute='name', use_in='detail')
+
+        resource = DetailNameDogResource()
+        self.request.GET = {'format': 'json', 'fields': 'name,resource_uri'}
+        data = json.loads(resource.get_list(self.request).content)
+        self.assertEqual(data['objects'][0].keys(), ['resource_uri'])
+
+        dog = Dog.objects.get(name='Dog 0')
+        data = json.loads(resource.get_detail(self.request, pk=dog.pk).content)
+        self.assertEqual(data, {'name': 'Dog 0', 'resource_uri': '/v1/dog/%s/' % dog.pk})
+
+
+class ValuesPlanTestCase(TestCase):
+    urls = 'related_resource.api.urls'
+
+    def setUp(self):
+        super(ValuesPlanTestCase, self).setUp()
+
+        for color in ('Blue', 'Red', 'Green'):
+            DogHouse.objects.create(color=color)
+
+        self.request = MockRequest()
+        self.request.method = 'GET'
+
+    def test_build_values_plan(self):
+        resource = DogHouseResource()
+        plan = resource.build_values_plan(DogHouse.objects.all(), for_list=True)
+        self.assertEqual(sorted([(field_name, column) for field_name, field_object, column in plan]), [('color', 'color'), ('id', 'id'), ('resource_uri', 'id')])
+
+        house = DogHouse.objects.get(color='Blue')
+        row = resource.apply_values_plan(DogHouse.objects.filter(pk=house.pk), plan)[0]
+        self.assertEqual(row, {'id': house.pk, 'color': 'Blue'})
+        bundle = resource.full_dehydrate_values(row, plan)
+        self.assertEqual(bundle.obj, None)
+        self.assertEqual(bundle.data, {'id': house.pk, 'color': 'Blue', 'resource_uri': '/v1/doghouse/%s/' % house.pk})
+
+        plan = resource.build_values_plan(DogHouse.objects.all(), for_list=True, fields=set(['color']))
+        self.assertEqual([(field_name, column) for field_name, field_object, column in plan], [('color', 'color')])
+
+        # Related fields need the objects.
+        self.assertEqual(DogResource().build_values_plan(Dog.objects.all(), for_list=True), None)
+        self.assertEqual(resource.build_values_plan(DogHouse.objects.prefetch_related('dogs'), for_list=True), None)
+        self.assertEqual(resource.build_values_plan(list(DogHouse.objects.all()), for_list=True), None)
+
+        class HookedDogHouseResource(DogHouseResource):
+            def dehydrate_color(self, bundle):
+                return bundle.obj.color.lower()
+
+        self.assertEqual(HookedDogHouseResource().build_values_plan(DogHouse.objects.all(), for_list=True), None)
+
+        class NoValuesDogHouseResource(DogHouseResource):
+            class Meta(DogHouseResource.Meta):
+                auto_values = False
+
+        self.assertEqual(NoValuesDogHouseResource().build_values_plan(DogHouse.objects.all(), for_list=True), None)
+
+    def test_list_fields(self):
+        class DigitsField(fields.ListField):
+            def convert(self, value):
+                return [int(digit) for digit in str(value)]
+
+        class DigitsDogHouseResource(DogHouseResource):
+            letters = fields.ListField(attribute='color')
+            digits = DigitsField(attribute='id', typecode='B')
+
+        resource = DigitsDogHouseResource()
+        plan = resource.build_values_plan(DogHouse.objects.all(), for_list=True)
+        self.assertEqual(sorted([field_name for field_name, field_object, column in plan]), ['color', 'digits', 'id', 'letters', 'resource_uri'])
+
+        house = DogHouse.objects.get(color='Red')
+        row = resource.apply_values_plan(DogHouse.objects.filter(pk=house.pk), plan)[0]
+        bundle = resource.full_dehydrate_values(row, plan, request=self.request)
+        self.assertEqual(bundle.data['letters'], ['R', 'e', 'd'])
+        self.assertEqual(bundle.data['digits'], [int(digit) for digit in str(house.pk)])
+
+        # Packed like ``ListField.dehydrate`` does.
+        request = MockRequest()
+        attach_packed_arrays(request)
+        bundle = resource.full_dehydrate_values(row, plan, request=request)
+        self.assertEqual(bundle.data['letters'], ['R', 'e', 'd'])
+        self.assertEqual(bundle.data['digits'], PackedArray([int(digit) for digit in str(house.pk)], 'B'))
+
+    def test_get_list(self):
+        resource = DogHouseResource()
+        house = DogHouse.objects.get(color='Blue')
+        self.request.GET = {'format': 'json'}
+
+        with self.assertNumQueries(2):
+            resp = resource.get_list(self.request)
+
+        data = json.loads(resp.content)
+        self.assertEqual(data['objects'][0], {'id': house.pk, 'color': 'Blue', 'resource_uri': '/v1/doghouse/%s/' % house.pk})
+
+        # Same output as dehydrating the model instances.
+        for format in ('json', 'xml'):
+            self.request.GET = {'format': format, 'fields': 'color,resource_uri'}
+            content = resource.get_list(self.request).content
+
+            try:
+                resource._meta.auto_values = False
+                self.assertEqual(content, resource.get_list(self.request).content)
+            finally:
+                resource._meta.auto_values = True
+
+    def test_streaming_get_list(self):
+        class StreamingDogHouseResource(DogHouseResource):
+            class Meta(DogHouseResource.Meta):
+                streaming = True
+                streaming_chunk_size = 2
+
+        resource = StreamingDogHouseResource()
+        self.request.GET = {'format': 'json'}
+        content = ''.join(resource.get_list(self.request).streaming_content)
+        resource._meta.streaming = False
+        self.assertEqual(content, resource.get_list(self.request).content)